@@ -0,0 +1,142 @@
+"""
+Wait timeouts learned from observed page latencies.
+
+Hard-coded waits are either too long for a fast site (an empty last page
+costs the full timeout) or too short for a slow one. Instead, every wait
+records how long its condition took to come true, per retailer and kind of
+wait ('listing', 'cookies', ...), and the next timeout is a high percentile
+of that history times a safety margin, kept between FLOOR_SECONDS and
+CEILING_FACTOR times the hard-coded default.
+
+Timed-out waits aren't added to the history (an empty page never
+"arrives"), but each consecutive timeout doubles the next one, up to the
+ceiling, so a site that has slowed down isn't cut off early.
+
+Until MIN_SAMPLES waits of a kind have been seen, the default is used.
+Set ADAPTIVE_TIMEOUTS=0 to always use the defaults. History lives in
+WebScrape/.timeouts/<retailer>.json unless SCRAPER_TIMEOUT_DIR points elsewhere.
+"""
+
+import json
+import math
+import os
+import threading
+import time
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+STATE_DIR = os.environ.get(
+    'SCRAPER_TIMEOUT_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".timeouts")
+)
+ENABLED = os.environ.get('ADAPTIVE_TIMEOUTS', '1') != '0'
+
+PERCENTILE = 95
+MARGIN = 1.5
+FLOOR_SECONDS = 2.0
+CEILING_FACTOR = 2.0
+MIN_SAMPLES = 5
+MAX_SAMPLES = 200
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+class TimeoutPolicy:
+    """
+    Learned wait timeouts for one retailer.
+
+    Args:
+        retailer (str): Scraper name; one history file per retailer.
+        enabled (bool): False always returns the defaults (history is still recorded).
+    """
+
+    def __init__(self, retailer, enabled=ENABLED, directory=None):
+        self.retailer = retailer
+        self.enabled = enabled
+        self.path = os.path.join(directory or STATE_DIR, f"{retailer}.json")
+        self._lock = threading.Lock()
+        self._samples = self._load()
+        self._timeouts_in_a_row = {}
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def timeout(self, kind, default):
+        """Seconds to wait for a ``kind`` wait whose hard-coded timeout was ``default``"""
+        if not self.enabled:
+            return default
+        ceiling = default * CEILING_FACTOR
+        with self._lock:
+            samples = list(self._samples.get(kind, []))
+            timeouts_in_a_row = self._timeouts_in_a_row.get(kind, 0)
+        if len(samples) < MIN_SAMPLES:
+            learned = default
+        else:
+            learned = max(FLOOR_SECONDS, percentile(samples, PERCENTILE) * MARGIN)
+        return min(ceiling, learned * (2 ** timeouts_in_a_row))
+
+    def record(self, kind, seconds):
+        """Add an observed latency for ``kind``"""
+        with self._lock:
+            samples = self._samples.setdefault(kind, [])
+            samples.append(round(seconds, 3))
+            del samples[:-MAX_SAMPLES]
+            self._timeouts_in_a_row[kind] = 0
+
+    def record_timeout(self, kind):
+        with self._lock:
+            self._timeouts_in_a_row[kind] = self._timeouts_in_a_row.get(kind, 0) + 1
+
+    def measure(self, kind, default, wait):
+        """
+        Run ``wait(timeout)`` with the learned timeout and learn from it.
+
+        ``wait`` must return a falsy value when it timed out, e.g.
+        ``lambda timeout: wait_for_any_selector(driver, selectors, timeout)``.
+        """
+        start = time.monotonic()
+        result = wait(self.timeout(kind, default))
+        if result:
+            self.record(kind, time.monotonic() - start)
+        else:
+            self.record_timeout(kind)
+        return result
+
+    def wait(self, driver, kind, condition, default):
+        """
+        ``WebDriverWait(driver, timeout).until(condition)`` with the learned timeout.
+
+        Raises:
+            TimeoutException: Like WebDriverWait, if the condition never came true.
+        """
+        def until(timeout):
+            try:
+                return WebDriverWait(driver, timeout).until(condition)
+            except TimeoutException:
+                return None
+
+        result = self.measure(kind, default, until)
+        if not result:
+            raise TimeoutException(f"{self.retailer} {kind} wait timed out")
+        return result
+
+    def save(self):
+        """Write the latency history to disk"""
+        with self._lock:
+            data = {kind: list(samples) for kind, samples in self._samples.items()}
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️ Could not write timeout history {self.path}: {e}")
@@ -1,12 +1,50 @@
 import time
-import pandas as pd
 from bs4 import BeautifulSoup
+import lxml.html
+from lxml.cssselect import CSSSelector
+from lxml.etree import ParserError
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
 import os
+import argparse
+from http_fetch import fetch_conditional, close_session
+from page_cache import open_page, record_page
+from driver_pool import DriverPool
+from chrome_cache import start_selenium_chrome
+from resource_blocking import ResourceBlocker
+from checkpoint import Checkpoint, flush_on_sigterm
+from product_sink import ProductSink
+from delta import DeltaStore
+from adaptive_timeouts import TimeoutPolicy
+
+# 'http' tries a plain HTTP fetch first and only starts Chrome when the
+# response has no product tiles; 'selenium' always uses the browser.
+FETCH_MODE = os.environ.get('ALDI_FETCH_MODE', 'http')
+
+# Drops images, fonts, stylesheets and trackers at the network level
+RESOURCE_BLOCKER = ResourceBlocker('aldi')
+
+# 'lxml' parses tiles with precompiled CSS selectors; 'bs4' is the original
+# BeautifulSoup parser, kept as a compatibility mode (both give identical records).
+PARSER_BACKEND = os.environ.get('ALDI_PARSER', 'lxml')
+
+# CSS selectors for the product details.
+PRODUCT_CONTAINER_SELECTOR = 'a.product-tile__link'
+PRODUCT_BRAND_SELECTOR = 'div.product-tile__brandname p'
+PRODUCT_NAME_SELECTOR = 'div.product-tile__name p'
+PRODUCT_PRICE_SELECTOR = 'span.base-price__regular'
+#PRODUCT_IMAGE_SELECTOR = 'img.base-image'
+
+# Compiled to XPath once rather than on every page
+PRODUCT_CONTAINER_XPATH = CSSSelector(PRODUCT_CONTAINER_SELECTOR)
+PRODUCT_BRAND_XPATH = CSSSelector(PRODUCT_BRAND_SELECTOR)
+PRODUCT_NAME_XPATH = CSSSelector(PRODUCT_NAME_SELECTOR)
+PRODUCT_PRICE_XPATH = CSSSelector(PRODUCT_PRICE_SELECTOR)
+
+# Page waits sized from observed load times instead of a flat 15 seconds
+TIMEOUTS = TimeoutPolicy('aldi')
 
 def setup_driver():
     """
@@ -25,9 +63,10 @@ def setup_driver():
     # options.add_argument('--headless')
     options.add_argument('--start-maximized')
     options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36')
+    RESOURCE_BLOCKER.configure_options(options)
     
     try:
-        driver = webdriver.Chrome(options=options)
+        driver = start_selenium_chrome(options)
     except Exception as e:
         print(f"Error setting up the WebDriver: {e}")
         print("Please ensure you have Google Chrome and the correct version of ChromeDriver installed.")
@@ -48,12 +87,13 @@ def scrape_aldi_page(url, driver, category_name):
         list: A list of dictionaries, where each dictionary contains data for one product.
     """
     try:
-        driver.get(url)
+        open_page(driver, url)
         # Wait for the product grid to be present on the page before scraping.
         # This is the crucial step for handling dynamically loaded content.
-        wait = WebDriverWait(driver, 15) # Wait for a maximum of 15 seconds
-        product_container_selector_css = 'a.product-tile__link'
-        wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, product_container_selector_css)))
+        # The timeout (15 seconds until enough loads have been seen) is learned,
+        # so the empty page past the end of a category doesn't cost the worst case.
+        TIMEOUTS.wait(driver, 'listing', EC.presence_of_element_located((By.CSS_SELECTOR, PRODUCT_CONTAINER_SELECTOR)), 15)
+        RESOURCE_BLOCKER.report_page(driver, url)
     except TimeoutException:
         print(f"Timed out waiting for page content to load at {url}. It's possible there are no products on this page.")
         return []
@@ -62,23 +102,130 @@ def scrape_aldi_page(url, driver, category_name):
         return []
 
     # Get the page source after JavaScript has rendered the content.
-    soup = BeautifulSoup(driver.page_source, 'html.parser')
+    html = driver.page_source
+    record_page(driver, html)
+    return parse_aldi_products(html, category_name)
+
+def fetch_aldi_page(url, category_name, delta=None, unit=None):
+    """
+    Scrapes a single Aldi page over plain HTTP without starting a browser.
+
+    With a delta store, the ETag/Last-Modified from the last run are sent
+    along and a 304 reuses that run's products for the page.
+
+    Args:
+        url (str): The URL of the Aldi product page to scrape.
+        category_name (str): The name of the category being scraped.
+        delta (DeltaStore): Validators and products from the previous run.
+        unit (str): The page's key in the delta store.
+
+    Returns:
+        list: The parsed products, or None if the page could not be fetched.
+    """
+    validators = delta.validators(unit) if delta else {}
+    result = fetch_conditional(url, timeout=15, **validators)
+    if result is None:
+        return None
+    if result['status'] == 304:
+        print("Page not modified since the last run, reusing its products.")
+        return delta.not_modified(unit)
+
+    products = parse_aldi_products(result['html'], category_name)
+    if delta:
+        delta.record(unit, products, products, etag=result['etag'], last_modified=result['last_modified'])
+    return products
 
-    # CSS selectors for the product details.
-    product_container_selector = 'a.product-tile__link'
-    product_brand_selector = 'div.product-tile__brandname p'
-    product_name_selector = 'div.product-tile__name p'
-    product_price_selector = 'span.base-price__regular'
-    #product_image_selector = 'img.base-image'
+def scrape_listing_page(url, category_name, page, use_http, get_driver, delta=None, unit=None):
+    """
+    Scrapes one listing page over HTTP when allowed, falling back to Selenium.
+
+    An empty first page over HTTP means the tiles are rendered client-side (or
+    we were served a block page), so the browser takes over for the rest of
+    the category. Past page 1 an empty page is just the end of the category.
+
+    Args:
+        url (str): The URL of the Aldi product page to scrape.
+        category_name (str): The name of the category being scraped.
+        page (int): The page number within the category.
+        use_http (bool): Whether to try a plain HTTP fetch first.
+        get_driver: Called with no arguments for the WebDriver, only when the browser is needed.
+        delta (DeltaStore): Validators and products from the previous run.
+        unit (str): The page's key in the delta store.
+
+    Returns:
+        tuple: The page's products, and whether the next page may be fetched over HTTP.
+    """
+    if use_http:
+        products = fetch_aldi_page(url, category_name, delta, unit)
+        if products is not None and (page > 1 or products):
+            return products, True
+        print("No product tiles over HTTP, falling back to Selenium for this category.")
+
+    return scrape_aldi_page(url, get_driver(), category_name), False
+
+def parse_aldi_products(html, category_name, backend=None):
+    """
+    Parses product tiles out of a rendered or server-sent Aldi listing page.
+
+    Args:
+        html (str): The page HTML.
+        category_name (str): The name of the category being scraped.
+        backend (str): 'lxml' or 'bs4'; defaults to PARSER_BACKEND.
+
+    Returns:
+        list: A list of dictionaries, where each dictionary contains data for one product.
+    """
+    if (backend or PARSER_BACKEND) == 'bs4':
+        return parse_aldi_products_bs4(html, category_name)
+    return parse_aldi_products_lxml(html, category_name)
+
+def first_text(tile, selector, default):
+    """Text of the first match in ``tile``, stripped like BeautifulSoup's get_text(strip=True)"""
+    matches = selector(tile)
+    if not matches:
+        return default
+    return "".join(text.strip() for text in matches[0].xpath('.//text()'))
+
+def parse_aldi_products_lxml(html, category_name):
+    """Parses product tiles with lxml and the precompiled selectors"""
+    try:
+        document = lxml.html.fromstring(html)
+    except ParserError:
+        return []  # empty body
 
-    products = soup.select(product_container_selector)
+    scraped_data = []
+    for product in PRODUCT_CONTAINER_XPATH(document):
+        try:
+            brand = first_text(product, PRODUCT_BRAND_XPATH, '')
+            name = first_text(product, PRODUCT_NAME_XPATH, 'N/A')
+            price = first_text(product, PRODUCT_PRICE_XPATH, 'N/A')
+
+            # Combine brand and name if brand exists
+            full_name = f"{brand} {name}" if brand else name
+
+            scraped_data.append({
+                'category': category_name,
+                'name': full_name.strip(),
+                'price': price
+            })
+        except Exception as e:
+            print(f"Error parsing a product: {e}")
+            continue
+
+    return scraped_data
+
+def parse_aldi_products_bs4(html, category_name):
+    """Parses product tiles with BeautifulSoup (compatibility mode)"""
+    soup = BeautifulSoup(html, 'lxml')
+
+    products = soup.select(PRODUCT_CONTAINER_SELECTOR)
     scraped_data = []
 
     for product in products:
         try:
-            brand_element = product.select_one(product_brand_selector)
-            name_element = product.select_one(product_name_selector)
-            price_element = product.select_one(product_price_selector)
+            brand_element = product.select_one(PRODUCT_BRAND_SELECTOR)
+            name_element = product.select_one(PRODUCT_NAME_SELECTOR)
+            price_element = product.select_one(PRODUCT_PRICE_SELECTOR)
 
             brand = brand_element.get_text(strip=True) if brand_element else ''
             name = name_element.get_text(strip=True) if name_element else 'N/A'
@@ -98,47 +245,54 @@ def scrape_aldi_page(url, driver, category_name):
 
     return scraped_data
 
-def save_csv_to_both_locations(df, filename):
-    """Save CSV to both local directory and app/public folder"""
-    # Save to local directory
-    local_path = f"{filename}.csv"
-    df.to_csv(local_path, index=False, encoding="utf-8")
-    print(f"✅ Saved to local: {local_path}")
-    
-    # Save to app/public directory
-    public_dir = "../app/public"
-    if not os.path.exists(public_dir):
-        os.makedirs(public_dir, exist_ok=True)
-    
-    public_path = os.path.join(public_dir, f"{filename}.csv")
-    df.to_csv(public_path, index=False, encoding="utf-8")
-    print(f"✅ Saved to public: {public_path}")
-
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Scrape Aldi product listings")
+    parser.add_argument('--resume', action='store_true',
+                        help="Skip pages already saved by an interrupted run")
+    parser.add_argument('--delta', action='store_true',
+                        help="Reuse last run's products for pages and categories that haven't changed")
+    args = parser.parse_args()
+
     # --- CONFIGURATION ---
+    # Point ALDI_BASE_URL at a local fixture server to run without hitting the live site.
+    BASE_URL = os.environ.get('ALDI_BASE_URL', 'https://www.aldi.co.uk').rstrip('/')
     # List of all the base URLs for the categories you want to scrape.
     CATEGORY_URLS = [
-        "https://www.aldi.co.uk/products/fresh-food/k/1588161416978050",
-        "https://www.aldi.co.uk/products/bakery/k/1588161416978049",
-        "https://www.aldi.co.uk/products/chilled-food/k/1588161416978051",
-        "https://www.aldi.co.uk/products/food-cupboard/k/1588161416978053",
-        "https://www.aldi.co.uk/products/drinks/k/1588161416978054",
-        "https://www.aldi.co.uk/products/alcohol/k/1588161416978055",
-        "https://www.aldi.co.uk/products/frozen-food/k/1588161416978056",
-        "https://www.aldi.co.uk/products/vegetarian-plant-based/k/1588161421881163",
-        "https://www.aldi.co.uk/products/baby-toddler/k/1588161416978057",
-        "https://www.aldi.co.uk/products/pet-care/k/1588161416978060"
+        f"{BASE_URL}/products/fresh-food/k/1588161416978050",
+        f"{BASE_URL}/products/bakery/k/1588161416978049",
+        f"{BASE_URL}/products/chilled-food/k/1588161416978051",
+        f"{BASE_URL}/products/food-cupboard/k/1588161416978053",
+        f"{BASE_URL}/products/drinks/k/1588161416978054",
+        f"{BASE_URL}/products/alcohol/k/1588161416978055",
+        f"{BASE_URL}/products/frozen-food/k/1588161416978056",
+        f"{BASE_URL}/products/vegetarian-plant-based/k/1588161421881163",
+        f"{BASE_URL}/products/baby-toddler/k/1588161416978057",
+        f"{BASE_URL}/products/pet-care/k/1588161416978060"
     ]
     OUTPUT_FILE = "aldi.csv"
     # --- END CONFIGURATION ---
 
-    driver = setup_driver()
-    if driver is None:
-        exit() # Exit if the driver could not be initialized.
-        
-    all_products_data = []
+    # The browser is only started if a page can't be scraped over HTTP.
+    driver_pool = DriverPool(setup_driver, size=1, name="Aldi", on_create=RESOURCE_BLOCKER.install)
+    driver = None
+
+    def get_driver():
+        global driver
+        if driver is None:
+            try:
+                driver = driver_pool.acquire()
+            except RuntimeError:
+                exit() # Exit if the driver could not be initialized.
+        return driver
+
+    # Products are written out category by category rather than collected for the end
+    sink = ProductSink('aldi', ['category', 'name', 'price'], dedup_key=['category', 'name', 'price'],
+                       price_field='price')
+    checkpoint = Checkpoint('aldi', resume=args.resume)
+    flush_on_sigterm(lambda: sink.save_partial(checkpoint))
+    delta = DeltaStore('aldi', enabled=args.delta)
     
-    print("Starting the Aldi product scraper for all categories...")
+    print(f"Starting the Aldi product scraper for all categories (fetch mode: {FETCH_MODE})...")
 
     # Loop through each category URL.
     for base_url in CATEGORY_URLS:
@@ -150,29 +304,59 @@ if __name__ == '__main__':
 
         print(f"\n--- Scraping Category: {category_name} ---")
         page = 1
+        use_http = FETCH_MODE == 'http'
+        
+        saved_pages = checkpoint.pages(category_name)
+        category_products = []
+        first_page = []
+        reused = False
         
         while True:
             current_url = f"{base_url}?page={page}"
-            print(f"Scraping page {page}: {current_url}")
-            
-            products_on_page = scrape_aldi_page(current_url, driver, category_name)
+            page_unit = Checkpoint.page_key(category_name, page)
+
+            if page in saved_pages:
+                products_on_page = saved_pages[page]
+                print(f"Page {page} restored from checkpoint ({len(products_on_page)} products)")
+            else:
+                print(f"Scraping page {page}: {current_url}")
+                
+                products_on_page, use_http = scrape_listing_page(current_url, category_name, page, use_http,
+                                                                 get_driver, delta, page_unit)
+
+                # The empty page that ends a category is saved too, so a resumed run knows where it stopped
+                checkpoint.save(page_unit, products_on_page or [])
 
             if not products_on_page:
                 print("No more products found in this category. Moving to the next one.")
                 break
+
+            # An unchanged first page stands in for the whole category (see delta.py)
+            if page == 1:
+                first_page = products_on_page
+                previous = delta.unchanged(category_name, first_page)
+                if previous is not None:
+                    category_products = previous
+                    reused = True
+                    break
             
-            all_products_data.extend(products_on_page)
-            page += 1
-            time.sleep(1) # Be polite to the server
+            category_products.extend(products_on_page)
+            page += 1  # Pacing comes from the shared per-host rate limiter
+
+        if category_products and not reused:
+            delta.record(category_name, first_page, category_products)
+        sink.add(category_products, unit=category_name)
 
     # Close the browser once all categories are scraped.
-    driver.quit()
+    if driver is not None:
+        driver_pool.release(driver)
+    driver_pool.close()
+    close_session()
+    TIMEOUTS.save()
 
-    if all_products_data:
-        df = pd.DataFrame(all_products_data)
-        # Remove duplicate products based on category, combined name, and price
-        df.drop_duplicates(subset=['category', 'name', 'price'], inplace=True)
-        save_csv_to_both_locations(df, "aldi")
+    if sink.close():
         print(f"Files saved: aldi.csv (local) and ../app/public/aldi.csv")
+        checkpoint.clear()
+        delta.save()
     else:
         print("Scraping failed or no products were found across all specified URLs.")
@@ -1,33 +1,53 @@
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
 from concurrent.futures import ThreadPoolExecutor, as_completed
-import threading
 import time
-import pandas as pd
 import re
 import os
 import shutil
+import argparse
+from driver_pool import DriverPool
+from chrome_cache import start_selenium_chrome
+from resource_blocking import ResourceBlocker
+from page_waits import wait_for_content_settled
+from dom_extract import bulk_extract, field
+from xhr_capture import ResponseCapture, price_text
+from resource_blocking import drain_performance_log
+from rate_limit import RATE_LIMITER
+from page_cache import open_page, record_page, set_cache_url
+from checkpoint import Checkpoint, flush_on_sigterm
+from product_sink import ProductSink
+from delta import DeltaStore
+from adaptive_timeouts import TimeoutPolicy
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode, quote
 
-# Thread-safe list for collecting products
-products_lock = threading.Lock()
-all_products = []
+# Limit to 3 concurrent browsers to be respectful to the server
+MAX_WORKERS = int(os.environ.get('ASDA_MAX_WORKERS', '3'))
+# Page limit when a category's page count can't be read and it is paged serially
+FALLBACK_MAX_PAGES = 50
 
-def clean_price(price_text):
-    """Extract numeric price from price text"""
-    if not price_text:
-        return None
-    # Remove "actual price" prefix and extract price
-    cleaned = re.sub(r'actual price\s*', '', price_text, flags=re.IGNORECASE)
-    price_match = re.search(r'£(\d+\.?\d*)', cleaned)
-    return float(price_match.group(1)) if price_match else None
+PRODUCT_TILE_SELECTOR = "div.product-module"
+
+SEARCH_URL = "https://www.asda.com/groceries/search/*"
+
+# Drops images, fonts and trackers at the network level
+RESOURCE_BLOCKER = ResourceBlocker('asda')
+
+# 'xhr' reads each results page from the search API response, skipping the scroll
+# and DOM scrape; pages without a usable payload fall back to the DOM. 'dom' always scrolls
+FETCH_MODE = os.environ.get('ASDA_FETCH_MODE', 'xhr')
+XHR_CAPTURE = ResponseCapture('asda', [
+    '*algolia*/queries*',
+    '*algolia*/query*',
+    '*asda.com/api/*',
+], mode=FETCH_MODE)
+TIMEOUTS = TimeoutPolicy('asda')
 
 def setup_optimized_driver():
     """Setup Chrome driver optimized for speed and parallel processing"""
-    service = Service()
     options = webdriver.ChromeOptions()
     
     # Performance optimizations
@@ -35,8 +55,6 @@ def setup_optimized_driver():
     options.add_argument("--disable-dev-shm-usage")
     options.add_argument("--disable-extensions")
     options.add_argument("--disable-plugins")
-    options.add_argument("--disable-images")  # Major speed boost
-    options.add_argument("--disable-css")
     options.add_argument("--disable-web-security")
     options.add_argument("--disable-gpu")
     options.add_argument("--disable-background-timer-throttling")
@@ -56,43 +74,56 @@ def setup_optimized_driver():
         "profile.default_content_setting_values.notifications": 2,  # Block notifications
     }
     options.add_experimental_option("prefs", prefs)
+    RESOURCE_BLOCKER.configure_options(options)
+    XHR_CAPTURE.configure_options(options)
     
-    driver = webdriver.Chrome(service=service, options=options)
+    driver = start_selenium_chrome(options)
     driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
     
     return driver
 
+def prepare_driver(driver):
+    """Per-browser DevTools setup run once when the pool starts a browser"""
+    RESOURCE_BLOCKER.install(driver)
+    XHR_CAPTURE.install(driver)
+
+# Browsers are kept warm between categories instead of relaunching Chrome each time
+DRIVER_POOL = DriverPool(setup_optimized_driver, size=MAX_WORKERS, name="ASDA",
+                         on_create=prepare_driver)
+
 def get_all_categories():
     """Get all available categories from ASDA website"""
-    driver = setup_optimized_driver()
+    driver = DRIVER_POOL.acquire()
     wait = WebDriverWait(driver, 10)
     
     try:
         print("📂 Getting all categories...")
         
         # Navigate to ASDA groceries
-        driver.get("https://www.asda.com/groceries/search/*")
-        time.sleep(1.5)
+        open_page(driver, SEARCH_URL)
         
-        # Handle cookies
-        try:
-            accept_cookies = wait.until(
-                EC.element_to_be_clickable((By.ID, "onetrust-accept-btn-handler"))
-            )
-            accept_cookies.click()
-            time.sleep(1)
-        except TimeoutException:
-            pass
+        # Handle cookies (a pooled browser that already accepted them won't see the banner)
+        if not getattr(driver, 'cookies_accepted', False):
+            try:
+                accept_cookies = TIMEOUTS.wait(
+                    driver, 'cookies', EC.element_to_be_clickable((By.ID, "onetrust-accept-btn-handler")), 10
+                )
+                accept_cookies.click()
+                time.sleep(1)
+            except TimeoutException:
+                pass
+            driver.cookies_accepted = True
         
         # Open category dropdown
         category_btn = wait.until(
             EC.element_to_be_clickable((By.CSS_SELECTOR, "button[data-testid='div-category-dropdown']"))
         )
         driver.execute_script("arguments[0].click();", category_btn)
-        time.sleep(1)
         
         # Get all category elements
-        category_elements = driver.find_elements(By.CSS_SELECTOR, "button[data-testid='btn-category-options']")
+        category_elements = wait.until(
+            EC.presence_of_all_elements_located((By.CSS_SELECTOR, "button[data-testid='btn-category-options']"))
+        )
         categories = []
         
         # Skip categories from asda.py
@@ -119,7 +150,7 @@ def get_all_categories():
         print(f"❌ Error getting categories: {e}")
         return []
     finally:
-        driver.quit()
+        DRIVER_POOL.release(driver)
 
 def optimized_scroll_load(driver):
     """Optimized scrolling for parallel processing"""
@@ -149,33 +180,31 @@ def optimized_scroll_load(driver):
     time.sleep(0.5)
 
 def thorough_scroll_load(driver):
-    """More thorough scrolling to match asda.py"""
+    """More thorough scrolling to match asda.py, waiting on rendered tiles rather than fixed sleeps"""
     print("🔄 Loading all products...")
     
-    last_height = driver.execute_script("return document.body.scrollHeight")
     scroll_step = 800  # Keep same as asda.py
     max_scrolls = 50   # Increase from 20 to match thoroughness
     scroll_count = 0
     no_change_count = 0
     
     while scroll_count < max_scrolls and no_change_count < 5:
-        # Scroll down
-        driver.execute_script(f"window.scrollBy(0, {scroll_step});")
-        time.sleep(0.5)  # Match asda.py timing
+        # Scroll down and wait only while new tiles are still rendering
+        wait_for_content_settled(driver, PRODUCT_TILE_SELECTOR, quiet_ms=300, timeout=2, scroll=scroll_step)
         
         # Check if we hit bottom
-        new_height = driver.execute_script("return document.body.scrollHeight")
-        current_position = driver.execute_script("return window.pageYOffset + window.innerHeight")
+        new_height, current_position = driver.execute_script(
+            "return [document.body.scrollHeight, window.pageYOffset + window.innerHeight];"
+        )
         
-        # If we're at the bottom, wait longer for lazy loading
+        # If we're at the bottom, give lazy loading a longer quiet window
         if current_position >= new_height - 100:
-            time.sleep(1.5)  # Longer wait like asda.py
+            wait_for_content_settled(driver, PRODUCT_TILE_SELECTOR, quiet_ms=750, timeout=3)
             final_height = driver.execute_script("return document.body.scrollHeight")
             if final_height == new_height:
                 no_change_count += 1
             else:
                 no_change_count = 0
-            new_height = final_height
         
         # Check for "Load More" buttons like asda.py
         try:
@@ -184,101 +213,56 @@ def thorough_scroll_load(driver):
             for btn in load_more_buttons:
                 if btn.is_displayed() and btn.is_enabled():
                     driver.execute_script("arguments[0].click();", btn)
-                    time.sleep(2)
+                    wait_for_content_settled(driver, PRODUCT_TILE_SELECTOR, timeout=4, require_growth=True)
                     break
         except:
             pass
             
-        last_height = new_height
         scroll_count += 1
     
-    # Final pause and back to top - match asda.py
-    time.sleep(2)
+    # Back to top - match asda.py
     driver.execute_script("window.scrollTo(0, 0);")
-    time.sleep(1)
     print("✅ All products loaded")
 
+# Tile layout for the shared single round-trip extractor - selector chains match asda.py exactly
+PRODUCT_CONTAINER_SELECTOR = "div.product-module, .product-item, .product-card"
+PRODUCT_FIELDS = {
+    'name': field([
+        "a[data-locator='txt-product-name']",
+        "[data-testid='product-name'] a",
+        "h3 a",
+        ".product-name a",
+        ".product-title a",
+        "a[href*='/product/']",
+        ".product-link"
+    ], required=True),
+    # Skip candidates that are just a currency symbol or have no £ at all
+    'price': field([
+        "p[data-locator='txt-product-price']",
+        "[data-testid='product-price']",
+        ".product-price",
+        ".price",
+        ".price-current",
+        ".co-product__price",
+        "[class*='price']"
+    ], required=True, contains='£', min_length=2),
+}
+
 def enhanced_bulk_scrape(driver):
     """Enhanced scraping with debug info like asda.py"""
     print("🚀 Enhanced bulk scraping...")
     
-    # More comprehensive JavaScript with debug output
-    js_script = """
-    var products = [];
-    var productElements = document.querySelectorAll('div.product-module, .product-item, .product-card');
-    
-    console.log('Found ' + productElements.length + ' product containers');
-    
-    productElements.forEach(function(product, index) {
-        var name = null;
-        var price = null;
-        
-        // Comprehensive name selectors - match asda.py exactly
-        var nameSelectors = [
-            "a[data-locator='txt-product-name']",
-            "[data-testid='product-name'] a",
-            "h3 a",
-            ".product-name a",
-            ".product-title a",
-            "a[href*='/product/']",
-            ".product-link"
-        ];
-        
-        for (var i = 0; i < nameSelectors.length; i++) {
-            var nameElem = product.querySelector(nameSelectors[i]);
-            if (nameElem && nameElem.textContent && nameElem.textContent.trim()) {
-                name = nameElem.textContent.trim();
-                break;
-            }
-        }
-        
-        // Comprehensive price selectors - match asda.py exactly
-        var priceSelectors = [
-            "p[data-locator='txt-product-price']",
-            "[data-testid='product-price']",
-            ".product-price",
-            ".price",
-            ".price-current",
-            ".co-product__price",
-            "[class*='price']"
-        ];
-        
-        for (var i = 0; i < priceSelectors.length; i++) {
-            var priceElem = product.querySelector(priceSelectors[i]);
-            if (priceElem && priceElem.textContent && priceElem.textContent.trim()) {
-                var priceText = priceElem.textContent.trim();
-                // Skip if it's just currency symbol or empty
-                if (priceText.length > 1 && priceText.includes('£')) {
-                    price = priceText;
-                    break;
-                }
-            }
-        }
-        
-        if (name && price) {
-            products.push({name: name, price: price, index: index});
-        } else {
-            // Debug info for missed products
-            console.log('Missed product at index ' + index + ':', {
-                name: name,
-                price: price,
-                html: product.innerHTML.substring(0, 200)
-            });
-        }
-    });
-    
-    console.log('Successfully extracted ' + products.length + ' products');
-    return products;
-    """
+    result = bulk_extract(driver, PRODUCT_CONTAINER_SELECTOR, PRODUCT_FIELDS)
+    products_data = result['products']
     
-    # Execute the script
-    products_data = driver.execute_script(js_script)
+    if result['missed']:
+        print(f"   ⚠️ {result['missed']} of {result['total']} product containers had no name or price")
     print(f"📦 Extracted {len(products_data)} products")
     
     return products_data
 
 def get_max_pages(driver, wait):
-    """Get maximum number of pages from pagination"""
+    """Get maximum number of pages from pagination (None if it can't be read)"""
     try:
         # Look for the pagination maximum element
         max_page_element = driver.find_element(By.CSS_SELECTOR, "div[data-locator='txt-pagination-page-maximum']")
@@ -293,150 +277,359 @@ def get_max_pages(driver, wait):
             return max_pages
         else:
             print(f"   Could not parse max pages from: {max_page_text}")
-            return 50  # Fallback
+            return None
             
     except NoSuchElementException:
-        print("   No pagination info found, using default limit")
-        return 50  # Fallback if no pagination found
+        print("   No pagination info found, paging serially")
+        return None
     except Exception as e:
         print(f"   Error getting max pages: {e}")
-        return 50  # Fallback
+        return None
 
-def scrape_single_category(category_info):
-    """Scrape a single category with more thorough processing"""
-    category_name, category_selector = category_info
-    driver = setup_optimized_driver()
-    category_products = []
-    
+def accept_cookies(driver, wait):
+    """Dismiss the cookie banner (a pooled browser that already accepted them won't see it)"""
+    if getattr(driver, 'cookies_accepted', False):
+        return
     try:
-        print(f"Starting category: {category_name}")
-        
-        # Navigate to ASDA groceries
-        driver.get("https://www.asda.com/groceries/search/*")
-        time.sleep(3)  # Longer initial wait like asda.py
-        
-        # Handle cookies
+        accept_cookies = TIMEOUTS.wait(
+            driver, 'cookies', EC.element_to_be_clickable((By.ID, "onetrust-accept-btn-handler")), 10
+        )
+        accept_cookies.click()
+        time.sleep(1.5)  # Longer wait
+    except TimeoutException:
+        pass
+    driver.cookies_accepted = True
+
+def scrape_current_page(driver, category_name):
+    """Scrape the results page the driver is showing, from the search response or the DOM"""
+    record_page(driver)
+    products_data = None
+    messages = None
+    if XHR_CAPTURE.enabled:
+        messages = drain_performance_log(driver)
+        captured = XHR_CAPTURE.collect(driver, messages)
+        if captured:
+            RESOURCE_BLOCKER.report_page(driver, driver.current_url, messages)
+            products_data = [
+                {'name': product['name'], 'price': price_text(product['price'])}
+                for product in captured
+            ]
+            print(f"📡 Read {len(products_data)} products from the search response")
+
+    if products_data is None:
+        # No payload - use the more thorough scrolling
+        thorough_scroll_load(driver)
+        if messages is not None:
+            messages += drain_performance_log(driver)
+        RESOURCE_BLOCKER.report_page(driver, driver.current_url, messages)
+        products_data = enhanced_bulk_scrape(driver)
+
+    # Process scraped data with duplicate checking
+    page_products = []
+    seen_products = set()
+    for product in products_data:
+        # Create unique identifier to avoid duplicates
+        product_id = f"{product['name']}_{product['price']}"
+        if product_id not in seen_products:
+            page_products.append({
+                "Category": category_name,
+                "Name": product["name"],
+                "Price": product["price"]
+            })
+            seen_products.add(product_id)
+    return page_products
+
+def resolve_page_url_template(first_url, second_url):
+    """
+    Work out how the results URL encodes the page number.
+
+    Compares the URLs of pages 1 and 2 of a category and looks for the query
+    parameter that went from missing/1 to 2 while everything else stayed put.
+
+    Returns:
+        tuple: ``(base_url, query_params, page_key)`` for ``build_page_url``,
+        or None if the page isn't addressable by URL.
+    """
+    first, second = urlsplit(first_url), urlsplit(second_url)
+    if (first.scheme, first.netloc, first.path) != (second.scheme, second.netloc, second.path):
+        return None
+
+    first_query = dict(parse_qsl(first.query, keep_blank_values=True))
+    second_query = dict(parse_qsl(second.query, keep_blank_values=True))
+    changed = [key for key in second_query if first_query.get(key) != second_query[key]]
+    if len(changed) != 1 or second_query[changed[0]] != '2':
+        return None
+    page_key = changed[0]
+    if first_query.get(page_key, '1') != '1' or set(first_query) - set(second_query):
+        return None
+
+    return urlunsplit((second.scheme, second.netloc, second.path, '', '')), second_query, page_key
+
+def build_page_url(template, page):
+    """Direct URL of one results page for a template from ``resolve_page_url_template``"""
+    base_url, query_params, page_key = template
+    query = dict(query_params)
+    query[page_key] = str(page)
+    return f"{base_url}?{urlencode(query, quote_via=quote)}"
+
+# URL, pagination text and first tile text; any change means new results are showing
+RESULTS_SIGNATURE_SCRIPT = """
+const tile = document.querySelector(arguments[0]);
+const pagination = Array.from(document.querySelectorAll(arguments[1]), el => el.textContent.trim());
+return [location.href, pagination.join('|'), tile ? tile.textContent.trim().slice(0, 200) : ''];
+"""
+PAGINATION_SELECTOR = "[data-locator^='txt-pagination']"
+
+def results_signature(driver):
+    try:
+        return driver.execute_script(RESULTS_SIGNATURE_SCRIPT, PRODUCT_TILE_SELECTOR, PAGINATION_SELECTOR)
+    except WebDriverException:
+        return None  # mid-navigation
+
+def results_changed(before):
+    """Wait condition: the results signature differs from ``before``"""
+    def changed(driver):
+        now = results_signature(driver)
+        return now is not None and now != before
+    return changed
+
+def click_and_wait_for_results(driver, button, timeout=10):
+    """
+    Click a control that loads a new set of results and wait for them to show.
+
+    The click counts as a navigation for the per-host rate limiter. New results
+    are detected by a change of URL, pagination text or first tile text, which
+    also works when React reuses the tile nodes instead of replacing them.
+    """
+    before = results_signature(driver)
+    RATE_LIMITER.wait(driver.current_url)
+    driver.execute_script("arguments[0].click();", button)
+    if before and before[2]:
         try:
-            wait = WebDriverWait(driver, 10)  # Longer timeout
-            accept_cookies = wait.until(
-                EC.element_to_be_clickable((By.ID, "onetrust-accept-btn-handler"))
-            )
-            accept_cookies.click()
-            time.sleep(1.5)  # Longer wait
+            TIMEOUTS.wait(driver, 'results', results_changed(before), timeout)
         except TimeoutException:
             pass
+    set_cache_url(driver, driver.current_url)
+
+def open_category(driver, wait, category_name, category_selector):
+    """Navigate to the search page and pick a category; returns False if it couldn't be selected"""
+    # Navigate to ASDA groceries
+    open_page(driver, SEARCH_URL)
+
+    accept_cookies(driver, wait)
+
+    # Select category with longer waits
+    try:
+        category_btn = wait.until(
+            EC.element_to_be_clickable((By.CSS_SELECTOR, "button[data-testid='div-category-dropdown']"))
+        )
+        driver.execute_script("arguments[0].click();", category_btn)
         
-        # Select category with longer waits
-        try:
-            category_btn = wait.until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, "button[data-testid='div-category-dropdown']"))
-            )
-            driver.execute_script("arguments[0].click();", category_btn)
-            time.sleep(1)
-            
-            cat_button = driver.find_element(By.XPATH, category_selector)
-            driver.execute_script("arguments[0].click();", cat_button)
-            time.sleep(3)  # Match asda.py timing
-        except Exception as e:
-            print(f"Could not select {category_name}: {e}")
-            return []
+        cat_button = wait.until(EC.presence_of_element_located((By.XPATH, category_selector)))
+        if XHR_CAPTURE.enabled:
+            XHR_CAPTURE.reset(driver)  # drop the unfiltered search results
+        click_and_wait_for_results(driver, cat_button)
+        return True
+    except Exception as e:
+        print(f"Could not select {category_name}: {e}")
+        return False
+
+def click_next_page(driver, category_name, page_count):
+    """Click through to the next results page; returns False when there isn't one"""
+    try:
+        next_btn = driver.find_element(By.CSS_SELECTOR, "button[data-testid='btn-pagination-next']")
+        if not next_btn.is_enabled() or "disabled" in next_btn.get_attribute("class"):
+            print(f"   {category_name}: Next button disabled at page {page_count}")
+            return False
+
+        if XHR_CAPTURE.enabled:
+            XHR_CAPTURE.reset(driver)  # only the next page's response should count
+        click_and_wait_for_results(driver, next_btn)
+        return True
+
+    except (NoSuchElementException, Exception):
+        print(f"   {category_name}: No more pages at page {page_count}")
+        return False
+
+def scrape_single_category(category_info, checkpoint=None, delta=None):
+    """
+    Open a category and scrape its first pages.
+
+    Page 2 is reached by clicking "next" once, which reveals how the page
+    number is encoded in the URL. The remaining pages are then returned as
+    direct URLs for the caller to spread across the pool. If the URL doesn't
+    carry the page number, or the page count can't be read, the category is
+    clicked through serially as before, up to FALLBACK_MAX_PAGES.
+    In delta mode an unchanged page 1 reuses the whole category from the last run.
+
+    Returns:
+        dict: ``name``, ``pages`` (page number -> product rows),
+        ``page_urls`` (page number -> URL still to scrape) and ``reused``.
+    """
+    category_name, category_selector = category_info
+    result = {'name': category_name, 'pages': {}, 'page_urls': {}, 'reused': False}
+    
+    # A resumed run only needs the pages the interrupted one didn't finish
+    if checkpoint:
+        saved_pages = checkpoint.pages(category_name)
+        plan = checkpoint.get(f"{category_name}/plan")
+        if checkpoint.done(f"{category_name}/done") or plan is not None:
+            result['pages'] = saved_pages
+            if plan is not None:
+                result['page_urls'] = {
+                    int(page): url for page, url in plan.items() if int(page) not in saved_pages
+                }
+            print(f"♻️ {category_name}: {len(saved_pages)} pages restored from checkpoint, "
+                  f"{len(result['page_urls'])} still to scrape")
+            return result
+    
+    driver = DRIVER_POOL.acquire()
+    
+    try:
+        print(f"Starting category: {category_name}")
+        wait = WebDriverWait(driver, 10)  # Longer timeout
+        if not open_category(driver, wait, category_name, category_selector):
+            return result
         
         # Wait for initial page load and get max pages
         try:
-            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "div.product-module")))
+            TIMEOUTS.wait(driver, 'listing', EC.presence_of_element_located((By.CSS_SELECTOR, "div.product-module")), 10)
             time.sleep(1)  # Extra wait like asda.py
             max_pages = get_max_pages(driver, wait)
         except TimeoutException:
             print(f"   {category_name}: No products found")
-            return []
+            return result
         
+        # Without a page count nothing is queued by URL; "next" is followed until it runs out
+        page_known = max_pages is not None
+        if not page_known:
+            max_pages = FALLBACK_MAX_PAGES
         page_count = 0
-        products_in_category = 0
+        first_page_url = None
         
         while page_count < max_pages:
             page_count += 1
-            print(f"   {category_name}: Page {page_count}/{max_pages}")
+            print(f"   {category_name}: Page {page_count}/{max_pages if page_known else '?'}")
             
             # Wait for products with longer timeout
             try:
-                wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "div.product-module")))
+                TIMEOUTS.wait(driver, 'listing', EC.presence_of_element_located((By.CSS_SELECTOR, "div.product-module")), 10)
                 time.sleep(1)  # Extra wait for dynamic content
             except TimeoutException:
                 print(f"   {category_name}: No products on page {page_count}")
                 break
             
-            # Use the more thorough scrolling
-            thorough_scroll_load(driver)
-            products_data = enhanced_bulk_scrape(driver)
-            
-            # Process scraped data with duplicate checking
-            page_products = 0
-            seen_products = set()
+            page_products = scrape_current_page(driver, category_name)
+            result['pages'][page_count] = page_products
+            if checkpoint:
+                checkpoint.save(Checkpoint.page_key(category_name, page_count), page_products)
+            print(f"   {category_name}: {len(page_products)} products from page {page_count}")
             
-            for product in products_data:
-                # Create unique identifier to avoid duplicates
-                product_id = f"{product['name']}_{product['price']}"
-                if product_id not in seen_products:
-                    category_products.append({
-                        "Category": category_name,
-                        "Name": product["name"],
-                        "Price": product["price"]
-                    })
-                    seen_products.add(product_id)
-                    page_products += 1
-            
-            products_in_category += page_products
-            print(f"   {category_name}: {page_products} products from page {page_count}")
+            if page_count == 1:
+                first_page_url = driver.current_url
+                previous = delta.unchanged(category_name, page_products) if delta else None
+                if previous is not None:
+                    result['pages'] = {1: previous}
+                    result['reused'] = True
+                    return result
+            elif page_count == 2 and page_known:
+                template = resolve_page_url_template(first_page_url, driver.current_url)
+                if template:
+                    result['page_urls'] = {
+                        page: build_page_url(template, page) for page in range(3, max_pages + 1)
+                    }
+                    print(f"   {category_name}: {len(result['page_urls'])} more pages queued by URL")
+                    if checkpoint:
+                        checkpoint.save(f"{category_name}/plan", result['page_urls'])
+                    break
+                print(f"   {category_name}: Page number not in URL, paging serially")
             
             # Check if we've reached the last page
             if page_count >= max_pages:
                 print(f"   {category_name}: Reached last page ({max_pages})")
                 break
             
-            # Check for next page with longer wait
-            try:
-                next_btn = driver.find_element(By.CSS_SELECTOR, "button[data-testid='btn-pagination-next']")
-                if not next_btn.is_enabled() or "disabled" in next_btn.get_attribute("class"):
-                    print(f"   {category_name}: Next button disabled at page {page_count}")
-                    break
-                
-                driver.execute_script("arguments[0].click();", next_btn)
-                time.sleep(2.5)  # Longer wait between pages like asda.py
-                
-            except (NoSuchElementException, Exception):
-                print(f"   {category_name}: No more pages at page {page_count}")
+            if not click_next_page(driver, category_name, page_count):
                 break
         
-        print(f"{category_name}: Completed - {products_in_category} total products from {page_count} pages")
-        return category_products
+        if checkpoint and not result['page_urls']:
+            checkpoint.save(f"{category_name}/done", page_count)
+        return result
         
     except Exception as e:
         print(f"Error in {category_name}: {e}")
+        return result
+    finally:
+        DRIVER_POOL.release(driver)
+
+def scrape_page_url(result, page, url, checkpoint=None):
+    """
+    Scrape one results page by loading its URL directly in a pooled browser.
+
+    The first empty page marks the end of the category (``result['end_page']``);
+    queued pages after it are skipped without being loaded.
+
+    Returns:
+        list: Product rows, [] for an empty or skipped page, None on failure.
+    """
+    category_name = result['name']
+    if page > result.get('end_page', page):
         return []
+    driver = DRIVER_POOL.acquire()
+    try:
+        wait = WebDriverWait(driver, 10)
+        if XHR_CAPTURE.enabled:
+            XHR_CAPTURE.reset(driver)
+        open_page(driver, url)
+        accept_cookies(driver, wait)
+        
+        try:
+            TIMEOUTS.wait(driver, 'listing', EC.presence_of_element_located((By.CSS_SELECTOR, "div.product-module")), 10)
+            time.sleep(1)  # Extra wait for dynamic content
+        except TimeoutException:
+            print(f"   {category_name}: No products on page {page}, skipping the pages after it")
+            result['end_page'] = min(result.get('end_page', page), page)
+            return []
+        
+        page_products = scrape_current_page(driver, category_name)
+        if checkpoint:
+            checkpoint.save(Checkpoint.page_key(category_name, page), page_products)
+        print(f"   {category_name}: {len(page_products)} products from page {page}")
+        return page_products
+        
+    except Exception as e:
+        print(f"Error in {category_name} page {page}: {e}")
+        return None
     finally:
-        driver.quit()
-
-def save_csv_to_both_locations(df, filename):
-    """Save CSV to both local directory and app/public folder"""
-    # Save to local directory
-    local_path = f"{filename}.csv"
-    df.to_csv(local_path, index=False, encoding="utf-8")
-    print(f"✅ Saved to local: {local_path}")
-    
-    # Save to app/public directory
-    public_dir = "../app/public"
-    if not os.path.exists(public_dir):
-        os.makedirs(public_dir, exist_ok=True)
-    
-    public_path = os.path.join(public_dir, f"{filename}.csv")
-    df.to_csv(public_path, index=False, encoding="utf-8")
-    print(f"✅ Saved to public: {public_path}")
+        DRIVER_POOL.release(driver)
+
+def finish_category(result, delta_store, sink):
+    """Hand a category's pages to the sink in page order, then let them go"""
+    category_products = []
+    for page in sorted(result['pages']):
+        category_products.extend(result['pages'][page])
+    print(f"{result['name']}: Completed - {len(category_products)} total products from {len(result['pages'])} pages")
+    end_page = result.get('end_page')
+    complete = all(page in result['pages'] or (end_page and page > end_page) for page in result['page_urls'])
+    if category_products and complete and not result['reused']:
+        delta_store.record(result['name'], result['pages'].get(1, []), category_products)
+    sink.add(category_products, unit=result['name'])
+    result['pages'] = {}
 
-def scrape_asda_parallel():
+def scrape_asda_parallel(resume=False, delta=False):
     """Main function with parallel processing"""
     print("Starting parallel ASDA scraper...")
     start_time = time.time()
     
+    # Each finished page is saved so an interrupted run can pick up with --resume
+    checkpoint = Checkpoint('asda', resume=resume)
+    # Each category is cleaned, de-duplicated and written out once all its pages are in
+    sink = ProductSink('asda', ['Category', 'Name', 'Price', 'Price_Numeric'],
+                       dedup_key=['Name', 'Price'], required=['Name', 'Price'],
+                       price_field='Price', pounds_field='Price_Numeric', count_by='Category')
+    flush_on_sigterm(lambda: sink.save_partial(checkpoint))
+    delta_store = DeltaStore('asda', enabled=delta)
+    
     # Get all categories dynamically
     categories = get_all_categories()
     
@@ -446,12 +639,13 @@ def scrape_asda_parallel():
     
     print(f"\n🚀 Starting parallel scraping of {len(categories)} categories...")
     
-    # Use ThreadPoolExecutor for parallel processing
-    # Limit to 3 concurrent threads to be respectful to the server
-    with ThreadPoolExecutor(max_workers=3) as executor:
+    # First open every category (in parallel) to scrape its first pages and
+    # resolve direct URLs for the rest
+    category_results = []
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
         # Submit all category scraping tasks
         future_to_category = {
-            executor.submit(scrape_single_category, category): category[0] 
+            executor.submit(scrape_single_category, category, checkpoint, delta_store): category[0] 
             for category in categories
         }
         
@@ -459,52 +653,72 @@ def scrape_asda_parallel():
         for future in as_completed(future_to_category):
             category_name = future_to_category[future]
             try:
-                category_products = future.result()
-                
-                # Thread-safe addition to global products list
-                with products_lock:
-                    all_products.extend(category_products)
-                    
+                category_results.append(future.result())
             except Exception as e:
                 print(f"Category {category_name} failed: {e}")
     
+    # Categories that fit on their first pages are finished already
+    pages_left = {result['name']: len(result['page_urls']) for result in category_results}
+    for result in category_results:
+        if not pages_left[result['name']]:
+            finish_category(result, delta_store, sink)
+    
+    # Then spread the remaining pages of all categories across the pool
+    page_jobs = [
+        (result, page, url)
+        for result in category_results
+        for page, url in result['page_urls'].items()
+    ]
+    if page_jobs:
+        print(f"\n📄 Scraping {len(page_jobs)} more pages by URL across {MAX_WORKERS} browsers...")
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            future_to_page = {
+                executor.submit(scrape_page_url, result, page, url, checkpoint): (result, page)
+                for result, page, url in page_jobs
+            }
+            for future in as_completed(future_to_page):
+                result, page = future_to_page[future]
+                try:
+                    page_products = future.result()
+                    if page_products is not None:
+                        result['pages'][page] = page_products
+                except Exception as e:
+                    print(f"Page {page} of {result['name']} failed: {e}")
+                
+                # A category is written out as soon as its last page is in
+                pages_left[result['name']] -= 1
+                if not pages_left[result['name']]:
+                    finish_category(result, delta_store, sink)
+    
+    DRIVER_POOL.close()
+    TIMEOUTS.save()
+    
     # Process and save results
-    if all_products:
-        df = pd.DataFrame(all_products)
-        
-        # Clean data
-        df = df.dropna(subset=['Name', 'Price'])
-        df = df[df['Name'].str.strip() != '']
-        df = df[df['Price'].str.strip() != '']
-        
-        # Remove duplicates
-        df = df.drop_duplicates(subset=['Name', 'Price'])
-        
-        # Add cleaned price
-        df['Price_Numeric'] = df['Price'].apply(clean_price)
-        
-        # Sort by category and name
-        df = df.sort_values(['Category', 'Name']).reset_index(drop=True)
-        
-        # Save to both locations
-        save_csv_to_both_locations(df, "asda")
+    if sink.close():
+        checkpoint.clear()
+        delta_store.save()
         
         end_time = time.time()
         duration = end_time - start_time
         
         print(f"\n{'='*50}")
         print(f"SCRAPING COMPLETED!")
-        print(f"Total products: {len(df)}")
+        print(f"Total products: {sink.written}")
         print(f"Total time: {duration:.2f} seconds")
-        print(f"Products per second: {len(df)/duration:.2f}")
+        print(f"Products per second: {sink.written/duration:.2f}")
         print(f"Files saved: asda.csv (local) and ../app/public/asda.csv")
         print(f"{'='*50}")
         print(f"📊 By category:")
-        category_counts = df['Category'].value_counts()
-        for category, count in category_counts.items():
+        for category, count in sink.counts.most_common():
             print(f"   {category}: {count}")
     else:
         print("No products found.")
 
 if __name__ == "__main__":
-    scrape_asda_parallel()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Scrape ASDA product listings")
+    parser.add_argument('--resume', action='store_true',
+                        help="Skip categories and pages already saved by an interrupted run")
+    parser.add_argument('--delta', action='store_true',
+                        help="Reuse last run's products for categories whose first page hasn't changed")
+    args = parser.parse_args()
+    scrape_asda_parallel(resume=args.resume, delta=args.delta)
\ No newline at end of file
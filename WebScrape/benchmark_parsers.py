@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+Offline parse-throughput benchmarks over recorded retailer pages.
+
+Every extractor is run over a fixture corpus in benchmarks/fixtures/<retailer>/
+and measured for pages/s, products/s, peak Python memory and allocation
+churn. Results are compared with benchmarks/baseline.json; the script exits
+non-zero when an extractor returns a different number of products, gets
+slower than the baseline by more than --tolerance, or needs that much more
+memory.
+
+A small corpus for every retailer and the baseline measured on it are
+committed, so `python benchmark_parsers.py` runs out of the box. The pages
+use each site's listing markup (the selectors the parsers target) filled
+with products from the published CSVs. To benchmark against live pages
+instead, run the scrapers with SCRAPER_CACHE_MODE=record (see
+page_cache.py), then
+
+    python benchmark_parsers.py --import-cache
+    python benchmark_parsers.py --update-baseline
+
+Throughput depends on the machine, so the committed baseline is a reference
+point: before comparing a change, take a baseline of the unchanged code on
+your own machine with --update-baseline.
+
+Fixtures are gzipped HTML (*.html.gz) or JSON payload lists (*.json.gz).
+The in-browser extractors (Tesco's and ASDA's bulk_extract) need Chrome to
+run, so they are only benchmarked with --browser.
+
+The catalogue stages (price normalisation, pack-size extraction, unit
+prices) run over the committed snapshot of the published CSVs in
+benchmarks/fixtures/catalogue/ (retake it with --import-catalogue), or
+straight over app/public when that folder is missing. There, a "page" is
+one retailer's whole catalogue.
+"""
+import argparse
+import contextlib
+import gc
+import gzip
+import io
+import json
+import os
+import shutil
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from urllib.parse import urlparse
+
+from page_cache import CACHE_DIR
+from xhr_capture import extract_products
+
+BENCHMARK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks")
+FIXTURE_DIR = os.path.join(BENCHMARK_DIR, "fixtures")
+BASELINE_PATH = os.path.join(BENCHMARK_DIR, "baseline.json")
+CATALOGUE_DIR = os.path.join(FIXTURE_DIR, "catalogue")
+PUBLIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app", "public")
+
+# Allowed slowdown / memory growth against the baseline
+DEFAULT_TOLERANCE = 0.25
+DEFAULT_REPEATS = 5
+# A small corpus is looped within each timed pass until it takes at least this long
+MIN_PASS_SECONDS = 0.25
+# Full runs taken for a new baseline; each extractor keeps its median run
+BASELINE_RUNS = 5
+
+RETAILER_HOSTS = {
+    'www.aldi.co.uk': 'aldi',
+    'www.tesco.com': 'tesco',
+    'www.sainsburys.co.uk': 'sainsburys',
+    'groceries.morrisons.com': 'morrisons',
+    'www.asda.com': 'asda',
+}
+
+def load_fixtures(retailer, kind):
+    """Decoded fixture bodies for one retailer: kind 'html' gives strings, 'json' payload lists"""
+    directory = os.path.join(FIXTURE_DIR, retailer)
+    if not os.path.isdir(directory):
+        return []
+    fixtures = []
+    for filename in sorted(os.listdir(directory)):
+        path = os.path.join(directory, filename)
+        opener = gzip.open if filename.endswith(".gz") else open
+        name = filename[:-3] if filename.endswith(".gz") else filename
+        if not name.endswith(f".{kind}"):
+            continue
+        with opener(path, "rt", encoding="utf-8") as f:
+            fixtures.append(json.load(f) if kind == 'json' else f.read())
+    return fixtures
+
+def import_page_cache(cache_dir=CACHE_DIR):
+    """Copy pages recorded by a SCRAPER_CACHE_MODE=record run into the fixture corpus"""
+    imported = 0
+    for root, _, files in os.walk(cache_dir):
+        for filename in files:
+            if not filename.endswith(".json.gz"):
+                continue
+            try:
+                with gzip.open(os.path.join(root, filename), "rt", encoding="utf-8") as f:
+                    entry = json.load(f)
+            except (OSError, ValueError, EOFError):
+                continue
+            retailer = RETAILER_HOSTS.get(urlparse(entry.get('url', '')).netloc)
+            if not retailer or not entry.get('body'):
+                continue
+            kind = 'json' if entry['variant'] == 'xhr' else 'html'
+            directory = os.path.join(FIXTURE_DIR, retailer)
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"{filename[:12]}-{entry['variant']}.{kind}.gz")
+            with gzip.open(path, "wt", encoding="utf-8") as f:
+                if kind == 'json':
+                    json.dump(entry['body'], f)
+                else:
+                    f.write(entry['body'])
+            imported += 1
+    print(f"📼 Imported {imported} recorded pages into {FIXTURE_DIR}")
+    return imported
+
+def import_catalogue(public_dir=PUBLIC_DIR):
+    """Snapshot the published retailer CSVs as the catalogue-stage fixtures"""
+    from columnar_export import RETAILER_COLUMNS
+
+    os.makedirs(CATALOGUE_DIR, exist_ok=True)
+    imported = 0
+    for retailer in RETAILER_COLUMNS:
+        path = os.path.join(public_dir, f"{retailer}.csv")
+        if not os.path.exists(path):
+            continue
+        with open(path, "rb") as src, gzip.open(os.path.join(CATALOGUE_DIR, f"{retailer}.csv.gz"), "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        imported += 1
+    print(f"📼 Imported {imported} retailer CSVs into {CATALOGUE_DIR}")
+    return imported
+
+def load_catalogue():
+    """Each retailer's snapshot (or published CSV, without one) as a DataFrame with the shared Parquet columns"""
+    from columnar_export import RETAILER_COLUMNS, load_retailer_csv
+
+    if os.path.isdir(CATALOGUE_DIR):
+        paths = [os.path.join(CATALOGUE_DIR, f"{retailer}.csv.gz") for retailer in RETAILER_COLUMNS]
+    else:
+        print(f"ℹ️ No catalogue snapshot - using the CSVs in {PUBLIC_DIR}")
+        paths = [os.path.join(PUBLIC_DIR, f"{retailer}.csv") for retailer in RETAILER_COLUMNS]
+    return [
+        load_retailer_csv(retailer, path)
+        for retailer, path in zip(RETAILER_COLUMNS, paths)
+        if os.path.exists(path)
+    ]
+
+def measure(parse, fixtures, repeats=DEFAULT_REPEATS):
+    """
+    Time ``parse`` over every fixture, best of ``repeats`` passes.
+
+    Each pass goes over the corpus as many times as it takes to last
+    MIN_PASS_SECONDS, so timer noise doesn't dominate small corpora.
+
+    Returns:
+        dict: pages, products, seconds, pages_per_sec, products_per_sec,
+        peak_kb (tracemalloc peak during one pass) and gc_collections
+        (generation-0 collections during one pass, a proxy for allocation churn).
+    """
+    products = sum(len(parse(fixture)) for fixture in fixtures)  # warm-up and product count
+
+    best = None
+    for _ in range(repeats):
+        loops = 0
+        start = time.perf_counter()
+        while not loops or time.perf_counter() - start < MIN_PASS_SECONDS:
+            for fixture in fixtures:
+                parse(fixture)
+            loops += 1
+        elapsed = (time.perf_counter() - start) / loops
+        best = elapsed if best is None else min(best, elapsed)
+
+    gc.collect()
+    collections_before = gc.get_stats()[0]['collections']
+    tracemalloc.start()
+    for fixture in fixtures:
+        parse(fixture)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    collections = gc.get_stats()[0]['collections'] - collections_before
+
+    best = max(best, 1e-9)
+    return {
+        'pages': len(fixtures),
+        'products': products,
+        'seconds': round(best, 6),
+        'pages_per_sec': round(len(fixtures) / best, 2),
+        'products_per_sec': round(products / best, 2),
+        'peak_kb': round(peak / 1024, 1),
+        'gc_collections': collections,
+    }
+
+def quiet(parse):
+    """``parse`` with its progress prints discarded, so they don't flood the output (or the timings)"""
+    def run(fixture):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return parse(fixture)
+    return run
+
+def python_extractors():
+    """(name, retailer, fixture kind, parse function) for the extractors that run without a browser"""
+    from aldi import parse_aldi_products
+    from sainsburys import parse_listing_page
+
+    return [
+        ('aldi.parse_aldi_products', 'aldi', 'html',
+         lambda html: parse_aldi_products(html, "Benchmark", backend='lxml')),
+        ('aldi.parse_aldi_products[bs4]', 'aldi', 'html',
+         lambda html: parse_aldi_products(html, "Benchmark", backend='bs4')),
+        ('sainsburys.parse_listing_page', 'sainsburys', 'html',
+         quiet(lambda html: parse_listing_page(html, "Benchmark")[1])),
+        ('morrisons.extract_products', 'morrisons', 'json',
+         lambda payloads: [product for payload in payloads for product in extract_products(payload)]),
+        ('asda.extract_products', 'asda', 'json',
+         lambda payloads: [product for payload in payloads for product in extract_products(payload)]),
+    ]
+
+def catalogue_stages():
+    """(name, stage) for the vectorised stages run over a whole catalogue DataFrame"""
+    from price_normalisation import normalise_prices
+    from unit_pricing import extract_pack_sizes, unit_prices
+
+    return [
+        ('catalogue.normalise_prices', lambda df: normalise_prices(df['price'])),
+        ('catalogue.extract_pack_sizes', lambda df: extract_pack_sizes(df['name'])),
+        ('catalogue.unit_prices', lambda df: unit_prices(df, df['price_pence'])),
+    ]
+
+def run_browser_benchmarks(repeats):
+    """Time the in-page extractors on file:// copies of the HTML fixtures (needs Chrome)"""
+    import tempfile
+    from selenium import webdriver
+    from chrome_cache import start_selenium_chrome
+    from dom_extract import bulk_extract
+    from page_cache import SCRIPT_PATTERN
+    import asda
+    import tesco
+
+    extractors = [
+        ('tesco.bulk_extract', 'tesco',
+         lambda driver: bulk_extract(driver, "div[class*='verticalTile']", tesco.PRODUCT_FIELDS)['products']),
+        ('asda.enhanced_bulk_scrape', 'asda', asda.enhanced_bulk_scrape),
+    ]
+
+    options = webdriver.ChromeOptions()
+    options.add_argument('--headless')
+    driver = start_selenium_chrome(options)
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            for name, retailer, extract in extractors:
+                pages = []
+                for index, html in enumerate(load_fixtures(retailer, 'html')):
+                    path = os.path.join(directory, f"{retailer}-{index}.html")
+                    with open(path, "w", encoding="utf-8") as f:
+                        f.write(SCRIPT_PATTERN.sub('', html))
+                    pages.append(Path(path).resolve().as_uri())
+                if not pages:
+                    continue
+
+                products = 0
+                best = None
+                for _ in range(repeats):
+                    elapsed = 0.0
+                    products = 0
+                    for page in pages:
+                        driver.get(page)
+                        start = time.perf_counter()
+                        products += len(extract(driver))
+                        elapsed += time.perf_counter() - start
+                    best = elapsed if best is None else min(best, elapsed)
+                best = max(best, 1e-9)
+                results[name] = {
+                    'pages': len(pages),
+                    'products': products,
+                    'seconds': round(best, 6),
+                    'pages_per_sec': round(len(pages) / best, 2),
+                    'products_per_sec': round(products / best, 2),
+                }
+    finally:
+        driver.quit()
+    return results
+
+def run_benchmarks(repeats=DEFAULT_REPEATS, browser=False):
+    results = {}
+    for name, retailer, kind, parse in python_extractors():
+        fixtures = load_fixtures(retailer, kind)
+        if not fixtures:
+            print(f"⏭️ {name}: no {kind} fixtures for {retailer}")
+            continue
+        results[name] = measure(parse, fixtures, repeats)
+    catalogue = load_catalogue()
+    for name, stage in catalogue_stages():
+        if not catalogue:
+            print(f"⏭️ {name}: no catalogue snapshot or published CSVs")
+            continue
+        results[name] = measure(stage, catalogue, repeats)
+    if browser:
+        results.update(run_browser_benchmarks(repeats))
+    return results
+
+def median_results(runs):
+    """Per extractor, the run with the median pages/s, so one lucky or unlucky run doesn't set the baseline"""
+    merged = {}
+    for name in runs[0]:
+        ranked = sorted((run[name] for run in runs if name in run), key=lambda result: result['pages_per_sec'])
+        merged[name] = ranked[len(ranked) // 2]
+    return merged
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Return a list of regression messages (empty when everything is within tolerance)"""
+    regressions = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if not expected:
+            continue
+        if result['pages'] == expected['pages'] and result['products'] != expected['products']:
+            regressions.append(f"{name}: {result['products']} products, baseline has {expected['products']}")
+        if result['pages_per_sec'] < expected['pages_per_sec'] * (1 - tolerance):
+            regressions.append(f"{name}: {result['pages_per_sec']} pages/s, baseline {expected['pages_per_sec']}")
+        if expected.get('peak_kb') and result.get('peak_kb', 0) > expected['peak_kb'] * (1 + tolerance):
+            regressions.append(f"{name}: peak {result['peak_kb']} KB, baseline {expected['peak_kb']} KB")
+    return regressions
+
+def print_results(results, baseline):
+    print(f"\n{'extractor':34} {'pages':>6} {'products':>9} {'pages/s':>10} {'products/s':>12} {'peak KB':>9} {'gc':>5}")
+    for name, result in results.items():
+        expected = baseline.get(name, {})
+        change = ""
+        if expected.get('pages_per_sec'):
+            change = f"  ({result['pages_per_sec'] / expected['pages_per_sec'] - 1:+.0%} vs baseline)"
+        print(f"{name:34} {result['pages']:>6} {result['products']:>9} {result['pages_per_sec']:>10} "
+              f"{result['products_per_sec']:>12} {result.get('peak_kb', '-'):>9} {result.get('gc_collections', '-'):>5}{change}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the product extractors on recorded pages")
+    parser.add_argument("--import-cache", action="store_true",
+                        help="Copy pages recorded with SCRAPER_CACHE_MODE=record into the fixture corpus first")
+    parser.add_argument("--import-catalogue", action="store_true",
+                        help="Snapshot the CSVs in app/public for the catalogue-stage benchmarks first")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Store this run's results as the new baseline")
+    parser.add_argument("--browser", action="store_true",
+                        help="Also benchmark the in-page extractors in headless Chrome")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS,
+                        help="Timed passes per extractor; the fastest is kept")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed slowdown or memory growth against the baseline (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    if args.import_cache:
+        import_page_cache()
+    if args.import_catalogue:
+        import_catalogue()
+
+    results = run_benchmarks(repeats=args.repeats, browser=args.browser)
+    if not results:
+        print("❌ No fixtures found - record some pages and run with --import-cache")
+        sys.exit(1)
+
+    baseline = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+
+    if args.update_baseline:
+        print(f"\n⏱️ Taking {BASELINE_RUNS - 1} more runs for the baseline...")
+        runs = [results] + [run_benchmarks(repeats=args.repeats, browser=args.browser)
+                            for _ in range(BASELINE_RUNS - 1)]
+        baseline.update(median_results(runs))
+        os.makedirs(BENCHMARK_DIR, exist_ok=True)
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"\n💾 Baseline updated: {BASELINE_PATH}")
+        sys.exit(0)
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print("\n❌ Regressions against the baseline:")
+        for message in regressions:
+            print(f"   {message}")
+        sys.exit(1)
+    print("\n✅ No regressions" if baseline else "\nℹ️ No baseline yet - run with --update-baseline")
@@ -0,0 +1,145 @@
+"""
+Checkpoint files for long scraper runs.
+
+Scrapers used to keep every product in memory until the very end, so a
+timeout or a Chrome crash threw the whole run away. Each finished unit of
+work (a category, or one page of a category) is now written to its own
+small JSON file as soon as it completes. Running a scraper with --resume
+loads those files and skips the units they cover; a normal run starts from
+scratch and removes the checkpoints once the final CSV has been written.
+
+Checkpoints live in WebScrape/.checkpoints/<retailer>/ unless
+SCRAPER_CHECKPOINT_DIR points elsewhere.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import signal
+import threading
+from datetime import datetime
+
+CHECKPOINT_DIR = os.environ.get(
+    'SCRAPER_CHECKPOINT_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".checkpoints")
+)
+
+class Checkpoint:
+    """
+    Completed units of one scraper run, mirrored to disk.
+
+    Args:
+        retailer (str): Name of the scraper; each gets its own directory.
+        resume (bool): Load the units saved by a previous, interrupted run
+            instead of clearing them.
+        directory (str): Base directory for checkpoint files.
+    """
+
+    def __init__(self, retailer, resume=False, directory=None):
+        self.retailer = retailer
+        self.resume = resume
+        self.directory = os.path.join(directory or CHECKPOINT_DIR, retailer)
+        self._units = {}
+        self._lock = threading.Lock()
+
+        if resume:
+            self._load_all()
+            if self._units:
+                print(f"♻️ {retailer}: resuming with {len(self._units)} completed units from {self.directory}")
+        else:
+            self.clear()
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(key.encode("utf-8")).hexdigest()[:20] + ".json")
+
+    def _load_all(self):
+        if not os.path.isdir(self.directory):
+            return
+        for filename in sorted(os.listdir(self.directory)):
+            if not filename.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.directory, filename), "r", encoding="utf-8") as f:
+                    unit = json.load(f)
+                self._units[unit['key']] = unit['data']
+            except (OSError, ValueError, KeyError):
+                continue  # a half-written file from a crash; that unit is simply redone
+
+    def done(self, key):
+        """True if ``key`` was completed by this run or the one being resumed"""
+        with self._lock:
+            return key in self._units
+
+    def get(self, key, default=None):
+        with self._lock:
+            return self._units.get(key, default)
+
+    def save(self, key, data):
+        """Record a completed unit (products list or any JSON-able value) and write it to disk"""
+        with self._lock:
+            self._units[key] = data
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({'key': key, 'saved_at': datetime.now().isoformat(), 'data': data}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️ Could not write checkpoint {path}: {e}")
+
+    @staticmethod
+    def page_key(unit, page):
+        """Key for one page of a category, e.g. 'Bakery/page:3'"""
+        return f"{unit}/page:{page}"
+
+    def pages(self, unit):
+        """Saved pages of ``unit`` as {page number: data}"""
+        prefix = f"{unit}/page:"
+        saved = {}
+        for key, data in self.items(prefix):
+            try:
+                saved[int(key[len(prefix):])] = data
+            except ValueError:
+                continue
+        return saved
+
+    def rows(self, skip=()):
+        """Every saved page's product rows, unit by unit in page order, leaving out the units in ``skip``"""
+        by_unit = {}
+        for key, data in self.items():
+            unit, separator, page = key.rpartition("/page:")
+            if separator and page.isdigit() and isinstance(data, list) and unit not in skip:
+                by_unit.setdefault(unit, {})[int(page)] = data
+        return [row for unit in by_unit for page in sorted(by_unit[unit]) for row in by_unit[unit][page]]
+
+    def items(self, prefix=""):
+        """(key, data) pairs for every completed unit whose key starts with ``prefix``"""
+        with self._lock:
+            return [(key, data) for key, data in self._units.items() if key.startswith(prefix)]
+
+    def clear(self):
+        """Forget every checkpoint, e.g. after the final CSV has been written"""
+        with self._lock:
+            self._units = {}
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+def flush_on_sigterm(flush):
+    """
+    Run ``flush`` when SIGTERM arrives (e.g. from run_scraper.py's timeout), then exit.
+
+    Worker threads may be blocked inside the browser, so the process exits
+    with os._exit after flushing instead of waiting for them. Must be called
+    from the main thread.
+    """
+    def handler(signum, frame):
+        print("🛑 SIGTERM received - saving partial results")
+        try:
+            flush()
+        except Exception as e:
+            print(f"⚠️ Partial save failed: {e}")
+        finally:
+            os._exit(128 + signum)
+
+    signal.signal(signal.SIGTERM, handler)
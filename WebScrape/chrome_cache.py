@@ -0,0 +1,182 @@
+"""
+On-disk cache of the installed Chrome version and the driver setup that worked last time.
+
+Entries are keyed by the Chrome binary's path, size and mtime, so a browser
+upgrade invalidates them automatically. This lets every scraper skip the
+`google-chrome --version`/registry probes and go straight to the
+chromedriver binary and uc.Chrome strategy that succeeded on the last run.
+"""
+
+import json
+import os
+import shutil
+import threading
+
+CACHE_FILE = os.environ.get(
+    'CHROME_CACHE_FILE',
+    os.path.join(os.path.expanduser("~"), ".cache", "comparegroceryprices", "chrome_cache.json")
+)
+
+CHROME_BINARY_CANDIDATES = [
+    'google-chrome',
+    'google-chrome-stable',
+    'chromium',
+    'chromium-browser',
+    'chrome',
+]
+
+WINDOWS_CHROME_PATHS = [
+    r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+    r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
+    os.path.join(os.environ.get('LOCALAPPDATA', ''), "Google", "Chrome", "Application", "chrome.exe"),
+]
+
+_lock = threading.Lock()
+_memo = {}
+
+def find_chrome_binary():
+    """Return the real path of the installed Chrome binary, or None"""
+    for name in CHROME_BINARY_CANDIDATES:
+        path = shutil.which(name)
+        if path:
+            return os.path.realpath(path)
+    for path in WINDOWS_CHROME_PATHS:
+        if path and os.path.isfile(path):
+            return path
+    return None
+
+def chrome_binary_key():
+    """Identify the installed browser build without running it"""
+    if 'key' in _memo:
+        return _memo['key']
+    key = None
+    path = find_chrome_binary()
+    if path:
+        try:
+            stat = os.stat(path)
+            key = f"{path}|{stat.st_size}|{int(stat.st_mtime)}"
+        except OSError:
+            pass
+    _memo['key'] = key
+    return key
+
+def _read_cache():
+    try:
+        with open(CACHE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _write_cache(data):
+    try:
+        os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+        tmp_path = f"{CACHE_FILE}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, CACHE_FILE)
+    except OSError as e:
+        print(f"Could not write Chrome cache {CACHE_FILE}: {e}")
+
+def load_entry():
+    """Return the cached entry for the installed Chrome build (empty if unknown)"""
+    key = chrome_binary_key()
+    if key is None:
+        return {}
+    with _lock:
+        return dict(_read_cache().get(key, {}))
+
+def update_entry(**fields):
+    """Merge fields into the entry for the installed Chrome build"""
+    key = chrome_binary_key()
+    if key is None:
+        return
+    with _lock:
+        data = _read_cache()
+        # Only the current browser build is worth keeping
+        entry = data.get(key, {})
+        entry.update(fields)
+        _write_cache({key: entry})
+
+def cached_chrome_version(probe):
+    """
+    Return the Chrome major version, running ``probe`` only on a cache miss.
+
+    Args:
+        probe: Zero-argument callable doing the expensive detection; returns an int or None.
+
+    Returns:
+        int: The major version, or None if it could not be detected.
+    """
+    version = load_entry().get('major_version')
+    if version:
+        return version
+    version = probe()
+    if version:
+        update_entry(major_version=version)
+    return version
+
+def get_driver_config(kind):
+    """
+    Return the driver setup that last worked for ``kind`` ('uc' or 'selenium').
+
+    Configs pointing at a chromedriver that has since been deleted are ignored.
+    """
+    config = load_entry().get('driver_configs', {}).get(kind)
+    if not config:
+        return None
+    driver_path = config.get('driver_path')
+    if driver_path and not os.path.isfile(driver_path):
+        return None
+    return config
+
+def save_driver_config(kind, config):
+    """Remember the driver setup that just worked for ``kind``"""
+    configs = load_entry().get('driver_configs', {})
+    configs[kind] = config
+    update_entry(driver_configs=configs)
+
+def clear_driver_config(kind):
+    """Forget a driver setup that stopped working"""
+    configs = load_entry().get('driver_configs', {})
+    if configs.pop(kind, None) is not None:
+        update_entry(driver_configs=configs)
+
+def driver_executable_path(driver):
+    """Best-effort lookup of the chromedriver binary a live driver was started from"""
+    patcher = getattr(driver, 'patcher', None)
+    if patcher is not None and getattr(patcher, 'executable_path', None):
+        return patcher.executable_path
+    service = getattr(driver, 'service', None)
+    if service is not None and getattr(service, 'path', None):
+        return service.path
+    return None
+
+def start_selenium_chrome(options):
+    """
+    Start a plain Selenium Chrome, reusing the chromedriver/browser paths from the last run.
+
+    A cache hit skips the Selenium Manager subprocess that otherwise resolves
+    both paths on every launch.
+    """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+
+    config = get_driver_config('selenium')
+    if config:
+        try:
+            browser_path = config.get('browser_path')
+            if browser_path and os.path.isfile(browser_path) and not options.binary_location:
+                options.binary_location = browser_path
+            return webdriver.Chrome(service=Service(executable_path=config['driver_path']), options=options)
+        except Exception as e:
+            print(f"Cached chromedriver config failed, resolving again: {e}")
+            clear_driver_config('selenium')
+
+    driver = webdriver.Chrome(service=Service(), options=options)
+    driver_path = driver_executable_path(driver)
+    if driver_path:
+        save_driver_config('selenium', {
+            'driver_path': driver_path,
+            'browser_path': options.binary_location or None,
+        })
+    return driver
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Parquet copies of the published product CSVs.
+
+Every consumer of the CSVs (analytics, the matching jobs) re-tokenises five
+text files and re-parses text prices. Each retailer's CSV is also written as
+<retailer>.parquet with one schema for every retailer: dictionary-encoded
+retailer and category columns, the raw price text next to integer pence
+(normalised over the whole file in one pass, see price_normalisation.py),
+the pack size and price per kg / litre / item parsed from the name (see
+unit_pricing.py), and the time of the scrape. products.parquet combines all retailers, so a
+reader can load only the columns it needs for the full catalogue in one call:
+
+    read_products(columns=['retailer', 'name', 'price_pence'])
+
+ProductSink writes a retailer's file when it publishes the CSV. Running this
+script rebuilds every file from the CSVs in app/public; with --combined-only
+it just rebuilds products.parquet, as the product-matching workflow does after
+each scraper run. pyarrow is optional;
+without it the export is skipped and the CSVs are published as before.
+"""
+
+import argparse
+import os
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from price_normalisation import normalise_prices
+from unit_pricing import extract_pack_sizes, unit_prices
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # the CSVs are still published without it
+    pa = pq = None
+
+PUBLIC_DIR = "../app/public"
+COMBINED_NAME = "products.parquet"
+COMPRESSION = "zstd"
+
+# CSV header -> column name in the Parquet files, per retailer
+RETAILER_COLUMNS = {
+    'aldi': {'category': 'category', 'name': 'name', 'price': 'price'},
+    'asda': {'Category': 'category', 'Name': 'name', 'Price': 'price'},
+    'morrisons': {'category': 'category', 'name': 'name', 'price': 'price'},
+    'sainsburys': {'Category': 'category', 'Product Name': 'name', 'Price': 'price'},
+    'tesco': {'Category': 'category', 'Name': 'name', 'Price': 'price', 'URL': 'url', 'Unit Price': 'unit_price'},
+}
+COLUMNS = ['retailer', 'category', 'name', 'price', 'price_pence', 'multibuy_qty', 'multibuy_pence', 'promo',
+           'pack_count', 'item_quantity', 'base_unit', 'total_quantity', 'unit_price_pence', 'unit_basis',
+           'url', 'unit_price', 'scraped_at']
+
+def schema():
+    return pa.schema([
+        ('retailer', pa.dictionary(pa.int8(), pa.string())),
+        ('category', pa.dictionary(pa.int32(), pa.string())),
+        ('name', pa.string()),
+        ('price', pa.string()),
+        ('price_pence', pa.int32()),
+        ('multibuy_qty', pa.int16()),
+        ('multibuy_pence', pa.int32()),
+        ('promo', pa.bool_()),
+        ('pack_count', pa.int32()),
+        ('item_quantity', pa.float64()),
+        ('base_unit', pa.dictionary(pa.int8(), pa.string())),
+        ('total_quantity', pa.float64()),
+        ('unit_price_pence', pa.int32()),
+        ('unit_basis', pa.dictionary(pa.int8(), pa.string())),
+        ('url', pa.string()),
+        ('unit_price', pa.string()),
+        ('scraped_at', pa.timestamp('ms', tz='UTC')),
+    ])
+
+def load_retailer_csv(retailer, path, scraped_at=None):
+    """
+    One retailer's CSV as a DataFrame with the shared columns.
+
+    Args:
+        scraped_at (datetime): Defaults to the CSV's modification time.
+    """
+    if scraped_at is None:
+        scraped_at = datetime.fromtimestamp(os.path.getmtime(path), tz=timezone.utc)
+    columns = RETAILER_COLUMNS[retailer]
+    df = pd.read_csv(path, dtype=str, usecols=lambda column: column in columns)
+    df = df.rename(columns=columns)
+    for column in COLUMNS:
+        if column not in df.columns:
+            df[column] = None
+    df['retailer'] = retailer
+    prices = normalise_prices(df['price'])
+    sizes = extract_pack_sizes(df['name'])
+    for stage in (prices, sizes, unit_prices(sizes, prices['price_pence'])):
+        for column in stage.columns:
+            df[column] = stage[column]
+    df['scraped_at'] = pd.Timestamp(scraped_at).tz_convert('UTC').floor('s')
+    return df[COLUMNS]
+
+def write_table(df, path):
+    table = pa.Table.from_pandas(df, schema=schema(), preserve_index=False)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    pq.write_table(table, tmp_path, compression=COMPRESSION)
+    os.replace(tmp_path, path)
+    return path
+
+def export_retailer(retailer, csv_path=None, scraped_at=None, directories=(".", PUBLIC_DIR)):
+    """
+    Write <retailer>.parquet next to each published copy of <retailer>.csv.
+
+    Returns:
+        list: Paths written (empty if pyarrow isn't installed).
+    """
+    if pa is None:
+        print("⏭️ pyarrow not installed - skipping Parquet export")
+        return []
+    df = load_retailer_csv(retailer, csv_path or f"{retailer}.csv", scraped_at)
+    written = []
+    for directory in directories:
+        os.makedirs(directory, exist_ok=True)
+        written.append(write_table(df, os.path.join(directory, f"{retailer}.parquet")))
+    print(f"✅ Saved Parquet: {', '.join(written)} ({len(df)} rows)")
+    return written
+
+def export_combined(directory=PUBLIC_DIR):
+    """Concatenate every <retailer>.parquet in ``directory`` into products.parquet"""
+    if pa is None:
+        print("⏭️ pyarrow not installed - skipping Parquet export")
+        return None
+    paths = [os.path.join(directory, f"{retailer}.parquet") for retailer in RETAILER_COLUMNS]
+    tables = [pq.read_table(path, schema=schema()) for path in paths if os.path.exists(path)]
+    if not tables:
+        return None
+    combined = pa.concat_tables(tables).unify_dictionaries()
+    path = os.path.join(directory, COMBINED_NAME)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    pq.write_table(combined, tmp_path, compression=COMPRESSION)
+    os.replace(tmp_path, path)
+    print(f"✅ Saved combined Parquet: {path} ({combined.num_rows} rows from {len(tables)} retailers)")
+    return path
+
+def read_products(path=os.path.join(PUBLIC_DIR, COMBINED_NAME), columns=None, retailers=None):
+    """
+    Load the combined file as a DataFrame, reading only ``columns``.
+
+    Args:
+        retailers (list): Only load these retailers' rows (filtered while reading).
+    """
+    filters = [('retailer', 'in', list(retailers))] if retailers else None
+    return pd.read_parquet(path, columns=columns, filters=filters)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the Parquet exports from the published CSVs")
+    parser.add_argument("--directory", default=PUBLIC_DIR,
+                        help="Folder holding the retailer CSVs; the Parquet files are written there too")
+    parser.add_argument("--combined-only", action="store_true",
+                        help=f"Only rebuild {COMBINED_NAME} from the retailer Parquet files the scrapers wrote")
+    args = parser.parse_args()
+
+    if not args.combined_only:
+        for retailer in RETAILER_COLUMNS:
+            csv_path = os.path.join(args.directory, f"{retailer}.csv")
+            if os.path.exists(csv_path):
+                export_retailer(retailer, csv_path, directories=(args.directory,))
+            else:
+                print(f"⏭️ {retailer}: no {csv_path}")
+    export_combined(args.directory)
@@ -0,0 +1,142 @@
+"""
+Change detection between scraper runs.
+
+Most prices don't move from one run to the next, yet every run re-scraped
+every page. With delta mode on (--delta), each scraper still loads the
+first page of a category, fingerprints it by product names/IDs and prices,
+and compares that with the previous run. If it matches, the rest of the
+category is not scraped and last run's rows are carried over. Where the
+retailer sends ETag/Last-Modified (Aldi's plain HTTP pages), a conditional
+request lets the server answer 304 and the page isn't even downloaded.
+
+The first page is only a proxy for the whole category: prices on later
+pages can change while it stays the same. So rows are carried over for one
+run at most. A category reused from the last run is always fully re-scraped
+on the next, which bounds stale later pages to a single run. Independently,
+nothing older than DELTA_MAX_AGE_DAYS days (default 7) is reused.
+
+State lives in WebScrape/.delta/<retailer>.json unless SCRAPER_STATE_DIR
+points elsewhere.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+
+STATE_DIR = os.environ.get(
+    'SCRAPER_STATE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".delta")
+)
+MAX_AGE_DAYS = float(os.environ.get('DELTA_MAX_AGE_DAYS', '7'))
+
+def fingerprint(products):
+    """Order-insensitive hash of a page's product rows (all fields, e.g. name, URL and price)"""
+    rows = sorted(json.dumps(product, sort_keys=True, ensure_ascii=False) for product in products)
+    return hashlib.sha1("\n".join(rows).encode("utf-8")).hexdigest()
+
+class DeltaStore:
+    """
+    Fingerprints, HTTP validators and rows from the previous run, per unit.
+
+    Args:
+        retailer (str): Scraper name; one state file per retailer.
+        enabled (bool): When False nothing is skipped, but state is still
+            recorded so the next --delta run has something to compare with.
+    """
+
+    def __init__(self, retailer, enabled=False, directory=None):
+        self.retailer = retailer
+        self.enabled = enabled
+        self.path = os.path.join(directory or STATE_DIR, f"{retailer}.json")
+        self._previous = self._load()
+        self._current = {}
+        self._lock = threading.Lock()
+        self.skipped = 0
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _fresh(self, entry):
+        try:
+            scraped_at = datetime.fromisoformat(entry['scraped_at'])
+        except (KeyError, TypeError, ValueError):
+            return False
+        return datetime.now() - scraped_at < timedelta(days=MAX_AGE_DAYS)
+
+    def unchanged(self, unit, first_page_products):
+        """
+        Return last run's rows for ``unit`` if its first page hasn't changed, else None.
+
+        A hit is carried over into this run's state marked as such, so the
+        next run scrapes the unit in full instead of reusing it again.
+        """
+        if not self.enabled or not first_page_products:
+            return None
+        entry = self._previous.get(unit)
+        if not entry or entry.get('carried_over') or not self._fresh(entry):
+            return None
+        if entry.get('fingerprint') != fingerprint(first_page_products):
+            return None
+        with self._lock:
+            self._current[unit] = {**entry, 'carried_over': True}
+            self.skipped += 1
+        print(f"⏭️ {self.retailer} {unit}: first page unchanged, reusing {len(entry['products'])} rows from last run")
+        return entry['products']
+
+    def validators(self, unit):
+        """ETag/Last-Modified from the last run, for a conditional request"""
+        if not self.enabled:
+            return {}
+        entry = self._previous.get(unit) or {}
+        if not self._fresh(entry):
+            return {}
+        return {key: entry[key] for key in ('etag', 'last_modified') if entry.get(key)}
+
+    def not_modified(self, unit):
+        """Reuse last run's rows after a 304 Not Modified"""
+        entry = self._previous.get(unit)
+        with self._lock:
+            self._current[unit] = entry
+            self.skipped += 1
+        return entry['products']
+
+    def record(self, unit, first_page_products, products, etag=None, last_modified=None):
+        """Store what this run scraped for ``unit``"""
+        entry = {
+            'fingerprint': fingerprint(first_page_products),
+            'products': products,
+            'scraped_at': datetime.now().isoformat(),
+        }
+        if etag:
+            entry['etag'] = etag
+        if last_modified:
+            entry['last_modified'] = last_modified
+        with self._lock:
+            self._current[unit] = entry
+
+    def save(self):
+        """
+        Write this run's state.
+
+        Units not seen this run (e.g. a category that failed) keep their old
+        entry, so one bad run doesn't wipe the history.
+        """
+        state = dict(self._previous)
+        with self._lock:
+            state.update(self._current)
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️ Could not write delta state {self.path}: {e}")
+        if self.enabled:
+            print(f"⏭️ {self.retailer}: {self.skipped} units reused from the last run")
@@ -0,0 +1,211 @@
+"""
+Single round-trip extraction of product tiles.
+
+Looking fields up with ``tile.find_element(...)`` costs one WebDriver HTTP
+call per selector tried, per tile. Here the whole page is read by one
+``execute_script`` call: the browser walks every tile, tries each field's
+selector chain in order and returns plain dicts.
+
+For infinite-scroll listings a tile harvester can be installed instead: a
+MutationObserver queues tiles as they render and each drain returns only
+the tiles added since the previous one.
+"""
+
+# Shared in-page helper: try a field's selector chain inside one tile
+READ_FIELD_JS = """
+function readField(tile, field) {
+    for (var i = 0; i < field.selectors.length; i++) {
+        var elem = field.selectors[i] ? tile.querySelector(field.selectors[i]) : tile;
+        if (!elem) continue;
+
+        var value;
+        if (field.attr === 'href') {
+            value = elem.href || elem.getAttribute('href');
+        } else if (field.attr) {
+            value = elem.getAttribute(field.attr);
+        } else if (field.text === 'innerText') {
+            value = elem.innerText;
+        } else {
+            value = elem.textContent;
+        }
+        if (!value) continue;
+
+        value = value.trim();
+        if (!value) continue;
+        if (field.contains && value.indexOf(field.contains) === -1) continue;
+        if (field.min_length && value.length < field.min_length) continue;
+        return value;
+    }
+    return null;
+}
+
+function readTile(tile, fields) {
+    var record = {};
+    var complete = true;
+    for (var name in fields) {
+        var value = readField(tile, fields[name]);
+        record[name] = value;
+        if (value === null && fields[name].required) {
+            complete = false;
+        }
+    }
+    return complete ? record : null;
+}
+"""
+
+BULK_EXTRACT_SCRIPT = READ_FIELD_JS + """
+var config = arguments[0];
+var tiles = document.querySelectorAll(config.container);
+var products = [];
+var missed = 0;
+
+for (var index = 0; index < tiles.length; index++) {
+    var record = readTile(tiles[index], config.fields);
+    if (record) {
+        record.index = index;
+        products.push(record);
+    } else {
+        missed++;
+    }
+}
+
+return {total: tiles.length, missed: missed, products: products};
+"""
+
+# Installs a MutationObserver that queues each tile the first time a tile
+# with its id is rendered. arguments: container selector, id attribute
+HARVEST_INSTALL_SCRIPT = """
+var selector = arguments[0];
+var idAttribute = arguments[1];
+var existing = window.__tileHarvest;
+if (existing && existing.selector === selector) {
+    return false;
+}
+if (existing) {
+    existing.observer.disconnect();
+}
+
+var harvest = window.__tileHarvest = {selector: selector, idAttribute: idAttribute, seen: {}, pending: []};
+
+function consider(tile) {
+    var id = tile.getAttribute(idAttribute);
+    if (!id || harvest.seen[id]) return;
+    harvest.seen[id] = true;
+    harvest.pending.push(tile);
+}
+
+function sweep(node) {
+    if (node.nodeType !== 1) return;
+    if (node.matches(selector)) consider(node);
+    var inner = node.querySelectorAll(selector);
+    for (var i = 0; i < inner.length; i++) consider(inner[i]);
+}
+
+harvest.observer = new MutationObserver(function(mutations) {
+    for (var m = 0; m < mutations.length; m++) {
+        var added = mutations[m].addedNodes;
+        for (var n = 0; n < added.length; n++) sweep(added[n]);
+    }
+});
+harvest.observer.observe(document.body, {childList: true, subtree: true});
+sweep(document.body);
+return true;
+"""
+
+# Reads the queued tiles and empties the queue. Tiles whose required fields
+# haven't rendered yet are kept for the next drain (or forgotten if they were
+# removed, so a re-render is picked up again). arguments: fields
+HARVEST_DRAIN_SCRIPT = READ_FIELD_JS + """
+var fields = arguments[0];
+var harvest = window.__tileHarvest;
+if (!harvest) return null;
+
+var pending = harvest.pending;
+harvest.pending = [];
+var products = [];
+var retry = [];
+
+for (var i = 0; i < pending.length; i++) {
+    var tile = pending[i];
+    var record = readTile(tile, fields);
+    if (record) {
+        record.id = tile.getAttribute(harvest.idAttribute);
+        products.push(record);
+    } else if (tile.isConnected) {
+        retry.push(tile);
+    } else {
+        delete harvest.seen[tile.getAttribute(harvest.idAttribute)];
+    }
+}
+
+harvest.pending = retry.concat(harvest.pending);
+return products;
+"""
+
+def field(selectors, attr=None, text='textContent', required=False, contains=None, min_length=None):
+    """
+    Describe one field to pull out of every tile.
+
+    Args:
+        selectors (list): CSS selectors tried in order inside the tile ('' means the tile itself).
+        attr (str): Read this attribute instead of the text ('href' is resolved to an absolute URL).
+        text (str): 'textContent' (fast, includes hidden text) or 'innerText' (rendered text,
+            matching Selenium's ``element.text``).
+        required (bool): Drop tiles where no selector yields a value.
+        contains (str): Skip candidate values that don't contain this substring.
+        min_length (int): Skip candidate values shorter than this.
+
+    Returns:
+        dict: The field spec passed to the in-page script.
+    """
+    spec = {'selectors': list(selectors), 'text': text, 'required': required}
+    if attr:
+        spec['attr'] = attr
+    if contains:
+        spec['contains'] = contains
+    if min_length:
+        spec['min_length'] = min_length
+    return spec
+
+def bulk_extract(driver, container_selector, fields):
+    """
+    Extract every tile on the current page in one round trip.
+
+    Args:
+        driver: The Selenium WebDriver instance.
+        container_selector (str): CSS selector matching one element per product tile.
+        fields (dict): Field name -> spec built with ``field()``.
+
+    Returns:
+        dict: ``total`` tiles found, ``missed`` tiles lacking a required field and
+        ``products``, a list of dicts with an ``index`` plus one key per field.
+    """
+    config = {'container': container_selector, 'fields': fields}
+    result = driver.execute_script(BULK_EXTRACT_SCRIPT, config)
+    if not result:
+        return {'total': 0, 'missed': 0, 'products': []}
+    return result
+
+def install_tile_harvester(driver, container_selector, id_attribute):
+    """
+    Start accumulating newly rendered tiles in the page.
+
+    Each tile is queued once per distinct ``id_attribute`` value, so infinite
+    scroll pages can be drained step by step without re-reading old tiles.
+    Installing again on the same page is a no-op; navigating away clears it.
+    """
+    return driver.execute_script(HARVEST_INSTALL_SCRIPT, container_selector, id_attribute)
+
+def drain_harvested_tiles(driver, fields):
+    """
+    Read only the tiles rendered since the last drain, in one round trip.
+
+    Args:
+        driver: The Selenium WebDriver instance.
+        fields (dict): Field name -> spec built with ``field()``.
+
+    Returns:
+        list: Dicts with the tile ``id`` plus one key per field, or None if
+        no harvester is installed (e.g. the page navigated).
+    """
+    return driver.execute_script(HARVEST_DRAIN_SCRIPT, fields)
@@ -0,0 +1,131 @@
+"""
+Shared pool of warm WebDriver instances.
+
+Starting Chrome (and patching undetected-chromedriver) costs several
+seconds, so scrapers lease a browser from the pool for each unit of work
+and hand it back afterwards instead of launching one per category.
+"""
+
+import atexit
+import queue
+import threading
+from contextlib import contextmanager
+
+class DriverPool:
+    """
+    A fixed-size pool of browsers built on demand by ``factory``.
+
+    Args:
+        factory: Zero-argument callable returning a new WebDriver (or None on failure).
+        size (int): Maximum number of browsers alive at once.
+        max_uses (int): Recycle a browser after this many leases to cap memory growth.
+        name (str): Label used in log messages.
+        on_create: Optional callable run on every new browser, e.g. to install request blocking.
+    """
+
+    def __init__(self, factory, size=1, max_uses=25, name="driver", on_create=None):
+        self.factory = factory
+        self.on_create = on_create
+        self.size = max(1, int(size))
+        self.max_uses = max_uses
+        self.name = name
+        # LIFO so the most recently used (warmest) browser is handed out first
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._uses = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        atexit.register(self.close)
+
+    def _create(self):
+        driver = self.factory()
+        if driver is None:
+            raise RuntimeError(f"{self.name} pool: driver factory returned no driver")
+        if self.on_create is not None:
+            self.on_create(driver)
+        with self._lock:
+            self._uses[id(driver)] = 0
+        print(f"🚗 {self.name} pool: started a new browser")
+        return driver
+
+    def _discard(self, driver):
+        with self._lock:
+            self._uses.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    @property
+    def live_count(self):
+        """Browsers currently started by this pool, leased or idle"""
+        with self._lock:
+            return len(self._uses)
+
+    @staticmethod
+    def is_healthy(driver):
+        """Cheap liveness probe - one round trip to the browser"""
+        try:
+            return driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def acquire(self, timeout=None):
+        """
+        Lease a browser, waiting for a free slot if the pool is exhausted.
+
+        Raises:
+            TimeoutError: If no slot frees up within ``timeout`` seconds.
+            RuntimeError: If the pool is closed or a new browser can't be started.
+        """
+        if self._closed:
+            raise RuntimeError(f"{self.name} pool is closed")
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError(f"{self.name} pool: no browser free after {timeout}s")
+
+        try:
+            while True:
+                try:
+                    driver = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._create()
+                if self.is_healthy(driver):
+                    return driver
+                print(f"⚠️ {self.name} pool: dropping unresponsive browser")
+                self._discard(driver)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, driver, broken=False):
+        """Return a leased browser; broken, worn-out or dead ones are quit instead"""
+        try:
+            with self._lock:
+                uses = self._uses.get(id(driver), 0) + 1
+                self._uses[id(driver)] = uses
+
+            if broken or self._closed or uses >= self.max_uses or not self.is_healthy(driver):
+                self._discard(driver)
+            else:
+                self._idle.put(driver)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def lease(self, timeout=None):
+        """Context manager form of acquire/release"""
+        driver = self.acquire(timeout=timeout)
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def close(self):
+        """Quit every idle browser; leased ones are quit as they come back"""
+        self._closed = True
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(driver)
@@ -0,0 +1,122 @@
+"""
+Pooled HTTP fetching for listing pages that don't need a full browser.
+
+A single keep-alive requests.Session is shared by every caller in the
+process so TCP/TLS connections to a retailer are reused between pages.
+Bodies are recorded to, and replayed from, the page cache (page_cache.py).
+"""
+
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from rate_limit import RATE_LIMITER
+from page_cache import PAGE_CACHE
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/140.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-GB,en;q=0.9',
+    'Connection': 'keep-alive',
+}
+
+POOL_SIZE = 8
+DEFAULT_TIMEOUT = 15
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """Return the shared keep-alive session, creating it on first use"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            session.headers.update(DEFAULT_HEADERS)
+            retry = Retry(total=2, backoff_factor=0.5, status_forcelist=[502, 503, 504])
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _session = session
+        return _session
+
+def fetch_html(url, timeout=DEFAULT_TIMEOUT):
+    """
+    Fetch a page over plain HTTP.
+
+    Args:
+        url (str): The page to fetch.
+        timeout (float): Seconds to wait for the server.
+
+    Returns:
+        str: The response body, or None if the request failed or was not a 200.
+    """
+    result = fetch_conditional(url, timeout=timeout)
+    if result is None or result['status'] != 200:
+        return None
+    return result['html']
+
+def fetch_conditional(url, etag=None, last_modified=None, timeout=DEFAULT_TIMEOUT):
+    """
+    Fetch a page, letting the server answer 304 if it hasn't changed.
+
+    Args:
+        url (str): The page to fetch.
+        etag (str): ETag from the previous fetch, sent as If-None-Match.
+        last_modified (str): Last-Modified from the previous fetch, sent as If-Modified-Since.
+        timeout (float): Seconds to wait for the server.
+
+    Returns:
+        dict: ``status`` (200 or 304), ``html`` (None on a 304) and the response's
+        ``etag`` and ``last_modified`` validators, or None if the request failed.
+    """
+    if PAGE_CACHE.replaying:
+        html = PAGE_CACHE.get(url, 'http')
+        if html is None:
+            print(f"📼 Not in the page cache: {url}")
+            return None
+        return {'status': 200, 'html': html, 'etag': None, 'last_modified': None}
+
+    headers = {}
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+
+    RATE_LIMITER.wait(url)
+    try:
+        response = get_session().get(url, headers=headers, timeout=timeout)
+    except requests.RequestException as e:
+        print(f"HTTP fetch failed for {url}: {e}")
+        return None
+
+    result = {
+        'status': response.status_code,
+        'html': None,
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+    }
+    if response.status_code == 304 and headers:
+        return result
+
+    if response.status_code != 200:
+        print(f"HTTP fetch for {url} returned status {response.status_code}")
+        return None
+
+    # requests falls back to ISO-8859-1 for text/* without a charset, which
+    # mangles the £ sign; the retailers all serve UTF-8.
+    if 'charset' not in response.headers.get('Content-Type', '').lower():
+        response.encoding = 'utf-8'
+    result['html'] = response.text
+    if PAGE_CACHE.recording:
+        PAGE_CACHE.put(url, 'http', result['html'])
+    return result
+
+def close_session():
+    """Close the shared session and its pooled connections"""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
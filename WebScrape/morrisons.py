@@ -1,28 +1,67 @@
-import pandas as pd
 import time
 import re
 import logging
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
-import threading
+from selenium.common.exceptions import TimeoutException
 import os
+import argparse
+from driver_pool import DriverPool
+from chrome_cache import start_selenium_chrome
+from resource_blocking import ResourceBlocker
+from page_waits import wait_for_content_settled
+from dom_extract import install_tile_harvester, drain_harvested_tiles, field
+from xhr_capture import ResponseCapture, price_text
+from page_cache import open_page, record_page
+from checkpoint import Checkpoint, flush_on_sigterm
+from product_sink import ProductSink
+from delta import DeltaStore
+from adaptive_timeouts import TimeoutPolicy
 
 # Set up minimal logging
 logging.basicConfig(level=logging.WARNING)  # Reduced logging level
 logger = logging.getLogger(__name__)
 
-# Thread-safe storage
-products_lock = threading.Lock()
-all_products = []
+MAX_WORKERS = int(os.environ.get('MORRISONS_MAX_WORKERS', '3'))
+
+PRODUCT_TILE_SELECTOR = "div[data-test^='fop-wrapper']"
+
+# innerText matches the element.text the scraper used to read per tile
+PRODUCT_FIELDS = {
+    'name': field(["h3[data-test='fop-title']"], text='innerText', required=True),
+    'price': field(["span[data-test='fop-price']"], text='innerText', required=True),
+}
+
+# Hard ceiling on scroll steps per category. Steps only cost the new tiles
+# now, so this is a safety net rather than a time budget
+MAX_SCROLLS = 150
+# Infinite scroll has no page 1, so delta mode compares the first screenful of products
+DELTA_SAMPLE = 24
+
+# Drops images, fonts and trackers at the network level
+RESOURCE_BLOCKER = ResourceBlocker('morrisons')
+
+# 'xhr' reads products from the JSON the infinite scroll fetches, falling back to
+# the rendered tiles when no payload turns up; 'dom' always reads the tiles
+FETCH_MODE = os.environ.get('MORRISONS_FETCH_MODE', 'xhr')
+# Only the browse/search listing calls; the rest of /api/ also serves carousels and recommendations
+LISTING_API_PATTERNS = [
+    '*groceries.morrisons.com/api/webproductpagews/*/product-pages/*',
+    '*groceries.morrisons.com/api/webproductpagews/*/search*',
+]
+XHR_CAPTURE = ResponseCapture('morrisons', LISTING_API_PATTERNS, mode=FETCH_MODE)
+
+# Cookie and first-tile waits sized from observed load times
+TIMEOUTS = TimeoutPolicy('morrisons')
 
 class OptimizedMorrisonsProductScraper:
-    def __init__(self, max_scrolls=None):
+    def __init__(self, max_scrolls=None, delta=None):
         self.max_scrolls = max_scrolls
+        self.delta = delta
+        self.reused = False
         self.driver = None
         self.products = []
 
@@ -31,8 +70,6 @@ class OptimizedMorrisonsProductScraper:
         chrome_options = Options()
         # Performance optimizations
         chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--disable-images")  # Major speed boost
-        chrome_options.add_argument("--disable-javascript")  # If not needed
         chrome_options.add_argument("--disable-plugins")
         chrome_options.add_argument("--disable-extensions")
         chrome_options.add_argument("--no-sandbox")
@@ -44,73 +81,92 @@ class OptimizedMorrisonsProductScraper:
         chrome_options.add_argument("--disable-backgrounding-occluded-windows")
         chrome_options.add_argument("--window-size=1920,1080")
         chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36")
+        RESOURCE_BLOCKER.configure_options(chrome_options)
+        XHR_CAPTURE.configure_options(chrome_options)
         
         try:
-            self.driver = webdriver.Chrome(options=chrome_options)
+            self.driver = start_selenium_chrome(chrome_options)
         except Exception as e:
             logger.error(f"Failed to initialize Chrome WebDriver: {e}")
             raise
+        return self.driver
+
+    def add_products(self, harvested, category_name):
+        """Store harvested tiles, returning how many were kept"""
+        added = 0
+        for product in harvested:
+            name = product['name']
+            price = product['price'].strip() or "N/A"  # raw text; the sink normalises it
+            if name and name != "N/A":
+                self.products.append({
+                    'name': name,
+                    'price': price,
+                    'category': category_name
+                })
+                added += 1
+        return added
+
+    def harvest_step(self, category_name, state):
+        """
+        Store the products that appeared since the last step.
+
+        Once a JSON payload has delivered products for this page the tile queue is
+        ignored, so the same products aren't counted twice from the DOM.
+        """
+        captured = XHR_CAPTURE.collect(self.driver)
+        if captured:
+            if not state['using_payloads']:
+                print(f"{category_name}: Reading products from listing JSON")
+            state['using_payloads'] = True
+            fresh = []
+            for product in captured:
+                key = product['id'] or f"{product['name']}|{product['price']}"
+                if key not in state['captured_ids']:
+                    state['captured_ids'].add(key)
+                    fresh.append({'name': product['name'], 'price': price_text(product['price'])})
+            return self.add_products(fresh, category_name)
+        if state['using_payloads']:
+            return 0
+        return self.add_products(drain_harvested_tiles(self.driver, PRODUCT_FIELDS) or [], category_name)
 
     def scroll_and_load_products(self, url, category_name):
         """Optimized scrolling and product loading"""
         print(f"Starting: {category_name}")
-        self.driver.get(url)
+        if XHR_CAPTURE.enabled:
+            XHR_CAPTURE.reset(self.driver)
+        open_page(self.driver, url)
 
-        # Handle cookies with reduced timeout
-        try:
-            WebDriverWait(self.driver, 3).until(
-                EC.element_to_be_clickable((By.ID, "onetrust-accept-btn-handler"))
-            ).click()
-            time.sleep(1.5)  # Reduced from 2 seconds
-        except TimeoutException:
-            pass  # Continue if no cookie banner
+        # Handle cookies with reduced timeout (pooled browsers only need this once)
+        if not getattr(self.driver, 'cookies_accepted', False):
+            try:
+                TIMEOUTS.wait(self.driver, 'cookies',
+                              EC.element_to_be_clickable((By.ID, "onetrust-accept-btn-handler")), 3).click()
+                time.sleep(1.5)  # Reduced from 2 seconds
+            except TimeoutException:
+                pass  # Continue if no cookie banner
+            self.driver.cookies_accepted = True
 
-        # Wait for initial products with reduced timeout
+        # Wait for initial products (5 seconds until enough loads have been seen)
         try:
-            WebDriverWait(self.driver, 5).until(  # Reduced from 15 seconds
-                EC.presence_of_element_located((By.CSS_SELECTOR, "div[data-test^='fop-wrapper']"))
-            )
+            TIMEOUTS.wait(self.driver, 'listing',
+                          EC.presence_of_element_located((By.CSS_SELECTOR, PRODUCT_TILE_SELECTOR)), 5)
         except TimeoutException:
             print(f"{category_name}: No products loaded")
             return
 
+        # Tiles are queued in the page as they render, so each scroll step
+        # only transfers the products that are new since the last one
+        install_tile_harvester(self.driver, PRODUCT_TILE_SELECTOR, 'data-test')
+
         last_height = self.driver.execute_script("return document.body.scrollHeight")
         scroll_count = 0
-        processed_ids = set()
         no_new_products_count = 0
+        max_scrolls = min(self.max_scrolls or MAX_SCROLLS, MAX_SCROLLS)
+        state = {'using_payloads': False, 'captured_ids': set()}
 
         while True:
-            # Get products on current view
-            product_elements = self.driver.find_elements(By.CSS_SELECTOR, "div[data-test^='fop-wrapper']")
-            
-            new_products_found = 0
-            for element in product_elements:
-                try:
-                    product_id = element.get_attribute('data-test')
-                    if not product_id or product_id in processed_ids:
-                        continue
-
-                    # Extract product data efficiently
-                    try:
-                        name = element.find_element(By.CSS_SELECTOR, "h3[data-test='fop-title']").text
-                        price_text = element.find_element(By.CSS_SELECTOR, "span[data-test='fop-price']").text
-                        price = re.sub(r'[^\d.,]', '', price_text) or "N/A"
-
-                        if name and name != "N/A":
-                            self.products.append({
-                                'name': name,
-                                'price': price,
-                                'category': category_name
-                            })
-                            processed_ids.add(product_id)
-                            new_products_found += 1
-
-                    except (NoSuchElementException, StaleElementReferenceException):
-                        continue
-
-                except Exception:
-                    continue
-            
+            new_products_found = self.harvest_step(category_name, state)
+
             if new_products_found == 0:
                 no_new_products_count += 1
                 if no_new_products_count >= 3:  # Stop after 3 scrolls with no new products
@@ -118,64 +174,90 @@ class OptimizedMorrisonsProductScraper:
             else:
                 no_new_products_count = 0
                 print(f"{category_name}: Scroll {scroll_count + 1} - {new_products_found} new products (Total: {len(self.products)})")
+                
+                # An unchanged first screenful stands in for the whole category (see delta.py)
+                if self.delta and not state.get('delta_checked') and len(self.products) >= DELTA_SAMPLE:
+                    state['delta_checked'] = True
+                    previous = self.delta.unchanged(category_name, self.products[:DELTA_SAMPLE])
+                    if previous is not None:
+                        self.products = previous
+                        self.reused = True
+                        return
             
-            # Scroll down
-            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2.0)  # Reduced from 3-4 seconds
+            # Scroll down and wait until the newly requested tiles have rendered; the
+            # cap matches the old flat sleep so the end of the list costs no more than before
+            wait_for_content_settled(self.driver, PRODUCT_TILE_SELECTOR, quiet_ms=500, timeout=2.5,
+                                     scroll='bottom', require_growth=True)
             
             new_height = self.driver.execute_script("return document.body.scrollHeight")
             scroll_count += 1
             
             # Stop conditions
-            if (new_height == last_height or 
-                (self.max_scrolls and scroll_count >= self.max_scrolls) or
-                scroll_count >= 50):  # Add maximum scroll limit
+            if new_height == last_height or scroll_count >= max_scrolls:
+                # Pick up whatever arrived during the final wait
+                self.harvest_step(category_name, state)
                 break
             
             last_height = new_height
 
+        record_page(self.driver)
+        RESOURCE_BLOCKER.report_page(self.driver, url)
         print(f"{category_name}: Completed - {len(self.products)} products")
 
     def scrape_url(self, url, category_name):
         """Main scraping method for a single category"""
         try:
-            self.setup_driver()
-            self.scroll_and_load_products(url, category_name)
+            with DRIVER_POOL.lease() as driver:
+                self.driver = driver
+                self.scroll_and_load_products(url, category_name)
             return self.products
         except Exception as e:
             print(f"Error in {category_name}: {e}")
             return []
         finally:
-            if self.driver:
-                self.driver.quit()
+            self.driver = None
 
-def scrape_single_category(url):
-    """Wrapper function for single category scraping"""
+def create_driver():
+    """Driver factory for the shared pool"""
+    return OptimizedMorrisonsProductScraper().setup_driver()
+
+def prepare_driver(driver):
+    """Per-browser DevTools setup run once when the pool starts a browser"""
+    RESOURCE_BLOCKER.install(driver)
+    XHR_CAPTURE.install(driver)
+
+# Browsers are kept warm between categories instead of relaunching Chrome each time
+DRIVER_POOL = DriverPool(create_driver, size=MAX_WORKERS, name="Morrisons",
+                         on_create=prepare_driver)
+
+def category_name_from_url(url):
     try:
-        category_name = re.search(r'/categories/([^/]+)/', url).group(1).replace('-', ' ').title()
+        return re.search(r'/categories/([^/]+)/', url).group(1).replace('-', ' ').title()
     except AttributeError:
-        category_name = "Unknown Category"
-    
-    scraper = OptimizedMorrisonsProductScraper(max_scrolls=40)  # Limit scrolls per category
-    return scraper.scrape_url(url, category_name)
-
-def save_csv_to_both_locations(df, filename):
-    """Save CSV to both local directory and app/public folder"""
-    # Save to local directory
-    local_path = f"{filename}.csv"
-    df.to_csv(local_path, index=False, encoding="utf-8")
-    print(f"✅ Saved to local: {local_path}")
+        return "Unknown Category"
+
+def scrape_single_category(url, checkpoint=None, delta=None):
+    """Wrapper function for single category scraping"""
+    category_name = category_name_from_url(url)
     
-    # Save to app/public directory
-    public_dir = "../app/public"
-    if not os.path.exists(public_dir):
-        os.makedirs(public_dir, exist_ok=True)
+    # A whole infinite-scroll category is one checkpoint unit
+    category_key = Checkpoint.page_key(category_name, 1)
+    if checkpoint and checkpoint.done(category_key):
+        products = checkpoint.get(category_key)
+        print(f"{category_name}: Restored {len(products)} products from checkpoint")
+        if delta:
+            delta.record(category_name, products[:DELTA_SAMPLE], products)
+        return products
     
-    public_path = os.path.join(public_dir, f"{filename}.csv")
-    df.to_csv(public_path, index=False, encoding="utf-8")
-    print(f"✅ Saved to public: {public_path}")
+    scraper = OptimizedMorrisonsProductScraper(delta=delta)  # Capped by MAX_SCROLLS
+    products = scraper.scrape_url(url, category_name)
+    if checkpoint and products:
+        checkpoint.save(category_key, products)
+    if delta and products and not scraper.reused:
+        delta.record(category_name, products[:DELTA_SAMPLE], products)
+    return products
 
-def main():
+def main(resume=False, delta=False):
     """Optimized main function with parallel processing"""
     
     # Reduced category list for faster execution - add more as needed
@@ -195,12 +277,20 @@ def main():
     
     print("Starting optimized Morrisons scraper with parallel processing...")
     start_time = time.time()
+    
+    # Each finished category is saved so an interrupted run can pick up with --resume
+    checkpoint = Checkpoint('morrisons', resume=resume)
+    # Finished categories are cleaned, de-duplicated and written out as they arrive
+    sink = ProductSink('morrisons', ['name', 'price', 'category'],
+                       dedup_key=['name', 'price'], required=['name', 'price'], price_field='price')
+    flush_on_sigterm(lambda: sink.save_partial(checkpoint))
+    delta_store = DeltaStore('morrisons', enabled=delta)
 
     # Use ThreadPoolExecutor for parallel processing
-    with ThreadPoolExecutor(max_workers=3) as executor:
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
         # Submit all category tasks
         future_to_url = {
-            executor.submit(scrape_single_category, url): url 
+            executor.submit(scrape_single_category, url, checkpoint, delta_store): url 
             for url in category_urls
         }
         
@@ -208,43 +298,37 @@ def main():
         for future in as_completed(future_to_url):
             url = future_to_url[future]
             try:
-                category_products = future.result()
-                
-                # Thread-safe addition to global products list
-                with products_lock:
-                    all_products.extend(category_products)
+                sink.add(future.result(), unit=category_name_from_url(url))
                     
             except Exception as e:
                 print(f"Category failed {url}: {e}")
 
+    DRIVER_POOL.close()
+    TIMEOUTS.save()
+
     # Save results
-    if all_products:
-        df = pd.DataFrame(all_products)
-        # Clean up column names
-        cols = ['name', 'price', 'category']
-        df = df[[col for col in cols if col in df.columns]]
-        
-        # Clean data
-        df = df.dropna(subset=['name', 'price'])
-        df = df[df['name'].str.strip() != '']
-        df = df[df['price'].str.strip() != '']
-        df = df.drop_duplicates(subset=['name', 'price'])
-        
-        # Save to both locations
-        save_csv_to_both_locations(df, "morrisons")
+    if sink.close():
+        checkpoint.clear()
+        delta_store.save()
         
         end_time = time.time()
         duration = end_time - start_time
         
         print(f"\n{'='*50}")
         print(f"SCRAPING COMPLETED!")
-        print(f"Total products: {len(all_products)}")
+        print(f"Total products: {sink.written}")
         print(f"Total time: {duration:.2f} seconds")
-        print(f"Products per second: {len(all_products)/duration:.2f}")
+        print(f"Products per second: {sink.written/duration:.2f}")
         print(f"Files saved: morrisons.csv (local) and ../app/public/morrisons.csv")
         print(f"{'='*50}")
     else:
         print("No products were scraped. CSV files not generated.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Scrape Morrisons product listings")
+    parser.add_argument('--resume', action='store_true',
+                        help="Skip categories already saved by an interrupted run")
+    parser.add_argument('--delta', action='store_true',
+                        help="Reuse last run's products for categories whose first products haven't changed")
+    args = parser.parse_args()
+    main(resume=args.resume, delta=args.delta)
\ No newline at end of file
@@ -0,0 +1,243 @@
+"""
+On-disk cache of fetched pages, for recording a scraper run and replaying it.
+
+SCRAPER_CACHE_MODE selects what happens:
+
+    off     nothing is stored (the default)
+    record  every listing page (the HTML as served, or as rendered once the
+            scraper is about to read it) and every captured JSON payload is
+            stored as the scraper runs
+    replay  pages are served from the cache and the live site is never
+            contacted; a page that was not recorded behaves like a failed load
+
+Replay runs the scraper's own code path - waits, in-page extraction, lxml
+parsing and post-processing - against the recorded snapshots, so selectors
+and the CSV pipeline can be iterated on offline. Browser-based scrapers still
+start Chrome, but only to load file:// snapshots (with scripts stripped so
+the retailer's app can't re-render them).
+
+Entries are gzip-compressed JSON, content-addressed by sha256 of the URL plus
+a variant ('http', 'dom' or 'xhr'), so the same URL fetched over plain HTTP
+and rendered in a browser are kept apart. Entries older than
+SCRAPER_CACHE_TTL_HOURS are dropped while recording, then the least recently
+used entries are evicted until the cache fits in SCRAPER_CACHE_MAX_MB.
+Replay ignores the TTL so a recorded corpus stays usable.
+
+The cache lives in WebScrape/.page_cache unless SCRAPER_CACHE_DIR points elsewhere.
+"""
+
+import atexit
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from rate_limit import polite_get
+
+CACHE_DIR = os.environ.get(
+    'SCRAPER_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".page_cache")
+)
+CACHE_MODE = os.environ.get('SCRAPER_CACHE_MODE', 'off').lower()
+TTL_HOURS = float(os.environ.get('SCRAPER_CACHE_TTL_HOURS', '168'))
+MAX_MB = float(os.environ.get('SCRAPER_CACHE_MAX_MB', '500'))
+
+# Eviction scans the whole directory, so it only runs every so many writes
+PRUNE_EVERY = 50
+
+SCRIPT_PATTERN = re.compile(r'<script\b[^>]*>.*?</script\s*>', re.IGNORECASE | re.DOTALL)
+HEAD_PATTERN = re.compile(r'<head\b[^>]*>', re.IGNORECASE)
+
+def cache_key(url, variant):
+    return hashlib.sha256(f"{variant}\n{url}".encode("utf-8")).hexdigest()
+
+class PageCache:
+    """
+    Compressed page bodies and JSON payloads keyed by (URL, variant).
+
+    Args:
+        mode (str): 'off', 'record' or 'replay'.
+        directory (str): Where entries are stored.
+        ttl_hours (float): Age after which a recorded entry is dropped.
+        max_mb (float): Size the cache is pruned back to.
+    """
+
+    def __init__(self, mode=CACHE_MODE, directory=None, ttl_hours=TTL_HOURS, max_mb=MAX_MB):
+        self.mode = mode if mode in ('off', 'record', 'replay') else 'off'
+        self.directory = directory or CACHE_DIR
+        self.ttl_seconds = ttl_hours * 3600
+        self.max_bytes = max_mb * 1024 * 1024
+        self._lock = threading.RLock()
+        self._writes = 0
+        self._snapshot_dir = None
+
+    @property
+    def recording(self):
+        return self.mode == 'record'
+
+    @property
+    def replaying(self):
+        return self.mode == 'replay'
+
+    def _path(self, url, variant):
+        key = cache_key(url, variant)
+        return os.path.join(self.directory, key[:2], f"{key}.json.gz")
+
+    def get(self, url, variant):
+        """The stored body for (url, variant), or None"""
+        path = self._path(url, variant)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError, EOFError):
+            return None
+        if not self.replaying and time.time() - os.path.getmtime(path) > self.ttl_seconds:
+            return None
+        try:
+            os.utime(path)  # least recently used goes first on eviction
+        except OSError:
+            pass
+        return entry.get('body')
+
+    def put(self, url, variant, body):
+        """Store ``body`` (text or anything JSON-able) for (url, variant)"""
+        path = self._path(url, variant)
+        entry = {'url': url, 'variant': variant, 'saved_at': datetime.now().isoformat(), 'body': body}
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️ Could not write page cache entry for {url}: {e}")
+            return
+        with self._lock:
+            self._writes += 1
+            due = self._writes % PRUNE_EVERY == 0
+        if due:
+            self.prune()
+
+    def append(self, url, variant, item):
+        """Add ``item`` to the list stored for (url, variant), e.g. one more JSON payload"""
+        with self._lock:
+            items = self.get(url, variant) or []
+            items.append(item)
+            self.put(url, variant, items)
+
+    def prune(self):
+        """Drop expired entries, then the least recently used until under the size cap"""
+        entries = []
+        now = time.time()
+        for root, _, files in os.walk(self.directory):
+            for filename in files:
+                path = os.path.join(root, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                if now - stat.st_mtime > self.ttl_seconds:
+                    self._remove(path)
+                else:
+                    entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def snapshot_url(self, url):
+        """
+        A file:// URL for the recorded rendering of ``url``, or None if it wasn't recorded.
+
+        Scripts are stripped and a <base> points relative links back at the
+        original URL, so the snapshot reads like the live page did.
+        """
+        html = self.get(url, 'dom')
+        if html is None:
+            return None
+        html = SCRIPT_PATTERN.sub('', html)
+        html = HEAD_PATTERN.sub(lambda match: f'{match.group(0)}<base href="{url}">', html, count=1)
+        with self._lock:
+            if self._snapshot_dir is None:
+                self._snapshot_dir = tempfile.mkdtemp(prefix="page_cache_")
+                atexit.register(self.remove_snapshots)
+        path = os.path.join(self._snapshot_dir, f"{cache_key(url, 'dom')}.html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(html)
+        # as_uri() gives file:///C:/... on Windows and escapes spaces and '#'
+        return Path(path).resolve().as_uri()
+
+    def remove_snapshots(self):
+        """Delete the temporary snapshot files written for replay (runs at exit)"""
+        with self._lock:
+            directory, self._snapshot_dir = self._snapshot_dir, None
+        if directory:
+            shutil.rmtree(directory, ignore_errors=True)
+
+# Shared by every scraper thread in the process
+PAGE_CACHE = PageCache()
+
+def set_cache_url(driver, url):
+    """File what's recorded from the driver from now on under ``url`` (e.g. after a click navigated)"""
+    driver.cache_url = url
+    driver.cache_payloads = None
+
+def open_page(driver, url):
+    """
+    Navigate to ``url``: politely when live, or to its recorded snapshot on replay.
+
+    The requested URL is remembered on the driver as ``cache_url`` so whatever
+    is recorded from this page is filed under it.
+    """
+    set_cache_url(driver, url)
+    if not PAGE_CACHE.replaying:
+        polite_get(driver, url)
+        return
+    snapshot = PAGE_CACHE.snapshot_url(url)
+    if snapshot is None:
+        print(f"📼 Not in the page cache: {url}")
+        driver.get("about:blank")
+        return
+    driver.get(snapshot)
+
+def record_page(driver, html=None):
+    """Store the page as currently rendered (or ``html`` already read from it), when recording"""
+    url = getattr(driver, 'cache_url', None)
+    if PAGE_CACHE.recording and url:
+        PAGE_CACHE.put(url, 'dom', html if html is not None else driver.page_source)
+
+def record_payload(driver, payload):
+    """Store one captured JSON payload with the page that requested it, when recording"""
+    url = getattr(driver, 'cache_url', None)
+    if not PAGE_CACHE.recording or not url:
+        return
+    # The first payload of a visit replaces whatever an earlier recording left
+    if getattr(driver, 'cache_payloads', None) != url:
+        driver.cache_payloads = url
+        PAGE_CACHE.put(url, 'xhr', [payload])
+    else:
+        PAGE_CACHE.append(url, 'xhr', payload)
+
+def replay_payloads(driver):
+    """The JSON payloads recorded for the current page, handed out once per visit"""
+    url = getattr(driver, 'cache_url', None)
+    if not url or getattr(driver, 'cache_payloads', None) == url:
+        return []
+    driver.cache_payloads = url
+    return PAGE_CACHE.get(url, 'xhr') or []
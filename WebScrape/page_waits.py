@@ -0,0 +1,166 @@
+"""
+Event-driven waits for lazily loaded listing pages.
+
+Instead of sleeping a fixed worst-case time after each scroll, a
+MutationObserver is installed in the page and the wait resolves as soon
+as the number of product tiles has stopped changing for a quiet window.
+A hard cap bounds the wait when the page keeps mutating.
+
+wait_for_any_selector covers a fallback chain of selectors with one wait.
+"""
+
+import time
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+DEFAULT_QUIET_MS = 750
+DEFAULT_TIMEOUT = 10
+
+# arguments: selector, quietMs, timeoutMs, scroll ('bottom', 'top', pixels or null),
+#            requireGrowth, callback
+SETTLE_SCRIPT = """
+var selector = arguments[0];
+var quietMs = arguments[1];
+var timeoutMs = arguments[2];
+var scroll = arguments[3];
+var requireGrowth = arguments[4];
+var done = arguments[arguments.length - 1];
+
+var start = Date.now();
+var initial = document.querySelectorAll(selector).length;
+var count = initial;
+var lastChange = start;
+var dirty = false;
+var finished = false;
+
+var observer = new MutationObserver(function() { dirty = true; });
+observer.observe(document.body || document.documentElement, {childList: true, subtree: true});
+
+function finish(settled) {
+    if (finished) return;
+    finished = true;
+    observer.disconnect();
+    clearInterval(timer);
+    done({count: count, added: count - initial, waited_ms: Date.now() - start, settled: settled});
+}
+
+var timer = setInterval(function() {
+    var now = Date.now();
+    if (dirty) {
+        dirty = false;
+        var current = document.querySelectorAll(selector).length;
+        if (current !== count) {
+            count = current;
+            lastChange = now;
+        }
+    }
+    if ((!requireGrowth || count > initial) && now - lastChange >= quietMs) {
+        finish(true);
+    } else if (now - start >= timeoutMs) {
+        finish(false);
+    }
+}, 50);
+
+// Scroll only after the observer is attached so no mutation is missed
+if (scroll === 'bottom') {
+    window.scrollTo(0, document.body.scrollHeight);
+} else if (scroll === 'top') {
+    window.scrollTo(0, 0);
+} else if (typeof scroll === 'number') {
+    window.scrollBy(0, scroll);
+}
+"""
+
+def wait_for_content_settled(driver, selector, quiet_ms=DEFAULT_QUIET_MS, timeout=DEFAULT_TIMEOUT,
+                             scroll=None, require_growth=False):
+    """
+    Wait until the number of elements matching ``selector`` stops changing.
+
+    Args:
+        driver: The Selenium WebDriver instance.
+        selector (str): CSS selector for the product tiles being loaded.
+        quiet_ms (int): How long the tile count must stay unchanged to count as settled.
+        timeout (float): Hard cap on the wait, in seconds.
+        scroll: Optionally scroll first in the same round trip - 'bottom', 'top' or a pixel offset.
+        require_growth (bool): Don't treat the page as settled until at least one new tile
+            has appeared. Use after a scroll that should trigger a fetch; at the end of a
+            list the wait then runs to ``timeout``, so keep that cap modest.
+
+    Returns:
+        dict: ``count``, ``added``, ``waited_ms`` and ``settled`` (False if the cap was hit),
+        or None if the script could not run.
+    """
+    try:
+        driver.set_script_timeout(timeout + 5)
+        return driver.execute_async_script(
+            SETTLE_SCRIPT, selector, int(quiet_ms), int(timeout * 1000), scroll, bool(require_growth)
+        )
+    except Exception as e:
+        print(f"Settle wait failed for {selector}: {e}")
+        return None
+
+# arguments: selectors, 'css' or 'xpath', visibleOnly
+FIRST_MATCH_SCRIPT = """
+var selectors = arguments[0];
+var kind = arguments[1];
+var visibleOnly = arguments[2];
+
+function find(selector) {
+    if (kind === 'xpath') {
+        var result = document.evaluate(selector, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        var nodes = [];
+        for (var i = 0; i < result.snapshotLength; i++) nodes.push(result.snapshotItem(i));
+        return nodes;
+    }
+    return Array.prototype.slice.call(document.querySelectorAll(selector));
+}
+
+for (var i = 0; i < selectors.length; i++) {
+    var nodes = find(selectors[i]);
+    if (visibleOnly) {
+        nodes = nodes.filter(function(node) { return node.offsetParent !== null && !node.disabled; });
+    }
+    if (nodes.length) return {selector: selectors[i], count: nodes.length, element: nodes[0]};
+}
+return null;
+"""
+
+def wait_for_any_selector(driver, selectors, timeout=DEFAULT_TIMEOUT, kind='css', visible=False, prefer_for=0):
+    """
+    Wait once for whichever of ``selectors`` shows up first.
+
+    One wait covers the whole fallback chain: each poll checks every
+    candidate in a single round trip, so a stale selector early in the list
+    no longer costs its own timeout. When several match, the earliest in
+    ``selectors`` wins.
+
+    Broad fallbacks ("[class*='product']") can match while the real tiles
+    are still rendering. ``prefer_for`` gives the first selector that many
+    seconds on its own before the rest of the chain is checked.
+
+    Args:
+        driver: The Selenium WebDriver instance.
+        selectors (list): CSS selectors or XPath expressions, most preferred first.
+        timeout (float): Seconds to wait for any of them.
+        kind (str): 'css' or 'xpath'.
+        visible (bool): Only count displayed, enabled elements (e.g. buttons to click).
+        prefer_for (float): Seconds (within ``timeout``) during which only
+            ``selectors[0]`` counts.
+
+    Returns:
+        dict: ``selector`` that matched, ``count`` and the first matching
+        ``element``, or None if nothing matched within the timeout.
+    """
+    selectors = list(selectors)
+    fallback_at = time.monotonic() + min(prefer_for, timeout)
+
+    def first_match(d):
+        candidates = selectors if time.monotonic() >= fallback_at else selectors[:1]
+        return d.execute_script(FIRST_MATCH_SCRIPT, candidates, kind, visible)
+
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=0.25).until(first_match)
+    except TimeoutException:
+        # The fallbacks get one last look if the preferred selector used up the wait
+        return driver.execute_script(FIRST_MATCH_SCRIPT, selectors, kind, visible) if prefer_for else None
@@ -0,0 +1,99 @@
+"""
+Shelf prices as integer pence, the same way for every retailer.
+
+Each retailer writes prices its own way: "£3.20", "85p", ASDA's
+"actual price£2.85", Morrisons' bare "4.06", Aldi's "£1.49/1 kg" for loose
+goods, and promotions such as "Was £3.00 Now £2.00", "Save 50p" or
+"Any 3 for £10". normalise_prices() turns a whole column of them into
+integer pence with vectorised string operations (no per-row Python), so it
+can run over a batch or the full catalogue at once. Thousands separators are
+dropped first ("£1,299.00" is 129900). Plain "£1.23" / "1.23"
+prices, nearly all of them, are converted by deleting "£" and "."; only the
+rest go through the slower regex extraction:
+
+    price_pence     the price of one item, or the multibuy price per item
+                    (rounded) when that is the only price given
+    multibuy_qty    / multibuy_pence: "3 for £10" -> 3 / 1000
+    promo           True if promotional text was found
+
+The raw text is kept by the caller; nothing here rewrites it.
+"""
+
+import pandas as pd
+
+PLAIN_PATTERN = r'£?\d+\.\d{2}'
+THOUSANDS_PATTERN = r'(\d),(\d{3})\b'
+PREFIX_PATTERN = r'(?i)^\s*(?:actual\s+price|now\s+only|now|only|price)\s*:?\s*'
+WAS_NOW_PATTERN = r'(?i)\bwas\b.*?\bnow\b'
+SAVE_PATTERN = r'(?i)\bsave\s*(?:£\s*\d+(?:\.\d+)?|\d+(?:\.\d+)?\s*p\b)'
+MULTIBUY_PATTERN = (
+    r'(?i)(?:\bany\s+)?\b(?P<qty>\d+)\s*for\s*'
+    r'(?:£\s*(?P<pounds>\d+)(?:\.(?P<fraction>\d{1,2}))?|(?P<pence>\d+)\s*p\b)'
+)
+PRICE_PATTERN = (
+    r'(?i)£\s*(?P<pounds>\d+)(?:\.(?P<fraction>\d{1,2}))?'
+    r'|\b(?P<pence>\d+(?:\.\d+)?)\s*p\b'
+    r'|^\s*(?P<bare>\d+)(?:\.(?P<bare_fraction>\d{1,2}))?\s*$'
+)
+PROMO_PATTERN = r'(?i)\b(?:was|now|save|any|for|clubcard|nectar|offer|half\s+price|reduced)\b'
+
+def pounds_to_pence(pounds, fraction):
+    """Exact integer pence from the digit strings either side of the point ("3", "2" -> 320)"""
+    fraction = fraction.fillna("0").str.ljust(2, "0")
+    return pounds.astype("Int64") * 100 + fraction.astype("Int64")
+
+def pence_to_int(pence):
+    return pd.to_numeric(pence).round().astype("Int64")
+
+def normalise_prices(prices):
+    """
+    Normalise a column of price strings.
+
+    Args:
+        prices: Series (or list) of raw price text; None/NaN are allowed.
+
+    Returns:
+        DataFrame: price_pence, multibuy_qty, multibuy_pence (nullable Int64)
+        and promo (bool), on the same index as ``prices``.
+    """
+    text = pd.Series(prices, dtype="string") if not isinstance(prices, pd.Series) else prices.astype("string")
+    index = text.index
+    text = text.str.strip().reset_index(drop=True)  # positional, so duplicate labels are fine
+    separated = text.str.contains(',', regex=False).fillna(False).astype(bool)
+    text[separated] = text[separated].str.replace(THOUSANDS_PATTERN, r'\1\2', regex=True)
+    result = pd.DataFrame({
+        'price_pence': pd.Series(pd.NA, index=text.index, dtype="Int64"),
+        'multibuy_qty': pd.Series(pd.NA, index=text.index, dtype="Int64"),
+        'multibuy_pence': pd.Series(pd.NA, index=text.index, dtype="Int64"),
+        'promo': text.str.contains(PROMO_PATTERN, regex=True).fillna(False).astype(bool),
+    })
+
+    plain = text.str.fullmatch(PLAIN_PATTERN).fillna(False).astype(bool)
+    result.loc[plain, 'price_pence'] = text[plain].str.replace(r'[£.]', '', regex=True).astype("Int64")
+
+    text = text[~plain & text.notna()]
+    if text.empty:
+        return result.set_axis(index)
+
+    multibuy = text.str.extract(MULTIBUY_PATTERN)
+    multibuy_qty = multibuy['qty'].astype("Int64")
+    multibuy_pence = pounds_to_pence(multibuy['pounds'], multibuy['fraction']).fillna(pence_to_int(multibuy['pence']))
+
+    # Strip everything that isn't the shelf price, then take the first amount left
+    remaining = (
+        text.str.replace(WAS_NOW_PATTERN, '', regex=True)
+            .str.replace(SAVE_PATTERN, '', regex=True)
+            .str.replace(MULTIBUY_PATTERN, '', regex=True)
+            .str.replace(PREFIX_PATTERN, '', regex=True)
+    )
+    single = remaining.str.extract(PRICE_PATTERN)
+    price_pence = (
+        pounds_to_pence(single['pounds'], single['fraction'])
+        .fillna(pence_to_int(single['pence']))
+        .fillna(pounds_to_pence(single['bare'], single['bare_fraction']))
+    )
+    per_item = pence_to_int(multibuy_pence.astype("Float64") / multibuy_qty.replace(0, pd.NA))
+    result.loc[text.index, 'price_pence'] = price_pence.fillna(per_item)
+    result.loc[text.index, 'multibuy_qty'] = multibuy_qty
+    result.loc[text.index, 'multibuy_pence'] = multibuy_pence
+    return result.set_axis(index)
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Offline cross-retailer product matching.
+
+The results page used to score every one of the ~40k published products
+against each item on the shopping list, in the browser, every time it loaded.
+This job does the matching once, after the scrapers publish their CSVs, and
+writes the result to app/public/matches.json: clusters of products that are
+the same thing at different retailers, at most one product per retailer each.
+The page builds a "<store>|<name>" lookup from it and finds a selected
+product's equivalents in O(1). On GitHub it runs in its own workflow
+(product-matching.yml) after any scraper pushes new CSVs, so the scraper
+workflows never race each other to commit the shared file; run_scraper.py
+runs it after a local run.
+
+Matching works on the names, cleaned the same way as the frontend's
+ProductMatcher (lowercase, retailer own-label names, sizes and punctuation
+removed). To avoid scoring every pair of products:
+
+    blocking    each product is indexed under its BLOCK_TOKENS rarest tokens
+                (an inverted index, token -> products); tokens shared by more
+                than MAX_POSTINGS products are too common to block on. Only
+                pairs from different retailers that share an indexed token
+                are candidates, a few hundred thousand instead of ~430M.
+    scoring     IDF-weighted Jaccard over the two names' tokens, so a shared
+                brand or "chorizo" counts far more than a shared "sauce".
+                A pair needs MATCH_THRESHOLD, or BRAND_THRESHOLD when two
+                branded (not own-label) names start with different words,
+                i.e. different brands, or UNKNOWN_SIZE_THRESHOLD when either
+                pack size is unknown.
+                Pairs whose pack sizes (see unit_pricing.py) are in different
+                units, differ by more than SIZE_TOLERANCE or are a multipack
+                against a product of unknown size are rejected.
+    clustering  best-scoring pairs first, merged with union-find unless that
+                would put two products of one retailer in the same cluster.
+                Linkage is complete: every new member must match every
+                existing one (score and size), not just the product it was
+                paired with, so a vague name can't bridge two different
+                products.
+"""
+
+import argparse
+import json
+import math
+import os
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from columnar_export import RETAILER_COLUMNS, load_retailer_csv
+
+PUBLIC_DIR = "../app/public"
+OUTPUT_NAME = "matches.json"
+
+MATCH_THRESHOLD = float(os.environ.get('MATCH_THRESHOLD', '0.6'))
+BRAND_THRESHOLD = float(os.environ.get('MATCH_BRAND_THRESHOLD', '0.7'))
+UNKNOWN_SIZE_THRESHOLD = float(os.environ.get('MATCH_UNKNOWN_SIZE_THRESHOLD', '0.7'))
+BLOCK_TOKENS = 3
+MAX_POSTINGS = 300
+SIZE_TOLERANCE = 0.9  # smaller pack / larger pack
+
+# Retailer key -> store name used by the app
+STORE_NAMES = {
+    'aldi': "ALDI",
+    'tesco': "Tesco",
+    'sainsburys': "Sainsbury's",
+    'morrisons': "Morrisons",
+    'asda': "ASDA",
+}
+
+OWN_LABEL_PATTERN = (
+    r'\b(?:tesco|sainsburys|aldi|morrisons|asda|finest|taste the difference|specially selected|'
+    r'everyday essentials|hearty food co|natures pick|willow farms|extra special|just essentials|stockwell)\b'
+)
+SIZE_TOKEN_PATTERN = (
+    r'\b\d+(?:\.\d+)?\s*(?:x\s*\d+(?:\.\d+)?\s*)?'
+    r'(?:kg|g|ml|cl|l|ltrs?|litres?|pints?|pack|pk|pieces|count|x)\b|\bx\s*\d+\b'
+)
+STOPWORDS = {'and', 'with', 'the', 'for', 'from', 'fresh', 'frozen', 'chilled', 'new', 'extra',
+             'premium', 'pack', 'each', 'per'}
+
+def lowercase_names(names):
+    return pd.Series(names, dtype="string").fillna("").str.lower().str.replace("'", "", regex=False)
+
+def normalise_names(names):
+    """Lowercase names with own-label names, sizes and punctuation removed (vectorised)"""
+    return (
+        lowercase_names(names)
+            .str.replace(OWN_LABEL_PATTERN, " ", regex=True)
+            .str.replace(SIZE_TOKEN_PATTERN, " ", regex=True)
+            .str.replace(r'[^a-z0-9]+', " ", regex=True)
+    )
+
+def tokenise(name):
+    return frozenset(word for word in name.split() if len(word) > 2 and word not in STOPWORDS)
+
+def load_catalogue(directory=PUBLIC_DIR):
+    """Every published product with its pack size, one row per retailer and name"""
+    frames = []
+    for retailer in RETAILER_COLUMNS:
+        path = os.path.join(directory, f"{retailer}.csv")
+        if os.path.exists(path):
+            frames.append(load_retailer_csv(retailer, path))
+        else:
+            print(f"⏭️ {retailer}: no {path}")
+    if not frames:
+        return pd.DataFrame(columns=['retailer', 'name'])
+    catalogue = pd.concat(frames, ignore_index=True)
+    catalogue = catalogue[catalogue['name'].notna()]
+    return catalogue.drop_duplicates(['retailer', 'name']).reset_index(drop=True)
+
+def optional(column):
+    return [None if pd.isna(value) else value for value in column.tolist()]
+
+class ProductIndex:
+    """
+    Inverted index over the catalogue's name tokens.
+
+    Args:
+        catalogue (DataFrame): retailer, name, base_unit and total_quantity columns.
+    """
+
+    def __init__(self, catalogue):
+        self.retailers = catalogue['retailer'].tolist()
+        self.base_units = optional(catalogue['base_unit'])
+        self.quantities = optional(catalogue['total_quantity'])
+        self.pack_counts = optional(catalogue['pack_count'])
+        names = normalise_names(catalogue['name']).tolist()
+        self.tokens = [tokenise(name) for name in names]
+        # First word of a branded product's name is its brand; own-label products have none
+        own_label = lowercase_names(catalogue['name']).str.contains(OWN_LABEL_PATTERN, regex=True).tolist()
+        self.brands = [None if own else next(iter(name.split()), None) for name, own in zip(names, own_label)]
+
+        frequency = Counter(token for tokens in self.tokens for token in tokens)
+        count = max(len(self.tokens), 1)
+        self.idf = {token: math.log(count / df) for token, df in frequency.items()}
+        self.weights = [sum(self.idf[token] for token in tokens) for tokens in self.tokens]
+
+        self.blocks = []
+        self.postings = defaultdict(list)
+        for product, tokens in enumerate(self.tokens):
+            rare = sorted((token for token in tokens if frequency[token] <= MAX_POSTINGS),
+                          key=lambda token: (frequency[token], token))[:BLOCK_TOKENS]
+            self.blocks.append(rare)
+            for token in rare:
+                self.postings[token].append(product)
+
+    def candidates(self, product):
+        """Later products from other retailers sharing one of ``product``'s block tokens"""
+        retailer = self.retailers[product]
+        found = set()
+        for token in self.blocks[product]:
+            for other in self.postings[token]:
+                if other > product and self.retailers[other] != retailer:
+                    found.add(other)
+        return found
+
+    def similarity(self, a, b):
+        """IDF-weighted Jaccard similarity of two products' tokens"""
+        shared = sum(self.idf[token] for token in self.tokens[a] & self.tokens[b])
+        union = self.weights[a] + self.weights[b] - shared
+        return shared / union if union else 0.0
+
+    def size(self, product):
+        return self.base_units[product], self.quantities[product], self.pack_counts[product]
+
+    def required_score(self, a, b, threshold=MATCH_THRESHOLD):
+        """Similarity ``a`` and ``b`` need to match: higher for different brands or an unknown size"""
+        if not (known_size(self.size(a)) and known_size(self.size(b))):
+            threshold = max(threshold, UNKNOWN_SIZE_THRESHOLD)
+        brand_a, brand_b = self.brands[a], self.brands[b]
+        if brand_a and brand_b and brand_a != brand_b:
+            threshold = max(threshold, BRAND_THRESHOLD)
+        return threshold
+
+def known_size(size):
+    unit, quantity, _ = size
+    return unit is not None and bool(quantity)
+
+def sizes_compatible(a, b):
+    """
+    Known sizes need the same unit and a similar amount. An unknown size is
+    compatible with anything but a multipack, which is never the single item.
+    """
+    if not known_size(a) or not known_size(b):
+        known = a if known_size(a) else b
+        return not (known_size(known) and (known[2] or 1) > 1)
+    (unit_a, quantity_a, _), (unit_b, quantity_b, _) = a, b
+    return unit_a == unit_b and min(quantity_a, quantity_b) / max(quantity_a, quantity_b) >= SIZE_TOLERANCE
+
+def pair_matches(index, a, b, threshold=MATCH_THRESHOLD):
+    """True if ``a`` and ``b`` are similar enough, and of compatible sizes, to be the same product"""
+    return (sizes_compatible(index.size(a), index.size(b))
+            and index.similarity(a, b) >= index.required_score(a, b, threshold))
+
+def scored_pairs(index, threshold=MATCH_THRESHOLD):
+    """
+    Score the blocked candidate pairs.
+
+    Returns:
+        tuple: (pairs, candidates) - (score, a, b) for every pair scoring at
+        least ``index.required_score`` with compatible sizes, and how many
+        pairs were scored.
+    """
+    pairs = []
+    candidates = 0
+    for product in range(len(index.tokens)):
+        others = index.candidates(product)
+        candidates += len(others)
+        for other in others:
+            score = index.similarity(product, other)
+            if (score >= index.required_score(product, other, threshold)
+                    and sizes_compatible(index.size(product), index.size(other))):
+                pairs.append((score, product, other))
+    return pairs, candidates
+
+def cluster_pairs(index, pairs, threshold=MATCH_THRESHOLD):
+    """
+    Greedy complete-linkage clustering: strongest pairs first, one product per
+    retailer per cluster, every member matching every other.
+
+    Returns:
+        list: (score, products) per cluster of two or more, where score is the
+        weakest pair that joined it.
+    """
+    parent = list(range(len(index.tokens)))
+    members = {}
+
+    def find(product):
+        while parent[product] != product:
+            parent[product] = parent[parent[product]]
+            product = parent[product]
+        return product
+
+    def cluster(root):
+        return members.get(root) or {'score': 1.0, 'products': [root],
+                                     'retailers': {index.retailers[root]}}
+
+    for score, a, b in sorted(pairs, reverse=True):
+        root_a, root_b = find(a), find(b)
+        if root_a == root_b:
+            continue
+        first, second = cluster(root_a), cluster(root_b)
+        if first['retailers'] & second['retailers']:
+            continue
+        if not all(pair_matches(index, x, y, threshold)
+                   for x in first['products'] for y in second['products']):
+            continue
+        parent[root_b] = root_a
+        members.pop(root_b, None)
+        members[root_a] = {
+            'score': min(first['score'], second['score'], score),
+            'products': first['products'] + second['products'],
+            'retailers': first['retailers'] | second['retailers'],
+        }
+    return [(group['score'], group['products']) for group in members.values()]
+
+def match_products(catalogue, threshold=MATCH_THRESHOLD):
+    """Clusters of equivalent products across retailers, strongest first"""
+    index = ProductIndex(catalogue)
+    pairs, candidates = scored_pairs(index, threshold)
+    clusters = cluster_pairs(index, pairs, threshold)
+    print(f"🔎 {len(catalogue)} products, {len(index.postings)} indexed tokens, "
+          f"{candidates} candidate pairs scored, {len(pairs)} matched")
+    return sorted(clusters, key=lambda cluster: (-cluster[0], -len(cluster[1])))
+
+def member(row):
+    product = {'store': STORE_NAMES[row['retailer']], 'name': row['name']}
+    for column in ('price_pence', 'unit_price_pence', 'unit_basis'):
+        if not pd.isna(row[column]):
+            product[column] = row[column].item() if hasattr(row[column], 'item') else row[column]
+    return product
+
+def write_matches(catalogue, clusters, path, threshold=MATCH_THRESHOLD):
+    """Write the clusters as JSON for the app (atomically, so it never serves half a file)"""
+    rows = catalogue.to_dict('records')
+    document = {
+        'generated_at': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'threshold': threshold,
+        'clusters': [
+            {'score': round(score, 3), 'products': [member(rows[product]) for product in products]}
+            for score, products in clusters
+        ],
+    }
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(document, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, path)
+    return path
+
+def build_matches(directory=PUBLIC_DIR, threshold=MATCH_THRESHOLD):
+    """
+    Match the CSVs in ``directory`` and write <directory>/matches.json.
+
+    Returns:
+        str: Path written, or None if there was nothing to match.
+    """
+    start = time.perf_counter()
+    catalogue = load_catalogue(directory)
+    if catalogue['retailer'].nunique() < 2:
+        print("⏭️ Need products from at least two retailers to match")
+        return None
+    clusters = match_products(catalogue, threshold)
+    path = write_matches(catalogue, clusters, os.path.join(directory, OUTPUT_NAME), threshold)
+    matched = sum(len(products) for _, products in clusters)
+    print(f"✅ Saved matches: {path} ({len(clusters)} clusters covering {matched} products, "
+          f"{time.perf_counter() - start:.1f}s)")
+    return path
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Match products across retailers and publish matches.json")
+    parser.add_argument("--directory", default=PUBLIC_DIR,
+                        help="Folder holding the retailer CSVs; matches.json is written there too")
+    parser.add_argument("--threshold", type=float, default=MATCH_THRESHOLD,
+                        help="Minimum weighted name similarity for two products to match (raised for "
+                             "different brands or unknown sizes)")
+    args = parser.parse_args()
+
+    build_matches(args.directory, args.threshold)
@@ -0,0 +1,225 @@
+"""
+Streaming CSV output for scraped products.
+
+Scrapers used to collect every product of a run in one list and build a
+DataFrame from it at the end, so memory grew with the size of the catalogue
+and nothing was written until the last category finished. A ProductSink is
+fed each category (or page) as soon as it is scraped instead. Rows are
+cleaned and de-duplicated on the way in, buffered up to BATCH_SIZE and then
+appended to <retailer>.partial.csv, so the only things kept for the whole run
+are a short digest per distinct row and a few counters. Each batch also gets
+a price_pence column from the shared price normalisation (see
+price_normalisation.py), so every retailer's CSV carries the same numeric price.
+
+close() publishes the finished file as <retailer>.csv and copies it to
+app/public, with a Parquet copy of each (see columnar_export.py). An
+interrupted run leaves only the partial file behind and never replaces the
+last complete CSV the app serves. save_partial() is what the scrapers' SIGTERM
+handler runs: it also writes the checkpointed pages of categories that were
+still being scraped, so a timeout loses no more than the pages in progress.
+"""
+
+import csv
+import hashlib
+import math
+import os
+import shutil
+import threading
+from collections import Counter
+
+import pandas as pd
+
+from columnar_export import export_retailer
+from price_normalisation import normalise_prices
+
+BATCH_SIZE = int(os.environ.get('SCRAPER_SINK_BATCH', '500'))
+PENCE_FIELD = 'price_pence'
+PUBLIC_DIR = "../app/public"
+
+def is_blank(value):
+    """True for None, NaN and empty / whitespace-only strings"""
+    if value is None:
+        return True
+    if isinstance(value, float):
+        return math.isnan(value)
+    return isinstance(value, str) and not value.strip()
+
+class ProductSink:
+    """
+    Incremental, de-duplicating CSV writer for one scraper run.
+
+    Args:
+        retailer (str): Output name; writes <retailer>.partial.csv, then <retailer>.csv.
+        fieldnames (list): CSV columns, in order. Other keys in a row are ignored.
+        dedup_key (list): Columns that identify a duplicate; the first row wins.
+            None keeps every row.
+        required (list): Columns a row must have a non-blank value in to be kept.
+        transform: Optional function applied to each kept row before it is
+            written, e.g. to add a derived column.
+        count_by (str): Column to keep per-value row counts of (see ``counts``).
+        price_field (str): Column holding the raw price text; adds a
+            price_pence column normalised from it.
+        pounds_field (str): Optional column to also fill with that price in pounds.
+        batch_size (int): Rows buffered before they are appended to disk.
+    """
+
+    def __init__(self, retailer, fieldnames, dedup_key=None, required=(), transform=None,
+                 count_by=None, price_field=None, pounds_field=None, batch_size=BATCH_SIZE,
+                 public_dir=PUBLIC_DIR):
+        self.retailer = retailer
+        self.fieldnames = list(fieldnames)
+        if price_field and PENCE_FIELD not in self.fieldnames:
+            self.fieldnames.append(PENCE_FIELD)
+        self.price_field = price_field
+        self.pounds_field = pounds_field
+        self.dedup_key = list(dedup_key) if dedup_key else None
+        self.required = list(required)
+        self.transform = transform
+        self.count_by = count_by
+        self.batch_size = max(1, batch_size)
+        self.public_dir = public_dir
+        self.path = f"{retailer}.partial.csv"
+        self.output_path = f"{retailer}.csv"
+
+        self.received = 0
+        self.written = 0
+        self.dropped = 0
+        self.duplicates = 0
+        self.counts = Counter()
+        self.units = set()
+
+        # Re-entrant so the SIGTERM handler can flush while the main thread is mid-add
+        self._lock = threading.RLock()
+        self._seen = set()
+        self._buffer = []
+        self._batch = []
+        self._committed = 0
+        self._file = None
+        self._writer = None
+
+    def _digest(self, row):
+        key = "\x1f".join(str(row.get(column)) for column in self.dedup_key)
+        return hashlib.blake2b(key.encode("utf-8"), digest_size=12).digest()
+
+    def add(self, rows, unit=None):
+        """
+        Clean, de-duplicate and buffer ``rows``; full batches are written straight away.
+
+        ``unit`` names the checkpoint unit (category) the rows complete, so
+        save_partial() does not write it a second time.
+        """
+        with self._lock:
+            for row in rows:
+                self.received += 1
+                if any(is_blank(row.get(column)) for column in self.required):
+                    self.dropped += 1
+                    continue
+                if self.dedup_key:
+                    digest = self._digest(row)
+                    if digest in self._seen:
+                        self.duplicates += 1
+                        continue
+                    self._seen.add(digest)
+                if self.transform:
+                    row = self.transform(row)
+                if self.count_by:
+                    self.counts[row.get(self.count_by)] += 1
+                self._buffer.append(row)
+            if unit is not None:
+                self.units.add(unit)
+            if len(self._buffer) >= self.batch_size:
+                self.flush()
+
+    def _with_prices(self, rows):
+        """Copies of ``rows`` with the batch's prices normalised in one vectorised pass"""
+        pence = normalise_prices([row.get(self.price_field) for row in rows])['price_pence']
+        priced = []
+        for row, value in zip(rows, pence.tolist()):
+            value = None if pd.isna(value) else int(value)
+            row = {**row, PENCE_FIELD: value}
+            if self.pounds_field:
+                row[self.pounds_field] = None if value is None else value / 100
+            priced.append(row)
+        return priced
+
+    def _open(self):
+        self._file = open(self.path, "w", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, fieldnames=self.fieldnames, extrasaction="ignore")
+        self._writer.writeheader()
+        self._file.flush()
+        self._committed = self._file.tell()
+
+    def flush(self):
+        """
+        Append the buffered rows to the partial file.
+
+        The SIGTERM handler can run this while the main thread is itself in
+        the middle of it. A batch still in ``_batch`` may then be partly on
+        disk, so it is cut back to the last complete batch and written again
+        rather than being lost or appearing twice.
+        """
+        with self._lock:
+            if self._batch and self._committed:
+                self._file.seek(self._committed)
+                self._file.truncate()
+            elif self._batch:
+                self._file = None  # cut off while opening the file; start it again
+            # One statement, so each row is either still buffered or in the batch, never both
+            self._batch, self._buffer = self._batch + self._buffer, []
+            if not self._batch:
+                return
+            rows = self._with_prices(self._batch) if self.price_field else self._batch
+            if self._file is None:
+                self._open()
+            self._writer.writerows(rows)
+            self._file.flush()
+            self._batch = []
+            self._committed = self._file.tell()
+            self.written += len(rows)
+
+    def save_partial(self, checkpoint=None):
+        """
+        Write everything scraped so far to the partial file (the SIGTERM handler).
+
+        Pages in ``checkpoint`` belonging to categories not yet passed to add()
+        (still being scraped, or finished but not collected) are added first,
+        through the same cleaning and de-duplication.
+        """
+        with self._lock:
+            if checkpoint is not None:
+                self.add(checkpoint.rows(skip=self.units))
+            self.flush()
+        print(f"💾 Saved {self.written} partial rows to {self.path}")
+
+    def close(self):
+        """
+        Write what is left and publish <retailer>.csv (and .parquet) locally and to app/public.
+
+        Returns:
+            bool: False (and nothing published) if no rows were kept.
+        """
+        with self._lock:
+            self.flush()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self._seen = set()
+
+        if not self.written:
+            return False
+
+        os.replace(self.path, self.output_path)
+        print(f"✅ Saved to local: {self.output_path} ({self.written} rows, "
+              f"{self.duplicates} duplicates and {self.dropped} incomplete rows skipped)")
+        try:
+            os.makedirs(self.public_dir, exist_ok=True)
+            public_path = os.path.join(self.public_dir, self.output_path)
+            shutil.copyfile(self.output_path, public_path)
+            print(f"✅ Saved to public: {public_path}")
+        except OSError as e:
+            print(f"⚠️ Could not copy {self.output_path} to {self.public_dir}: {e}")
+        try:
+            export_retailer(self.retailer, self.output_path, directories=(".", self.public_dir))
+        except Exception as e:
+            print(f"⚠️ Parquet export failed for {self.retailer}: {e}")
+        return True
@@ -0,0 +1,120 @@
+"""
+Per-host token-bucket rate limiting shared by every worker in a scraper.
+
+Every navigation (driver.get, HTTP fetch or a click that loads a new results
+page) takes a token from its host's bucket first. Buckets refill at a
+steady requests-per-second rate and hold up to ``burst`` tokens, so workers
+only sleep once the budget is actually used up. When they do, a little
+random jitter is added so several browsers don't fire in lockstep.
+
+Limits per host are set in HOST_LIMITS. RATE_LIMIT_RPS, RATE_LIMIT_BURST and
+RATE_LIMIT_JITTER override them for every host.
+"""
+
+import os
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+DEFAULT_RATE = 1.0  # requests per second
+DEFAULT_BURST = 2
+DEFAULT_JITTER = 0.25  # extra random delay, as a fraction of one token's interval
+
+# host -> (requests per second, burst)
+HOST_LIMITS = {
+    'www.aldi.co.uk': (1.0, 3),
+    'www.tesco.com': (0.5, 2),
+    'www.sainsburys.co.uk': (1.0, 2),
+    'groceries.morrisons.com': (1.0, 3),
+    'www.asda.com': (1.0, 3),
+}
+
+def _env_float(name):
+    value = os.environ.get(name)
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+class TokenBucket:
+    """
+    A thread-safe token bucket.
+
+    Tokens may go negative: each caller reserves its slot under the lock and
+    then sleeps outside it, so concurrent callers queue up in arrival order.
+    """
+
+    def __init__(self, rate, burst, jitter=DEFAULT_JITTER):
+        self.rate = max(float(rate), 0.001)
+        self.burst = max(float(burst), 1.0)
+        self.jitter = max(float(jitter), 0.0)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Take a token and return how long the caller must wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            delay = -self._tokens / self.rate
+        return delay + random.uniform(0, self.jitter / self.rate)
+
+    def acquire(self):
+        """Block until a token is available; returns the seconds slept"""
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+class HostRateLimiter:
+    """
+    One token bucket per host.
+
+    Args:
+        rate (float): Requests per second for hosts not in HOST_LIMITS (or for all hosts
+            when RATE_LIMIT_RPS is set).
+        burst (int): Bucket size - requests allowed back to back before throttling.
+        jitter (float): Random extra delay when throttled, as a fraction of 1/rate.
+    """
+
+    def __init__(self, rate=None, burst=None, jitter=None):
+        self.rate_override = rate if rate is not None else _env_float('RATE_LIMIT_RPS')
+        self.burst_override = burst if burst is not None else _env_float('RATE_LIMIT_BURST')
+        env_jitter = _env_float('RATE_LIMIT_JITTER')
+        self.jitter = jitter if jitter is not None else (env_jitter if env_jitter is not None else DEFAULT_JITTER)
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def limits_for(self, host):
+        rate, burst = HOST_LIMITS.get(host, (DEFAULT_RATE, DEFAULT_BURST))
+        if self.rate_override:
+            rate = self.rate_override
+        if self.burst_override:
+            burst = self.burst_override
+        return rate, burst
+
+    def bucket(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._buckets:
+                rate, burst = self.limits_for(host)
+                self._buckets[host] = TokenBucket(rate, burst, self.jitter)
+            return self._buckets[host]
+
+    def wait(self, url):
+        """Block until a request to ``url``'s host is allowed; returns the seconds waited"""
+        return self.bucket(url).acquire()
+
+# Shared by every scraper thread in the process
+RATE_LIMITER = HostRateLimiter()
+
+def polite_get(driver, url):
+    """``driver.get(url)`` once the host's rate limit allows it"""
+    RATE_LIMITER.wait(url)
+    driver.get(url)
@@ -0,0 +1,240 @@
+"""
+Network-level request blocking for scraper browsers via the DevTools protocol.
+
+Chrome ignores flags like --disable-images/--disable-css, so listing pages
+still pulled down images, fonts, trackers and ad scripts. Here the browser
+is told to drop those requests with Network.setBlockedURLs. Blocking is
+driven by resource type (mapped to URL patterns) plus a per-retailer
+allow/deny list.
+
+Set RESOURCE_BLOCKING=off to disable blocking, or RESOURCE_BLOCKING=report
+to also print transferred and (estimated) saved bytes for every page.
+"""
+
+import json
+import os
+from collections import defaultdict
+
+BLOCKING_MODE = os.environ.get('RESOURCE_BLOCKING', 'on').lower()
+
+# URL patterns for each blockable resource type
+RESOURCE_TYPE_PATTERNS = {
+    'image': ['*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.avif', '*.svg', '*.ico', '*.bmp'],
+    'font': ['*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot'],
+    'media': ['*.mp4', '*.webm', '*.mp3', '*.m3u8', '*.ogg'],
+    'stylesheet': ['*.css'],
+}
+
+# Analytics, ads and session-replay scripts that never affect listing content
+TRACKER_PATTERNS = [
+    '*google-analytics.com*',
+    '*googletagmanager.com*',
+    '*doubleclick.net*',
+    '*googlesyndication.com*',
+    '*adservice.google.*',
+    '*connect.facebook.net*',
+    '*hotjar.com*',
+    '*clarity.ms*',
+    '*optimizely.com*',
+    '*criteo.*',
+    '*adnxs.com*',
+    '*scorecardresearch.com*',
+    '*quantserve.com*',
+    '*bat.bing.com*',
+    '*analytics.tiktok.com*',
+    '*ct.pinterest.com*',
+    '*nr-data.net*',
+    '*js-agent.newrelic.com*',
+    '*doubleverify.com*',
+    '*demdex.net*',
+    '*omtrdc.net*',
+    '*tealiumiq.com*',
+    '*tags.tiqcdn.com*',
+]
+
+# Per-retailer rules. ``allow_types`` keeps resource types a scraper relies on
+# (e.g. stylesheets, where is_displayed() checks or scroll heights depend on
+# layout); ``deny`` adds extra URL patterns such as image CDNs that serve
+# files without an extension.
+RETAILER_RULES = {
+    'aldi': {
+        'allow_types': [],
+        'deny': [],
+    },
+    'tesco': {
+        'allow_types': ['stylesheet'],
+        'deny': ['*digitalcontent.api.tesco.com*'],
+    },
+    'sainsburys': {
+        'allow_types': ['stylesheet'],
+        'deny': [],
+    },
+    'morrisons': {
+        'allow_types': ['stylesheet'],
+        'deny': [],
+    },
+    'asda': {
+        'allow_types': ['stylesheet'],
+        'deny': ['*scene7.com*'],
+    },
+}
+
+def blocked_url_patterns(retailer):
+    """Build the Network.setBlockedURLs pattern list for a retailer"""
+    rules = RETAILER_RULES.get(retailer, {'allow_types': [], 'deny': []})
+    patterns = []
+    for resource_type, type_patterns in RESOURCE_TYPE_PATTERNS.items():
+        if resource_type not in rules['allow_types']:
+            patterns.extend(type_patterns)
+    patterns.extend(TRACKER_PATTERNS)
+    patterns.extend(rules['deny'])
+    return patterns
+
+def drain_performance_log(driver):
+    """Return parsed DevTools messages from the performance log (reading clears it)"""
+    try:
+        entries = driver.get_log('performance')
+    except Exception:
+        return []
+    messages = []
+    for entry in entries:
+        try:
+            messages.append(json.loads(entry['message'])['message'])
+        except (KeyError, ValueError):
+            continue
+    return messages
+
+def summarise_network(messages):
+    """
+    Summarise the network activity of one page load.
+
+    Returns:
+        dict: Request count, transferred bytes, bytes per resource type and
+        counts of requests the browser blocked, by resource type.
+    """
+    request_types = {}
+    bytes_by_type = defaultdict(int)
+    blocked_by_type = defaultdict(int)
+    requests_seen = 0
+
+    for message in messages:
+        method = message.get('method')
+        params = message.get('params', {})
+        if method == 'Network.requestWillBeSent':
+            requests_seen += 1
+            request_types[params.get('requestId')] = params.get('type', 'Other')
+        elif method == 'Network.loadingFinished':
+            resource_type = request_types.get(params.get('requestId'), 'Other')
+            bytes_by_type[resource_type] += int(params.get('encodedDataLength', 0))
+        elif method == 'Network.loadingFailed' and params.get('blockedReason'):
+            resource_type = params.get('type') or request_types.get(params.get('requestId'), 'Other')
+            blocked_by_type[resource_type] += 1
+
+    return {
+        'requests': requests_seen,
+        'bytes': sum(bytes_by_type.values()),
+        'bytes_by_type': dict(bytes_by_type),
+        'blocked': sum(blocked_by_type.values()),
+        'blocked_by_type': dict(blocked_by_type),
+    }
+
+class ResourceBlocker:
+    """
+    Installs a retailer's blocking rules on each browser and optionally reports savings.
+
+    In report mode the first page is also loaded once without blocking, in a
+    throwaway tab so the scraper's own page is left as it was, to learn the
+    average size of each resource type. Per-page "saved" figures
+    are then the blocked request counts multiplied by those averages.
+    """
+
+    def __init__(self, retailer, mode=None):
+        self.retailer = retailer
+        self.mode = (mode or BLOCKING_MODE).lower()
+        self.patterns = blocked_url_patterns(retailer)
+        self._average_bytes = None
+
+    @property
+    def enabled(self):
+        return self.mode != 'off'
+
+    @property
+    def reporting(self):
+        return self.mode == 'report'
+
+    def configure_options(self, options):
+        """Enable the performance log on ChromeOptions when reporting"""
+        if self.reporting:
+            options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+        return options
+
+    def install(self, driver):
+        """Apply the blocking rules to a freshly started browser"""
+        if not self.enabled:
+            return driver
+        try:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.patterns})
+        except Exception as e:
+            print(f"⚠️ Could not enable resource blocking for {self.retailer}: {e}")
+        return driver
+
+    def _learn_baseline(self, driver, url):
+        """Load ``url`` unblocked in a new tab and record the average bytes per resource type"""
+        original = driver.current_window_handle
+        driver.switch_to.new_window('tab')
+        try:
+            # CDP commands go to the current tab, so the scraper's tab keeps its blocking
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': []})
+            driver.execute_cdp_cmd('Network.clearBrowserCache', {})
+            drain_performance_log(driver)
+            driver.get(url)
+            messages = drain_performance_log(driver)
+        finally:
+            driver.close()
+            driver.switch_to.window(original)
+
+        counts = defaultdict(int)
+        sizes = defaultdict(int)
+        request_types = {}
+        for message in messages:
+            params = message.get('params', {})
+            if message.get('method') == 'Network.requestWillBeSent':
+                request_types[params.get('requestId')] = params.get('type', 'Other')
+            elif message.get('method') == 'Network.loadingFinished':
+                resource_type = request_types.get(params.get('requestId'), 'Other')
+                counts[resource_type] += 1
+                sizes[resource_type] += int(params.get('encodedDataLength', 0))
+        self._average_bytes = {t: sizes[t] / counts[t] for t in counts}
+
+    def report_page(self, driver, url, messages=None):
+        """
+        Print transferred and estimated saved bytes for the page just loaded.
+
+        No-op unless the blocker is in report mode. Pass ``messages`` when the
+        performance log was already drained by someone else (reading clears it).
+        """
+        if not self.reporting:
+            return None
+        if messages is None:
+            messages = drain_performance_log(driver)
+        stats = summarise_network(messages)
+        if self._average_bytes is None:
+            try:
+                self._learn_baseline(driver, url)
+            except Exception as e:
+                print(f"⚠️ Could not measure unblocked baseline for {self.retailer}: {e}")
+                self._average_bytes = {}
+
+        saved = sum(
+            count * self._average_bytes.get(resource_type, 0)
+            for resource_type, count in stats['blocked_by_type'].items()
+        )
+        stats['bytes_saved'] = int(saved)
+        print(
+            f"📉 {self.retailer} {url}: {stats['requests']} requests, "
+            f"{stats['bytes'] / 1024:.0f} KB transferred, {stats['blocked']} blocked, "
+            f"~{saved / 1024:.0f} KB saved"
+        )
+        return stats
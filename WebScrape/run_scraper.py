@@ -1,61 +1,235 @@
 #!/usr/bin/env python3
+"""
+Run every retailer scraper, concurrently where the machine allows it.
+
+Retailers never share a host, so their scrapers can overlap freely; the only
+limit is the machine. Each scraper is granted a number of browsers (up to
+its own cap) from a global budget derived from CPU count and available
+memory, and is only started while CPU load and free RAM leave room for it.
+The grant is passed to the scraper through its worker-count env var.
+"""
 import sys
 import subprocess
 import os
+import time
+import argparse
 from datetime import datetime
 
-def run_scraper(script_name, timeout_minutes=30):
-    """Run a scraper script with timeout and error handling"""
-    print(f"🚀 Starting {script_name}...")
-    start_time = datetime.now()
-    
+import psutil
+
+from columnar_export import export_combined
+from product_matching import build_matches
+
+# Rough footprint of one headless Chrome with a listing page open
+BROWSER_RSS_MB = 450
+# Memory kept free for the OS and the Python processes themselves
+RESERVED_MB = 1024
+# Don't start another scraper while system CPU is busier than this
+CPU_LIMIT_PERCENT = 85
+POLL_SECONDS = 2
+# Time a timed-out scraper gets to save partial results after SIGTERM
+TERMINATE_GRACE_SECONDS = 30
+
+# (script, timeout minutes, max browsers, env var carrying the grant)
+SCRAPERS = [
+    ("aldi.py", 30, 1, None),
+    ("tesco.py", 30, 1, "TESCO_MAX_WORKERS"),
+    ("sainsburys.py", 40, 3, "SAINSBURYS_PAGE_WORKERS"),
+    ("morrisons.py", 30, 3, "MORRISONS_MAX_WORKERS"),
+    ("asda.py", 45, 3, "ASDA_MAX_WORKERS"),
+]
+
+def browser_budget():
+    """How many browsers this machine can run at once"""
+    available_mb = psutil.virtual_memory().available / (1024 * 1024)
+    by_memory = int((available_mb - RESERVED_MB) // BROWSER_RSS_MB)
+    by_cpu = (psutil.cpu_count() or 1) * 2
+    return max(1, min(by_memory, by_cpu))
+
+def tree_rss_mb(process):
+    """Resident memory of a scraper plus every browser it started"""
+    total = 0
+    try:
+        processes = [process] + process.children(recursive=True)
+    except psutil.NoSuchProcess:
+        return 0
+    for proc in processes:
+        try:
+            total += proc.memory_info().rss
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+    return total / (1024 * 1024)
+
+def kill_tree(process, grace_seconds=TERMINATE_GRACE_SECONDS):
+    """
+    Stop a scraper and the Chrome/chromedriver processes under it.
+
+    The scraper gets SIGTERM first so it can write its checkpoints and a
+    partial CSV; anything still alive after ``grace_seconds`` is killed.
+    """
     try:
-        # Run the scraper
-        result = subprocess.run(
-            [sys.executable, script_name],
-            timeout=timeout_minutes * 60,
-            capture_output=True,
-            text=True,
-            cwd=os.path.dirname(os.path.abspath(__file__))
+        children = process.children(recursive=True)
+    except psutil.NoSuchProcess:
+        children = []
+    try:
+        process.terminate()
+        process.wait(timeout=grace_seconds)
+    except psutil.TimeoutExpired:
+        pass
+    except psutil.NoSuchProcess:
+        pass
+    for proc in children + [process]:
+        try:
+            proc.kill()
+        except psutil.NoSuchProcess:
+            pass
+
+class ScraperRun:
+    """One scraper subprocess and its bookkeeping"""
+
+    def __init__(self, script_name, timeout_minutes, max_browsers, workers_env, resume=False, delta=False):
+        self.script_name = script_name
+        self.resume = resume
+        self.delta = delta
+        self.timeout_minutes = timeout_minutes
+        self.max_browsers = max_browsers
+        self.workers_env = workers_env
+        self.browsers = 0
+        self.process = None
+        self.log_file = None
+        self.start_time = None
+        self.peak_rss_mb = 0
+        self.success = None
+
+    @property
+    def log_path(self):
+        return os.path.join(os.path.dirname(os.path.abspath(__file__)), f"{os.path.splitext(self.script_name)[0]}.log")
+
+    def start(self, browsers):
+        """Launch the scraper with ``browsers`` browsers granted"""
+        self.browsers = browsers
+        env = os.environ.copy()
+        # Tells scrapers that others share this machine's browsers and driver files
+        env['SCRAPER_ORCHESTRATED'] = '1'
+        if self.workers_env:
+            env[self.workers_env] = str(browsers)
+        print(f"🚀 Starting {self.script_name} with {browsers} browser(s)...")
+        self.start_time = datetime.now()
+        self.log_file = open(self.log_path, "w", encoding="utf-8")
+        flags = (["--resume"] if self.resume else []) + (["--delta"] if self.delta else [])
+        process = subprocess.Popen(
+            [sys.executable, self.script_name] + flags,
+            stdout=self.log_file,
+            stderr=subprocess.STDOUT,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            env=env,
         )
-        
-        end_time = datetime.now()
-        duration = end_time - start_time
-        
-        if result.returncode == 0:
-            print(f"✅ {script_name} completed successfully in {duration}")
-            if result.stdout:
-                print("Output:", result.stdout[-500:])  # Last 500 chars
+        self.process = psutil.Process(process.pid)
+        self._popen = process
+
+    def poll(self):
+        """Update memory stats; returns True once the scraper has finished or been killed"""
+        self.peak_rss_mb = max(self.peak_rss_mb, tree_rss_mb(self.process))
+        returncode = self._popen.poll()
+        duration = datetime.now() - self.start_time
+
+        if returncode is None:
+            if duration.total_seconds() < self.timeout_minutes * 60:
+                return False
+            kill_tree(self.process)
+            self._popen.wait()
+            print(f"⏰ {self.script_name} timed out after {self.timeout_minutes} minutes")
+            self.success = False
+        elif returncode == 0:
+            print(f"✅ {self.script_name} completed successfully in {duration} (peak {self.peak_rss_mb:.0f} MB)")
+            self.success = True
         else:
-            print(f"❌ {script_name} failed with return code {result.returncode}")
-            if result.stderr:
-                print("Error:", result.stderr[-500:])
-        
-        return result.returncode == 0
-        
-    except subprocess.TimeoutExpired:
-        print(f"⏰ {script_name} timed out after {timeout_minutes} minutes")
-        return False
-    except Exception as e:
-        print(f"💥 {script_name} crashed: {e}")
-        return False
+            print(f"❌ {self.script_name} failed with return code {returncode}")
+            self.success = False
+
+        self.log_file.close()
+        self._print_tail("Output:" if self.success else "Error:")
+        return True
+
+    def _print_tail(self, label):
+        try:
+            with open(self.log_path, "r", encoding="utf-8", errors="replace") as f:
+                tail = f.read()[-500:]  # Last 500 chars
+        except OSError:
+            return
+        if tail:
+            print(label, tail)
+
+def run_all(scrapers, max_browsers=None, sequential=False, resume=False, delta=False):
+    """
+    Run scrapers under a shared browser/CPU/RAM budget.
+
+    Longest-budget scrapers are started first so the slowest one isn't left
+    to run alone at the end.
+
+    Returns:
+        dict: script name -> True/False
+    """
+    budget = max_browsers or browser_budget()
+    print(f"🧮 Browser budget: {budget} | CPUs: {psutil.cpu_count()} | "
+          f"Available RAM: {psutil.virtual_memory().available / (1024 ** 3):.1f} GB")
+
+    waiting = sorted((ScraperRun(*spec, resume=resume, delta=delta) for spec in scrapers), key=lambda run: -run.timeout_minutes)
+    running = []
+    finished = []
+    psutil.cpu_percent(interval=None)  # prime the CPU meter
+
+    while waiting or running:
+        for run in list(running):
+            if run.poll():
+                running.remove(run)
+                finished.append(run)
+
+        in_use = sum(run.browsers for run in running)
+        while waiting and not (sequential and running):
+            free = budget - in_use
+            if free < 1:
+                break
+            if running and psutil.cpu_percent(interval=None) > CPU_LIMIT_PERCENT:
+                break
+            available_mb = psutil.virtual_memory().available / (1024 * 1024) - RESERVED_MB
+            if running and available_mb < BROWSER_RSS_MB:
+                break
+            grant = min(waiting[0].max_browsers, free, max(1, int(available_mb // BROWSER_RSS_MB)))
+            run = waiting.pop(0)
+            run.start(grant)
+            running.append(run)
+            in_use += grant
+
+        if running:
+            time.sleep(POLL_SECONDS)
+
+    outcome = {run.script_name: run.success for run in finished}
+    return {spec[0]: outcome.get(spec[0]) for spec in scrapers}
 
 if __name__ == "__main__":
-    scrapers = [
-        ("aldi.py", 30),
-        ("tesco.py", 30), 
-        ("sainsburys.py", 40),
-        ("morrisons.py", 30),
-        ("asda.py", 45)
-    ]
-    
-    results = {}
-    for script, timeout in scrapers:
-        results[script] = run_scraper(script, timeout)
-    
+    parser = argparse.ArgumentParser(description="Run all grocery scrapers")
+    parser.add_argument("--max-browsers", type=int, default=None,
+                        help="Cap on browsers across all scrapers (default: sized from CPU and RAM)")
+    parser.add_argument("--sequential", action="store_true",
+                        help="Run one scraper at a time, as before")
+    parser.add_argument("--resume", action="store_true",
+                        help="Pass --resume so each scraper skips work checkpointed by an interrupted run")
+    parser.add_argument("--delta", action="store_true",
+                        help="Pass --delta so each scraper reuses last run's products for unchanged categories")
+    args = parser.parse_args()
+
+    start = datetime.now()
+    results = run_all(SCRAPERS, max_browsers=args.max_browsers, sequential=args.sequential,
+                      resume=args.resume, delta=args.delta)
+
     print("\n" + "="*50)
     print("📊 SCRAPING SUMMARY:")
     for script, success in results.items():
         status = "✅ Success" if success else "❌ Failed"
         print(f"{script}: {status}")
-    print("="*50)
\ No newline at end of file
+    print(f"⏱️ Total wall time: {datetime.now() - start}")
+    public_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app", "public")
+    export_combined(public_dir)
+    build_matches(public_dir)
+    print("="*50)
@@ -1,27 +1,51 @@
 import time
-import random
-import csv
 import os
 import re
 import shutil
 import subprocess
 import psutil
+import threading
+import argparse
 from datetime import datetime
+from urllib.parse import urlsplit
 import undetected_chromedriver as uc
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from concurrent.futures import ThreadPoolExecutor, as_completed
+import lxml.html
+from lxml.cssselect import CSSSelector
+from driver_pool import DriverPool
+import chrome_cache
+from resource_blocking import ResourceBlocker
+from page_waits import wait_for_content_settled
+from page_cache import open_page, record_page
+from checkpoint import Checkpoint, flush_on_sigterm
+from product_sink import ProductSink
+from delta import DeltaStore
+from page_waits import wait_for_any_selector
+from selector_cache import SelectorCache
+from adaptive_timeouts import TimeoutPolicy
 
 # === Patch uc.Chrome destructor to prevent WinError 6 warnings ===
 uc.Chrome.__del__ = lambda self: None
 
 # ========== SCRAPER CONFIG ==========
 MAX_THREADS = 1  # Sequential for GitHub Actions stability
+# Browsers fetching the pages of one category at once (1 = walk pages serially)
+PAGE_WORKERS = int(os.environ.get('SAINSBURYS_PAGE_WORKERS', '3'))
+MAX_PAGES = 50
 BASE_URL = "https://www.sainsburys.co.uk"
 
-# Global driver management
-WORKING_DRIVER_CONFIG = None
+# Drops images, fonts and trackers at the network level
+RESOURCE_BLOCKER = ResourceBlocker('sainsburys')
+
+PRODUCT_TILE_SELECTOR = ".pt__content"
+
+# uc patches the chromedriver binary in place, so concurrent starts must not overlap
+DRIVER_CREATION_LOCK = threading.Lock()
+
+# Global driver management - seeded from the on-disk cache so a config that
+# worked on a previous run is tried first
+WORKING_DRIVER_CONFIG = chrome_cache.get_driver_config('uc')
 
 def print_progress(message, flush=True):
     """Print with immediate flush for GitHub Actions visibility"""
@@ -36,19 +60,20 @@ def debug_product_structure(product_elements, category_name):
         try:
             first_product = product_elements[0]
             print_progress(f"   🔍 DEBUG for {category_name}:")
-            print_progress(f"   🔍 Product HTML (first 300 chars): {first_product.get_attribute('outerHTML')[:300]}")
+            outer_html = lxml.html.tostring(first_product, encoding="unicode")
+            print_progress(f"   🔍 Product HTML (first 300 chars): {outer_html[:300]}")
             
             # Try to find any links
-            links = first_product.find_elements(By.TAG_NAME, "a")
+            links = first_product.findall(".//a")
             print_progress(f"   🔍 Found {len(links)} links in product")
             
             if links:
                 first_link = links[0]
-                print_progress(f"   🔍 First link text: '{first_link.text.strip()}'")
-                print_progress(f"   🔍 First link href: '{first_link.get_attribute('href')}'")
+                print_progress(f"   🔍 First link text: '{element_text(first_link)}'")
+                print_progress(f"   🔍 First link href: '{first_link.get('href')}'")
             
             # Look for any price-like text
-            all_text = first_product.text
+            all_text = element_text(first_product)
             price_matches = re.findall(r'£[\d.,]+|\d+p', all_text)
             print_progress(f"   🔍 Price-like text found: {price_matches}")
             
@@ -70,6 +95,16 @@ def extract_parent_category_from_url(url):
     except:
         return "unknown"
 
+def category_unit(url):
+    """
+    Checkpoint key for one category URL, e.g. 'groceries/frozen/vegan/c:1019988'.
+
+    The parent category is only the display name: a dozen URLs share "frozen"
+    and every /features/ page is "unknown".
+    """
+    path = urlsplit(url).path.strip('/')
+    return path.split('gol-ui/', 1)[-1] or url
+
 CATEGORY_URLS = [
     "https://www.sainsburys.co.uk/gol-ui/groceries/frozen/chips-potatoes-and-rice/c:1019895",
     "https://www.sainsburys.co.uk/gol-ui/groceries/frozen/desserts-and-pastry/c:1019902",
@@ -183,8 +218,7 @@ CATEGORY_URLS = [
     "https://www.sainsburys.co.uk/gol-ui/groceries/meat-and-fish/turkey/c:1054773"
 ]
 
-OUTPUT_FILE = "sainsburys.csv"
-APP_OUTPUT_FILE = "../app/public/sainsburys.csv"
+OUTPUT_FIELDS = ["Category", "Product Name", "Price"]  # Removed "Price with Nectar"
 
 # ====================================
 
@@ -193,11 +227,16 @@ def detect_environment():
     return os.environ.get('GITHUB_ACTIONS') == 'true'
 
 def kill_chrome_processes():
-    """Kill all Chrome and ChromeDriver processes"""
+    """
+    Kill the Chrome and ChromeDriver processes this scraper started.
+
+    Only our own descendants are touched: other scrapers started by
+    run_scraper.py run their browsers on the same machine.
+    """
     try:
-        for proc in psutil.process_iter(['pid', 'name']):
+        for proc in psutil.Process().children(recursive=True):
             try:
-                if any(name in proc.info['name'].lower() for name in ['chrome', 'chromedriver']):
+                if any(name in proc.name().lower() for name in ['chrome', 'chromedriver']):
                     proc.kill()
             except (psutil.NoSuchProcess, psutil.AccessDenied):
                 pass
@@ -206,7 +245,11 @@ def kill_chrome_processes():
         pass
 
 def get_chrome_version():
-    """Get Chrome version for both Windows and Linux"""
+    """Get Chrome version, probing only when the on-disk cache misses"""
+    return chrome_cache.cached_chrome_version(probe_chrome_version)
+
+def probe_chrome_version():
+    """Detect Chrome version for both Windows and Linux"""
     try:
         is_github = detect_environment()
         
@@ -243,10 +286,19 @@ def get_chrome_version():
         return None
 
 def cleanup_chromedriver_files():
-    """Cleanup ChromeDriver files for both environments"""
+    """
+    Cleanup ChromeDriver files for both environments.
+
+    Under run_scraper.py (SCRAPER_ORCHESTRATED=1) the undetected_chromedriver
+    files are shared with the Tesco scraper running alongside, so only our
+    own stray browsers are killed and nothing is deleted.
+    """
     try:
         kill_chrome_processes()
         
+        if os.environ.get('SCRAPER_ORCHESTRATED') == '1':
+            return
+        
         is_github = detect_environment()
         
         if is_github:
@@ -297,64 +349,33 @@ def setup_optimized_driver():
                     version_main=None
                 )
             elif WORKING_DRIVER_CONFIG['type'] == 'auto_detect':
-                driver = uc.Chrome(version_main=None, options=options)
+                driver = uc.Chrome(
+                    driver_executable_path=WORKING_DRIVER_CONFIG.get('driver_path'),
+                    version_main=None,
+                    options=options
+                )
             else:  # version_specific
-                driver = uc.Chrome(version_main=WORKING_DRIVER_CONFIG['version'], options=options)
+                driver = uc.Chrome(
+                    driver_executable_path=WORKING_DRIVER_CONFIG.get('driver_path'),
+                    version_main=WORKING_DRIVER_CONFIG['version'],
+                    options=options
+                )
             
             driver.delete_all_cookies()
             return driver
         except Exception:
             # Reset if previously working config fails
             WORKING_DRIVER_CONFIG = None
+            chrome_cache.clear_driver_config('uc')
     
-    # Original driver setup logic if no working config
-    cleanup_chromedriver_files()
+    # Original driver setup logic if no working config. The cleanup kills every
+    # Chrome process, so skip it while other pooled browsers are still running
+    if DRIVER_POOL.live_count == 0:
+        cleanup_chromedriver_files()
     
     is_github = detect_environment()
     chrome_version = get_chrome_version()
     
-    def create_fresh_options():
-        options = uc.ChromeOptions()
-        
-        # Common options
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--disable-gpu")
-        options.add_argument("--disable-blink-features=AutomationControlled")
-        options.add_argument("--disable-extensions")
-        options.add_argument("--disable-web-security")
-        options.add_argument("--allow-running-insecure-content")
-        options.add_argument("--disable-features=VizDisplayCompositor")
-        
-        # Disable images and media for faster loading
-        prefs = {
-            "profile.managed_default_content_settings.images": 2,
-            "profile.managed_default_content_settings.media_stream": 2,
-            "profile.default_content_setting_values.notifications": 2,
-            "profile.managed_default_content_settings.geolocation": 2,
-        }
-        options.add_experimental_option("prefs", prefs)
-        
-        # Additional performance options
-        options.add_argument("--disable-plugins")
-        options.add_argument("--disable-background-networking")
-        options.add_argument("--disable-sync")
-        options.add_argument("--disable-translate")
-        options.add_argument("--disable-features=TranslateUI")
-        options.add_argument("--aggressive-cache-discard")
-        options.add_argument("--disable-background-timer-throttling")
-        
-        if is_github:
-            options.add_argument("--headless")
-            options.add_argument("--disable-renderer-backgrounding")
-            options.add_argument("--disable-backgrounding-occluded-windows")
-            options.add_argument("--window-size=1920,1080")
-        else:
-            options.add_argument("--start-maximized")
-        
-        options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/140.0.0.0 Safari/537.36")
-        return options
-
     try:
         # Strategy 1: Try with explicit ChromeDriver path (GitHub Actions)
         if is_github:
@@ -366,7 +387,7 @@ def setup_optimized_driver():
                     version_main=None
                 )
                 driver.delete_all_cookies()
-                WORKING_DRIVER_CONFIG = {'type': 'explicit_path'}
+                remember_working_config(driver, {'type': 'explicit_path'})
                 return driver
             except Exception:
                 pass
@@ -376,19 +397,22 @@ def setup_optimized_driver():
             options = create_fresh_options()
             driver = uc.Chrome(version_main=None, options=options)
             driver.delete_all_cookies()
-            WORKING_DRIVER_CONFIG = {'type': 'auto_detect'}
+            remember_working_config(driver, {'type': 'auto_detect'})
             return driver
         except Exception:
             pass
         
         # Strategy 3: Try with compatible versions
         compatible_versions = [140, 139, 129, 130, 131]
+        if chrome_version:
+            # Try the installed version before guessing
+            compatible_versions = [chrome_version] + [v for v in compatible_versions if v != chrome_version]
         for version in compatible_versions:
             try:
                 options = create_fresh_options()
                 driver = uc.Chrome(version_main=version, options=options)
                 driver.delete_all_cookies()
-                WORKING_DRIVER_CONFIG = {'type': 'version_specific', 'version': version}
+                remember_working_config(driver, {'type': 'version_specific', 'version': version})
                 return driver
             except Exception:
                 continue
@@ -398,6 +422,13 @@ def setup_optimized_driver():
     except Exception:
         return None
 
+def remember_working_config(driver, config):
+    """Keep the strategy that just worked, in memory and on disk for the next run"""
+    global WORKING_DRIVER_CONFIG
+    config['driver_path'] = chrome_cache.driver_executable_path(driver)
+    WORKING_DRIVER_CONFIG = config
+    chrome_cache.save_driver_config('uc', config)
+
 def create_fresh_options():
     """Create fresh Chrome options - standalone function for reuse"""
     is_github = detect_environment()
@@ -440,32 +471,35 @@ def create_fresh_options():
         options.add_argument("--start-maximized")
     
     options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/140.0.0.0 Safari/537.36")
-    return options
+    return RESOURCE_BLOCKER.configure_options(options)
+
+COOKIE_SELECTORS = [
+    '//button[contains(text(), "Accept") and contains(text(), "Cookies")]',
+    '//button[contains(text(), "Accept") and contains(text(), "cookies")]',
+    '//button[contains(text(), "Accept All")]',
+    '//button[@id="onetrust-accept-btn-handler"]',
+    '//button[contains(@class, "cookie") and contains(text(), "Accept")]'
+]
+
+# Remembers which cookie button and product tile selectors worked, so they are tried first next run
+SELECTOR_CACHE = SelectorCache('sainsburys')
+
+# The cookie banner wait is sized from how long the banner has taken to appear
+TIMEOUTS = TimeoutPolicy('sainsburys')
 
 def handle_cookies_once(driver):
     """Handle cookies banner if present"""
     try:
-        # Wait for and click cookie accept button
-        cookie_selectors = [
-            '//button[contains(text(), "Accept") and contains(text(), "Cookies")]',
-            '//button[contains(text(), "Accept") and contains(text(), "cookies")]',
-            '//button[contains(text(), "Accept All")]',
-            '//button[@id="onetrust-accept-btn-handler"]',
-            '//button[contains(@class, "cookie") and contains(text(), "Accept")]'
-        ]
-        
-        for selector in cookie_selectors:
-            try:
-                cookie_button = WebDriverWait(driver, 3).until(
-                    EC.element_to_be_clickable((By.XPATH, selector))
-                )
-                cookie_button.click()
-                time.sleep(1)
-                return True
-            except:
-                continue
-        
-        return False
+        # Wait for and click cookie accept button - one wait covers every candidate
+        selectors = SELECTOR_CACHE.order('cookies', COOKIE_SELECTORS)
+        match = TIMEOUTS.measure('cookies', 3, lambda timeout: wait_for_any_selector(
+            driver, selectors, timeout, kind='xpath', visible=True))
+        SELECTOR_CACHE.record('cookies', match['selector'] if match else None)
+        if not match:
+            return False
+        match['element'].click()
+        time.sleep(1)
+        return True
         
     except Exception:
         return False
@@ -485,13 +519,9 @@ def scroll_to_load_all_products(driver, max_scrolls=3):
         
         while scrolls < max_scrolls:
             try:
-                # Scroll down more gradually
-                driver.execute_script("window.scrollTo(0, document.body.scrollHeight/2);")
-                time.sleep(1)
-                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                
-                # Wait for new content to load
-                time.sleep(2)
+                # Scroll to the bottom and wait only while new tiles are still rendering -
+                # paginated pages that are already complete settle straight away
+                wait_for_content_settled(driver, PRODUCT_TILE_SELECTOR, quiet_ms=500, timeout=3, scroll='bottom')
                 
                 # Calculate new scroll height and compare to last height
                 new_height = driver.execute_script("return document.body.scrollHeight")
@@ -509,7 +539,6 @@ def scroll_to_load_all_products(driver, max_scrolls=3):
         # Scroll back to top for consistent scraping start point
         try:
             driver.execute_script("window.scrollTo(0, 0);")
-            time.sleep(1)
         except:
             pass
         
@@ -518,302 +547,458 @@ def scroll_to_load_all_products(driver, max_scrolls=3):
     except Exception:
         return False
 
-def scrape_category(driver, url):
-    """Scrape all pages from a category until next button is disabled"""
-    products = []
-    page = 1
-    max_pages = 50
-
-    # Extract parent category name from URL
-    category_name = extract_parent_category_from_url(url)
-    print_progress(f"🛒 Starting category: {category_name}")
+# ========== PAGE SNAPSHOT PARSING ==========
+# Selector chains are compiled to XPath once and run over a single
+# page_source snapshot, instead of one WebDriver round trip per try.
+
+PRODUCT_SELECTORS = [CSSSelector(sel) for sel in [
+    ".pt__content",
+    ".pt-grid-item", 
+    "article.pt",
+    ".ln-c-card.pt",
+    "*[class*='pt__content']",
+    ".pt__content--with-header",
+    ".ln-o-grid__column .pt",
+    "[data-testid*='product']"
+]]
+
+NAME_SELECTORS = [CSSSelector(sel) for sel in [
+    '.pt__info__description .pt__link',
+    '.pt__link',
+    'a.pt__link', 
+    '.pt__info .pt__link',
+    '.pt__content .pt__link',
+    'h2.pt__info__description a',
+    'h2 a',
+    "a[href*='/gol-ui/product/']",
+    "a[title]"
+]]
+
+# Retail price only - Nectar prices are ignored completely
+RETAIL_PRICE_SELECTORS = [CSSSelector(sel) for sel in [
+    '[data-testid="pt-retail-price"]',
+    '.pt__cost__retail-price',
+    '.pt__cost__retail-price--with-nectar-not-associated',
+    '.pt__cost span[data-testid="pt-retail-price"]'
+]]
+
+# Broader fallback that avoids contextual (per-kg, Nectar) price containers
+FALLBACK_PRICE_SELECTOR = CSSSelector('*[class*="price"]:not([data-testid="contextual-price-text"])')
+
+PRICE_PATTERN = re.compile(r'£[\d.,]+|\d+p')
+
+# Parsing runs off the browser thread so it overlaps the pagination round trips
+PARSE_POOL = ThreadPoolExecutor(max_workers=2)
+
+def element_text(element):
+    """Whitespace-normalised text of an lxml element, like Selenium's element.text"""
+    return " ".join(element.text_content().split())
+
+def parse_product_tile(product, category_name):
+    """Extract one product from a parsed tile, or None if it has no name or price"""
+    name = ""
+    for selector in NAME_SELECTORS:
+        matches = selector(product)
+        if not matches:
+            continue
+        name_elem = matches[0]
+        name = element_text(name_elem)
+        
+        # Handle truncated names with full title
+        if not name:
+            name = name_elem.get('title') or ""
+        elif name.endswith('...'):
+            full_title = name_elem.get('title') or ""
+            if len(full_title) > len(name):
+                name = full_title
+        
+        if name and len(name) > 3:
+            break
+    
+    if not name:
+        return None
+    
+    price = "N/A"
+    for selector in RETAIL_PRICE_SELECTORS:
+        matches = selector(product)
+        if not matches:
+            continue
+        price_match = PRICE_PATTERN.search(element_text(matches[0]))
+        if price_match:
+            price = price_match.group()
+            break
+    
+    if price == "N/A":
+        for elem in FALLBACK_PRICE_SELECTOR(product):
+            price_match = PRICE_PATTERN.search(element_text(elem))
+            if price_match:
+                price = price_match.group()
+                break
+    
+    if price == "N/A":
+        return None
+    
+    return {
+        "Category": category_name,
+        "Product Name": name,
+        "Price": price
+    }
 
-    while page <= max_pages:
+def parse_products_html(html, category_name):
+    """
+    Parse every product tile out of a page_source snapshot.
+
+    Returns:
+        tuple: (product tile elements found, list of product dicts with a name and price)
+    """
+    return parse_products_document(lxml.html.fromstring(html), category_name)
+
+def parse_products_document(document, category_name):
+    """Parse every product tile out of an already parsed lxml document"""
+    product_elements = []
+    matched = None
+    for selector in SELECTOR_CACHE.order(category_name, PRODUCT_SELECTORS, key=lambda selector: selector.css):
+        product_elements = selector(document)
+        if product_elements:
+            matched = selector.css
+            print_progress(f"   ✅ Found {len(product_elements)} product elements using selector: {selector.css}")
+            break
+    SELECTOR_CACHE.record(category_name, matched)
+    
+    page_products = []
+    for product in product_elements:
         try:
-            if page == 1:
-                paged_url = url
-            else:
-                paged_url = f"{url}/opt/page:{page}"
-            
-            print_progress(f"   📄 Scraping page {page}...")
-            driver.get(paged_url)
-            print_progress(f"   🔍 Page title: {driver.title}")
-            print_progress(f"   🔍 Current URL: {driver.current_url}")
+            product_data = parse_product_tile(product, category_name)
+        except Exception:
+            continue
+        if product_data:
+            page_products.append(product_data)
+    
+    return product_elements, page_products
+
+PAGE_LINK_SELECTOR = CSSSelector('a[href*="/opt/page:"], .ln-c-pagination__link')
+PAGE_NUMBER_PATTERN = re.compile(r'/opt/page:(\d+)')
+
+def find_page_count(document):
+    """Highest page number in the pagination links, or None if there are none"""
+    page_numbers = []
+    for link in PAGE_LINK_SELECTOR(document):
+        match = PAGE_NUMBER_PATTERN.search(link.get('href') or '')
+        if match:
+            page_numbers.append(int(match.group(1)))
+        text = element_text(link)
+        if text.isdigit():
+            page_numbers.append(int(text))
+    return max(page_numbers) if page_numbers else None
+
+def parse_listing_page(html, category_name):
+    """
+    Parse a listing page snapshot: its product tiles plus the page count.
+
+    Returns:
+        tuple: (product tile elements, product dicts, page count or None)
+    """
+    document = lxml.html.fromstring(html)
+    product_elements, page_products = parse_products_document(document, category_name)
+    return product_elements, page_products, find_page_count(document)
+
+def scrape_page(driver, paged_url, category_name, page):
+    """
+    Load one listing page and parse it.
+
+    Returns:
+        dict: ``products``, ``elements`` (tile count), ``next_enabled`` and the
+        ``page_count`` read from the pagination links, or None if the page is
+        blocked or has no product tiles.
+    """
+    print_progress(f"   📄 Scraping page {page}...")
+    open_page(driver, paged_url)
+    print_progress(f"   🔍 Page title: {driver.title}")
+    print_progress(f"   🔍 Current URL: {driver.current_url}")
+
+    # Pooled browsers keep their cookies, so the banner is only handled once per browser
+    if not getattr(driver, 'cookies_accepted', False):
+        cookies_handled = handle_cookies_once(driver)
+        if cookies_handled:
+            print_progress(f"   🍪 Accepted cookies")
+        driver.cookies_accepted = True
+
+    RESOURCE_BLOCKER.report_page(driver, paged_url)
+
+    # Check for any content at all
+    try:
+        body_text = driver.find_element(By.TAG_NAME, "body").text
+        if "blocked" in body_text.lower() or "captcha" in body_text.lower():
+            print_progress(f"   🚫 Page appears to be blocked or showing CAPTCHA")
+            return None
+    except:
+        pass
 
-            if page == 1:
-                cookies_handled = handle_cookies_once(driver)
-                if cookies_handled:
-                    print_progress(f"   🍪 Accepted cookies")
+    # Scroll to load all products before scraping
+    scroll_success = scroll_to_load_all_products(driver)
+    if scroll_success:
+        print_progress(f"   📜 Scrolled to load all products")
+    else:
+        print_progress(f"   ⚠️ Error during scrolling")
 
-            time.sleep(random.uniform(0.5, 1.0))
+    # Take one snapshot of the rendered page and parse it with lxml on a worker
+    # thread while the browser answers the pagination checks below
+    html = driver.page_source
+    record_page(driver, html)
+    parse_job = PARSE_POOL.submit(parse_listing_page, html, category_name)
 
-            # Check for any content at all
+    # Check if next button is disabled (ONLY way to stop)
+    next_button_disabled = True
+    try:
+        # Look for enabled next buttons
+        enabled_next_selectors = [
+            'button[rel="next"]:not(.is-disabled):not([disabled]):not([aria-disabled="true"])',
+            '.ln-c-pagination__link[rel="next"]:not(.is-disabled):not([disabled]):not([aria-disabled="true"])',
+            'a[rel="next"]:not(.is-disabled)',
+            '.pagination-next:not(.disabled)'
+        ]
+        
+        for selector in enabled_next_selectors:
             try:
-                body_text = driver.find_element(By.TAG_NAME, "body").text
-                if "blocked" in body_text.lower() or "captcha" in body_text.lower():
-                    print_progress(f"   🚫 Page appears to be blocked or showing CAPTCHA")
+                next_button = driver.find_element(By.CSS_SELECTOR, selector)
+                if next_button and next_button.is_enabled() and next_button.is_displayed():
+                    next_button_disabled = False
+                    print_progress(f"   ▶️ Next button found and enabled")
                     break
             except:
-                pass
+                continue
+        
+    except Exception:
+        print_progress(f"   ⚠️ Error checking pagination - assuming end reached")
+        next_button_disabled = True
 
-            # Scroll to load all products before scraping
-            scroll_success = scroll_to_load_all_products(driver)
-            if scroll_success:
-                print_progress(f"   📜 Scrolled to load all products")
-            else:
-                print_progress(f"   ⚠️ Error during scrolling")
+    product_elements, page_products, page_count = parse_job.result()
 
-            # Find product elements
-            product_elements = []
-            
-            try:
-                elements = driver.find_elements(By.CSS_SELECTOR, ".pt__content")
-                if elements:
-                    product_elements = elements
-                    print_progress(f"   ✅ Found {len(elements)} product elements using selector: .pt__content")
-            except:
-                pass
-            
-            # If main selector fails, try alternatives
-            if not product_elements:
-                alternative_selectors = [
-                    ".pt-grid-item", 
-                    "article.pt",
-                    ".ln-c-card.pt",
-                    "*[class*='pt__content']",
-                    ".pt__content--with-header",
-                    ".ln-o-grid__column .pt",
-                    "[data-testid*='product']"
-                ]
-                
-                for selector in alternative_selectors:
-                    try:
-                        elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                        if elements:
-                            product_elements = elements
-                            print_progress(f"   ✅ Found {len(elements)} product elements using selector: {selector}")
-                            break
-                    except:
-                        continue
-
-            if not product_elements:
-                print_progress(f"   ⚠️ No product elements found on page {page}")
-                break
+    if not product_elements:
+        print_progress(f"   ⚠️ No product elements found on page {page}")
+        return None
 
-            # Extract products from this page
-            page_products = []
-            
-            for i, product in enumerate(product_elements):
-                try:
-                    # Extract product name using the exact selector from your HTML
-                    name = ""
-                    name_selectors = [
-                        '.pt__info__description .pt__link',  # From your HTML structure
-                        '.pt__link',
-                        'a.pt__link', 
-                        '.pt__info .pt__link',
-                        '.pt__content .pt__link',
-                        'h2.pt__info__description a',
-                        'h2 a',
-                        "a[href*='/gol-ui/product/']",
-                        "a[title]"
-                    ]
-                    
-                    for name_selector in name_selectors:
-                        try:
-                            name_elem = product.find_element(By.CSS_SELECTOR, name_selector)
-                            name = name_elem.text.strip()
-                            
-                            # Handle truncated names with full title
-                            if not name:
-                                name = name_elem.get_attribute('title') or ""
-                            elif name.endswith('...'):
-                                full_title = name_elem.get_attribute('title') or ""
-                                if len(full_title) > len(name):
-                                    name = full_title
-                            
-                            if name and len(name) > 3:
-                                break
-                        except:
-                            continue
-                    
-                    if not name:
-                        continue
-                    
-                    # Extract ONLY retail price (ignore Nectar prices completely)
-                    price = "N/A"
-                    retail_price_selectors = [
-                        '[data-testid="pt-retail-price"]',  # From your HTML - this is the £5.10
-                        '.pt__cost__retail-price',
-                        '.pt__cost__retail-price--with-nectar-not-associated',
-                        '.pt__cost span[data-testid="pt-retail-price"]'
-                    ]
-                    
-                    for price_selector in retail_price_selectors:
-                        try:
-                            price_elem = product.find_element(By.CSS_SELECTOR, price_selector)
-                            price_text = price_elem.text.strip()
-                            
-                            # Extract price using regex
-                            price_match = re.search(r'£[\d.,]+|\d+p', price_text)
-                            if price_match:
-                                price = price_match.group()
-                                break
-                        except:
-                            continue
-                    
-                    # If no retail price found, try broader search but avoid contextual prices
-                    if price == "N/A":
-                        try:
-                            # Look for any price that's NOT in contextual price containers
-                            all_price_elements = product.find_elements(By.CSS_SELECTOR, '*[class*="price"]:not([data-testid="contextual-price-text"])')
-                            for elem in all_price_elements:
-                                price_text = elem.text.strip()
-                                price_match = re.search(r'£[\d.,]+|\d+p', price_text)
-                                if price_match:
-                                    price = price_match.group()
-                                    break
-                        except:
-                            pass
-
-                    # Add product if we have both name and price
-                    if name and price != "N/A":
-                        product_data = {
-                            "Category": category_name,
-                            "Product Name": name,
-                            "Price": price
-                        }
-                        page_products.append(product_data)
-                        
-                except Exception as e:
-                    continue
-
-            print_progress(f"   ✅ Extracted {len(page_products)} valid products from {len(product_elements)} elements")
+    print_progress(f"   ✅ Extracted {len(page_products)} valid products from {len(product_elements)} elements")
 
-            # Add ALL products from this page (no duplicate checking)
-            products.extend(page_products)
-            print_progress(f"   ➕ Added {len(page_products)} products to total")
-            print_progress(f"   📊 Running total: {len(products)} products")
+    # Debug for categories with 0 products when elements exist
+    if len(page_products) == 0 and len(product_elements) > 0:
+        print_progress(f"   🔍 DEBUG: Found {len(product_elements)} elements but 0 valid products")
+        debug_product_structure(product_elements, category_name)
 
-            # Debug for categories with 0 products when elements exist
-            if len(page_products) == 0 and len(product_elements) > 0:
-                print_progress(f"   🔍 DEBUG: Found {len(product_elements)} elements but 0 valid products")
-                debug_product_structure(product_elements, category_name)
+    return {
+        'products': page_products,
+        'elements': len(product_elements),
+        'next_enabled': not next_button_disabled,
+        'page_count': page_count,
+    }
 
-            # Check if next button is disabled (ONLY way to stop)
-            next_button_disabled = True
-            try:
-                # Look for enabled next buttons
-                enabled_next_selectors = [
-                    'button[rel="next"]:not(.is-disabled):not([disabled]):not([aria-disabled="true"])',
-                    '.ln-c-pagination__link[rel="next"]:not(.is-disabled):not([disabled]):not([aria-disabled="true"])',
-                    'a[rel="next"]:not(.is-disabled)',
-                    '.pagination-next:not(.disabled)'
-                ]
-                
-                for selector in enabled_next_selectors:
-                    try:
-                        next_button = driver.find_element(By.CSS_SELECTOR, selector)
-                        if next_button and next_button.is_enabled() and next_button.is_displayed():
-                            next_button_disabled = False
-                            print_progress(f"   ▶️ Next button found and enabled")
-                            break
-                    except:
-                        continue
-                
-                if next_button_disabled:
-                    print_progress(f"   🔚 Next button is disabled - reached end of category")
-                    break
-                        
-            except Exception:
-                print_progress(f"   ⚠️ Error checking pagination - assuming end reached")
+def category_page_url(url, page):
+    """URL of one page of a category listing"""
+    return url if page == 1 else f"{url}/opt/page:{page}"
+
+def scrape_category(driver, url, start_page=1, checkpoint=None):
+    """
+    Scrape pages one after another until next button is disabled.
+
+    Returns:
+        tuple: ({page number: products}, True if the last page was reached)
+    """
+    pages = {}
+    page = start_page
+
+    # Extract parent category name from URL
+    category_name = extract_parent_category_from_url(url)
+    unit = category_unit(url)
+
+    while page <= MAX_PAGES:
+        try:
+            result = scrape_page(driver, category_page_url(url, page), category_name, page)
+            if result is None:
                 break
 
+            # Add ALL products from this page (no duplicate checking)
+            pages[page] = result['products']
+            if checkpoint:
+                checkpoint.save(Checkpoint.page_key(unit, page), result['products'])
+            print_progress(f"   ➕ Added {len(result['products'])} products to total")
+
+            if not result['next_enabled']:
+                print_progress(f"   🔚 Next button is disabled - reached end of category")
+                return pages, True
+
             page += 1
-            time.sleep(random.uniform(0.3, 0.7))
 
         except Exception as e:
             print_progress(f"   ❌ Error on page {page}: {e}")
             break
 
-    print_progress(f"✅ Category {category_name} completed: {len(products)} total products")
-    return products
-
-def scrape_single_category(url):
-    """Run one category scrape with driver reuse"""
-    driver = setup_optimized_driver()
-    if not driver:
-        return []
+    return pages, page > MAX_PAGES
 
+def scrape_page_job(url, category_name, page, checkpoint=None):
+    """Scrape one page of a category in a pooled browser (parallel page mode)"""
     try:
-        products = scrape_category(driver, url)
+        with DRIVER_POOL.lease() as driver:
+            result = scrape_page(driver, category_page_url(url, page), category_name, page)
+    except Exception as e:
+        print_progress(f"   ❌ Error on page {page}: {e}")
+        return None
+    if result is None:
+        return None
+    if checkpoint:
+        checkpoint.save(Checkpoint.page_key(category_unit(url), page), result['products'])
+    return result['products']
+
+def scrape_pages_in_parallel(url, category_name, pages, checkpoint=None):
+    """
+    Fetch several pages of one category on up to PAGE_WORKERS browsers.
+
+    Returns:
+        dict: page number -> products from that page (None if the page failed)
+    """
+    results = {}
+    with ThreadPoolExecutor(max_workers=PAGE_WORKERS) as executor:
+        future_to_page = {
+            executor.submit(scrape_page_job, url, category_name, page, checkpoint): page
+            for page in pages
+        }
+        for future in as_completed(future_to_page):
+            page = future_to_page[future]
+            results[page] = future.result()
+            print_progress(f"   📦 Page {page}: {len(results[page] or [])} products")
+    return results
+
+def create_pooled_driver():
+    """Pool factory - uc patches chromedriver on disk, so browsers start one at a time"""
+    with DRIVER_CREATION_LOCK:
+        return setup_optimized_driver()
+
+# Browsers are kept warm between categories instead of relaunching Chrome each time
+DRIVER_POOL = DriverPool(create_pooled_driver, size=max(MAX_THREADS, PAGE_WORKERS), name="Sainsbury's",
+                         on_create=RESOURCE_BLOCKER.install)
+
+def merge_pages(pages):
+    """Concatenate page results in page order so the output matches a serial walk"""
+    return [product for page in sorted(pages) for product in (pages[page] or [])]
+
+def scrape_single_category(url, checkpoint=None, delta=None):
+    """
+    Scrape one category, page 1 first.
+
+    Page 1 tells us how many pages there are; with PAGE_WORKERS > 1 the rest are
+    fetched concurrently and merged back in page order. Without a page count
+    (or with one worker) the pages are walked serially as before. Pages saved
+    by an interrupted run are reused when resuming, and in delta mode an
+    unchanged page 1 reuses the whole category from the last run.
+    """
+    category_name = extract_parent_category_from_url(url)
+    unit = category_unit(url)
+    print_progress(f"🛒 Starting category: {category_name} ({unit})")
+
+    pages = checkpoint.pages(unit) if checkpoint else {}
+    if checkpoint and checkpoint.done(f"{unit}/done"):
+        products = merge_pages(pages)
+        print_progress(f"♻️ Category {category_name} restored from checkpoint: {len(products)} products")
+        if delta:
+            delta.record(unit, pages.get(1, []), products)
         return products
-    finally:
+
+    first_page_key = f"{unit}/first_page"
+    first_page = checkpoint.get(first_page_key) if checkpoint else None
+    if 1 not in pages or first_page is None:
         try:
-            driver.quit()
-        except:
-            pass
-        # Don't cleanup ChromeDriver files between categories if using working config
-        if not WORKING_DRIVER_CONFIG:
-            time.sleep(0.5)
+            with DRIVER_POOL.lease() as driver:
+                first = scrape_page(driver, url, category_name, 1)
+        except Exception as e:
+            print_progress(f"❌ Could not scrape page 1: {e}")
+            return merge_pages(pages)
+        if first is None:
+            return merge_pages(pages)
+        pages[1] = first['products']
+        first_page = {'page_count': first['page_count'], 'next_enabled': first['next_enabled']}
+        if checkpoint:
+            checkpoint.save(Checkpoint.page_key(unit, 1), pages[1])
+            checkpoint.save(first_page_key, first_page)
+
+    previous = delta.unchanged(unit, pages[1]) if delta else None
+    if previous is not None:
+        return previous
+
+    page_count = min(first_page['page_count'] or 0, MAX_PAGES)
+    finished = True
+    if not first_page['next_enabled']:
+        print_progress(f"   🔚 Next button is disabled - reached end of category")
+    elif PAGE_WORKERS > 1 and page_count > 1:
+        remaining_pages = [page for page in range(2, page_count + 1) if page not in pages]
+        if remaining_pages:
+            print_progress(f"   ⚡ {page_count} pages - fetching {len(remaining_pages)} on {PAGE_WORKERS} browsers")
+            results = scrape_pages_in_parallel(url, category_name, remaining_pages, checkpoint)
+            finished = all(products is not None for products in results.values())
+            pages.update(results)
+    else:
+        # Serial walk, continuing after the last page a resumed run already has
+        start_page = max(pages) + 1
+        try:
+            with DRIVER_POOL.lease() as driver:
+                serial_pages, finished = scrape_category(driver, url, start_page=start_page, checkpoint=checkpoint)
+            pages.update(serial_pages)
+        except Exception as e:
+            print_progress(f"❌ Could not start a browser: {e}")
+            finished = False
+
+    if checkpoint and finished:
+        checkpoint.save(f"{unit}/done", page_count or len(pages))
 
-def scrape_all_categories():
-    """Scrape all categories sequentially"""
-    all_products = []
+    products = merge_pages(pages)
+    if delta and finished and products:
+        delta.record(unit, pages.get(1, []), products)
+    print_progress(f"✅ Category {category_name} completed: {len(products)} total products")
+    return products
+
+def scrape_all_categories(sink, checkpoint=None, delta=None):
+    """Scrape all categories sequentially, writing each one to ``sink`` as it finishes"""
     total_categories = len(CATEGORY_URLS)
     
     for i, url in enumerate(CATEGORY_URLS, 1):
         try:
             print_progress(f"📊 Progress: Starting {i}/{total_categories} categories")
-            products = scrape_single_category(url)
-            all_products.extend(products)
+            products = scrape_single_category(url, checkpoint, delta)
+            sink.add(products, unit=category_unit(url))
             print_progress(f"📊 Progress: {i}/{total_categories} categories completed")
         except Exception as e:
             print_progress(f"❌ Error scraping category {url}: {e}")
-        
-        # Shorter delays for GitHub Actions
-        if i < len(CATEGORY_URLS):
-            time.sleep(0.3)
 
-    return all_products
+    DRIVER_POOL.close()
 
-def save_products(products):
-    """Save scraped data to CSV files"""
-    if not products:
-        return
-
-    fieldnames = ["Category", "Product Name", "Price"]  # Removed "Price with Nectar"
-
-    # Save locally
-    with open(OUTPUT_FILE, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(products)
-
-    # Save to app folder if possible
-    try:
-        os.makedirs(os.path.dirname(APP_OUTPUT_FILE), exist_ok=True)
-        with open(APP_OUTPUT_FILE, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(products)
-    except:
-        pass
-
-def main():
+def main(resume=False, delta=False):
     env = "GitHub Actions" if detect_environment() else "Local"
     print_progress(f"🛒 Starting Sainsbury's scraper ({env})")
-    print_progress(f"📋 Categories: {len(CATEGORY_URLS)} | Processing: Sequential")
+    print_progress(f"📋 Categories: {len(CATEGORY_URLS)} | Processing: Sequential categories, {PAGE_WORKERS} page workers")
+
+    # Each finished page is saved so an interrupted run can pick up with --resume
+    checkpoint = Checkpoint('sainsburys', resume=resume)
+    sink = ProductSink('sainsburys', OUTPUT_FIELDS, price_field='Price')
+    flush_on_sigterm(lambda: sink.save_partial(checkpoint))
+    delta_store = DeltaStore('sainsburys', enabled=delta)
 
     start_time = time.time()
-    products = scrape_all_categories()
+    scrape_all_categories(sink, checkpoint, delta_store)
     elapsed = time.time() - start_time
 
-    save_products(products)
+    SELECTOR_CACHE.save()
+    TIMEOUTS.save()
+    if sink.close():
+        checkpoint.clear()
+        delta_store.save()
 
     print_progress(f"\n🎉 COMPLETED!")
-    print_progress(f"📊 Total products: {len(products)}")
-    print_progress(f"⏱️ Time: {elapsed:.0f}s | Speed: {len(products)/elapsed:.1f} products/sec")
+    print_progress(f"📊 Total products: {sink.written}")
+    print_progress(f"⏱️ Time: {elapsed:.0f}s | Speed: {sink.written/elapsed:.1f} products/sec")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Scrape Sainsbury's product listings")
+    parser.add_argument('--resume', action='store_true',
+                        help="Skip categories and pages already saved by an interrupted run")
+    parser.add_argument('--delta', action='store_true',
+                        help="Reuse last run's products for categories whose first page hasn't changed")
+    args = parser.parse_args()
+    main(resume=args.resume, delta=args.delta)
\ No newline at end of file
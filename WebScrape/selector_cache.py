@@ -0,0 +1,99 @@
+"""
+Learned selector preferences, remembered between runs.
+
+Scrapers carry fallback chains of selectors because retailers change their
+markup. Trying the chain in its written order every time wastes a wait on
+each stale selector. Instead, the selector that matched last time for a
+retailer and scope (usually a category) is tried first. It is only demoted
+after DEMOTE_AFTER consecutive pages where another selector matched or
+nothing did; the selector that matched then takes its place.
+
+State lives in WebScrape/.selector_cache/<retailer>.json unless
+SCRAPER_SELECTOR_CACHE_DIR points elsewhere.
+"""
+
+import json
+import os
+import threading
+
+STATE_DIR = os.environ.get(
+    'SCRAPER_SELECTOR_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".selector_cache")
+)
+DEMOTE_AFTER = 3
+
+class SelectorCache:
+    """
+    The last selector that worked, per scope, for one retailer.
+
+    Args:
+        retailer (str): Scraper name; one state file per retailer.
+    """
+
+    def __init__(self, retailer, directory=None):
+        self.retailer = retailer
+        self.path = os.path.join(directory or STATE_DIR, f"{retailer}.json")
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def learned(self, scope):
+        """The selector to try first for ``scope``, or None"""
+        with self._lock:
+            entry = self._entries.get(scope)
+            return entry['selector'] if entry else None
+
+    def order(self, scope, candidates, key=str):
+        """
+        ``candidates`` with the learned selector moved to the front.
+
+        Args:
+            scope (str): Category (or other context) the selectors are used in.
+            candidates (list): Selectors in their written fallback order.
+            key: Maps a candidate to the string it is remembered by, e.g.
+                ``lambda selector: selector.css`` for compiled selectors.
+        """
+        learned = self.learned(scope)
+        preferred = [candidate for candidate in candidates if key(candidate) == learned]
+        return preferred + [candidate for candidate in candidates if key(candidate) != learned]
+
+    def record(self, scope, matched):
+        """
+        Note which selector matched in ``scope`` (None if none did).
+
+        A selector that matches becomes the learned one unless another is
+        already learned, in which case the learned one takes a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(scope)
+            if entry and entry['selector'] == matched:
+                entry['misses'] = 0
+                entry['hits'] = entry.get('hits', 0) + 1
+            elif entry and entry['misses'] + 1 < DEMOTE_AFTER:
+                entry['misses'] += 1
+            elif matched is not None:
+                if entry:
+                    print(f"🔀 {self.retailer} {scope}: demoting selector {entry['selector']!r} for {matched!r}")
+                self._entries[scope] = {'selector': matched, 'hits': 1, 'misses': 0}
+            elif entry:
+                print(f"🔀 {self.retailer} {scope}: demoting selector {entry['selector']!r}")
+                del self._entries[scope]
+
+    def save(self):
+        """Write the learned selectors to disk"""
+        with self._lock:
+            data = dict(self._entries)
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️ Could not write selector cache {self.path}: {e}")
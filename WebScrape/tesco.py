@@ -1,25 +1,90 @@
 import undetected_chromedriver as uc
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from concurrent.futures import ThreadPoolExecutor, as_completed
-import pandas as pd
 import time
 import threading
 import os
 import re
 import subprocess
+import argparse
+from driver_pool import DriverPool
+import chrome_cache
+from resource_blocking import ResourceBlocker
+from dom_extract import bulk_extract, field
+from page_cache import open_page, record_page
+from checkpoint import Checkpoint, flush_on_sigterm
+from product_sink import ProductSink
+from delta import DeltaStore
+from page_waits import wait_for_any_selector
+from selector_cache import SelectorCache
+from adaptive_timeouts import TimeoutPolicy
 
 # === Patch uc.Chrome destructor to prevent WinError 6 warnings ===
 uc.Chrome.__del__ = lambda self: None
 
-# Thread-safe list for collecting products
-products_lock = threading.Lock()
 driver_creation_lock = threading.Lock()
-all_products = []
+
+MAX_WORKERS = int(os.environ.get('TESCO_MAX_WORKERS', '1'))  # Single worker like Sainsburys for stability
+
+# Drops images, fonts and trackers at the network level
+RESOURCE_BLOCKER = ResourceBlocker('tesco')
+
+# Candidate product tile selectors, in fallback order
+PRODUCT_SELECTORS = [
+    "div[class*='verticalTile']",
+    "[data-testid*='product']", 
+    ".product-tile",
+    ".product",
+    "[class*='product']",
+    ".tile"
+]
+
+# Remembers which tile selector worked per category, so it is tried first next run
+SELECTOR_CACHE = SelectorCache('tesco')
+# Share of the listing wait during which only the first selector counts
+PREFERRED_SELECTOR_SHARE = 0.8
+
+# The tile wait is sized from observed load times (10 seconds until enough have been seen)
+TIMEOUTS = TimeoutPolicy('tesco')
+
+# Fields read from every tile by the single round-trip extractor. innerText
+# matches the rendered text Selenium's element.text used to return.
+PRODUCT_FIELDS = {
+    'name': field([
+        "a[class*='titleLink']",
+        "h3", "h2", "h4",
+        "[data-testid*='name']",
+        "[class*='name']",
+        "[class*='title']"
+    ], text='innerText', required=True),
+    'price': field([
+        "p[class*='priceText']",
+        "[data-testid*='price']",
+        "[class*='price']",
+        ".price",
+        "span[class*='price']"
+    ], text='innerText', required=True),
+    'url': field([
+        "a[class*='titleLink']",
+        "a[href*='/products/']"
+    ], attr='href'),
+    'unit_price': field([
+        "p[class*='subtext']",
+        "[class*='unitPrice']",
+        "[data-testid*='unit-price']"
+    ], text='innerText'),
+}
+
+def extracted_well(result):
+    """A selector is only worth learning if most of its tiles gave a name and price"""
+    return bool(result['products']) and result['missed'] * 2 <= result['total']
 
 def get_chrome_version():
-    """Get installed Chrome version - adapted from sainsburys.py"""
+    """Get installed Chrome version, probing only when the on-disk cache misses"""
+    return chrome_cache.cached_chrome_version(probe_chrome_version)
+
+def probe_chrome_version():
+    """Detect installed Chrome version - adapted from sainsburys.py"""
     try:
         # Try Linux/GitHub Actions method first
         try:
@@ -86,7 +151,6 @@ def setup_optimized_driver():
         # Create fresh options for each attempt
         def create_options():
             options = uc.ChromeOptions()
-            options.add_argument('--disable-images')
             options.add_argument('--disable-plugins')
             options.add_argument('--disable-extensions')
             options.add_argument('--disable-dev-shm-usage')
@@ -96,16 +160,36 @@ def setup_optimized_driver():
             options.add_argument('--disable-features=VizDisplayCompositor')
             options.add_argument('--headless')
             options.add_argument('--user-agent=Mozilla/5.0 (Linux; Android 10; K) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/139.0.0.0 Mobile Safari/537.36')
-            return options
+            return RESOURCE_BLOCKER.configure_options(options)
+
+        def remember(driver, config):
+            config['driver_path'] = chrome_cache.driver_executable_path(driver)
+            chrome_cache.save_driver_config('uc', config)
+            return driver
 
         try:
+            # Reuse the strategy and patched chromedriver that worked last run
+            cached_config = chrome_cache.get_driver_config('uc')
+            if cached_config:
+                try:
+                    driver = uc.Chrome(
+                        version_main=cached_config.get('version'),
+                        driver_executable_path=cached_config.get('driver_path'),
+                        options=create_options()
+                    )
+                    print(f"✅ Driver created successfully with cached config ({cached_config['type']})")
+                    return driver
+                except Exception as e:
+                    print(f"Cached driver config failed: {e}")
+                    chrome_cache.clear_driver_config('uc')
+
             # Try with detected Chrome version first
             if chrome_version:
                 print(f"Attempting to create driver with Chrome version {chrome_version}")
                 try:
                     driver = uc.Chrome(version_main=chrome_version, options=create_options())
                     print("✅ Driver created successfully with detected version")
-                    return driver
+                    return remember(driver, {'type': 'version_specific', 'version': chrome_version})
                 except Exception as e:
                     print(f"Failed with detected version {chrome_version}: {e}")
             
@@ -114,7 +198,7 @@ def setup_optimized_driver():
             try:
                 driver = uc.Chrome(version_main=139, options=create_options())
                 print("✅ Driver created successfully with version 139")
-                return driver
+                return remember(driver, {'type': 'version_specific', 'version': 139})
             except Exception as e:
                 print(f"Failed with version 139: {e}")
             
@@ -122,20 +206,42 @@ def setup_optimized_driver():
             print("Attempting auto-detection fallback...")
             driver = uc.Chrome(version_main=None, options=create_options())
             print("✅ Driver created successfully with auto-detection")
-            return driver
+            return remember(driver, {'type': 'auto_detect'})
             
         except Exception as e:
             print(f"Failed to create driver: {e}")
             return None
 
-def scrape_single_category(base_url, category_name):
+# Browsers are kept warm between categories instead of relaunching Chrome each time
+DRIVER_POOL = DriverPool(setup_optimized_driver, size=MAX_WORKERS, name="Tesco",
+                         on_create=RESOURCE_BLOCKER.install)
+
+def scrape_single_category(base_url, category_name, checkpoint=None, delta=None):
     """Scrape a single category with debugging"""
-    driver = setup_optimized_driver()
-    if driver is None:
-        print(f"Failed to create driver for {category_name}")
+    saved_pages = checkpoint.pages(category_name) if checkpoint else {}
+    if checkpoint and checkpoint.done(f"{category_name}/done"):
+        category_products = [row for page in sorted(saved_pages) for row in saved_pages[page]]
+        print(f"{category_name}: Restored {len(category_products)} products from checkpoint")
+        if delta:
+            delta.record(category_name, saved_pages.get(1, []), category_products)
+        return category_products
+    
+    # A category the interrupted run took from last run's delta state
+    reused = checkpoint.get(f"{category_name}/reused") if checkpoint else None
+    if reused is not None:
+        print(f"{category_name}: Restored {len(reused)} unchanged products from checkpoint")
+        if delta and delta.unchanged(category_name, saved_pages.get(1, [])) is None:
+            delta.record(category_name, saved_pages.get(1, []), reused)
+        return reused
+
+    try:
+        driver = DRIVER_POOL.acquire()
+    except Exception as e:
+        print(f"Failed to create driver for {category_name}: {e}")
         return []
         
     category_products = []
+    first_page = []
     
     try:
         category = base_url.split('/shop/')[1].split('/')[0]
@@ -144,46 +250,31 @@ def scrape_single_category(base_url, category_name):
         # Load first page
         url = f"{base_url}?page=1"
         print(f"Loading URL: {url}")
-        driver.get(url)
+        open_page(driver, url)
         
         # Wait longer and check page load
         time.sleep(3)
+        RESOURCE_BLOCKER.report_page(driver, url)
         
         # Debug: Check what actually loaded
         page_title = driver.title
         print(f"Page title: {page_title}")
         
-        # Try multiple selectors for products
-        product_selectors = [
-            "div[class*='verticalTile']",
-            "[data-testid*='product']", 
-            ".product-tile",
-            ".product",
-            "[class*='product']",
-            ".tile"
-        ]
+        # One wait covers every candidate selector, last run's winner first. The broad
+        # fallbacks also match half-rendered pages, so they only count once the
+        # preferred selector has had most of the wait to itself
+        selectors = SELECTOR_CACHE.order(category_name, PRODUCT_SELECTORS)
+        match = TIMEOUTS.measure('listing', 10, lambda timeout: wait_for_any_selector(
+            driver, selectors, timeout, prefer_for=timeout * PREFERRED_SELECTOR_SHARE))
+        if not match:
+            SELECTOR_CACHE.record(category_name, None)
         
-        products_found = False
         working_selector = None
+        if match:
+            working_selector = match['selector']
+            print(f"✅ Found {match['count']} products using selector: {working_selector}")
         
-        for selector in product_selectors:
-            try:
-                WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                )
-                product_tiles = driver.find_elements(By.CSS_SELECTOR, selector)
-                if product_tiles:
-                    print(f"✅ Found {len(product_tiles)} products using selector: {selector}")
-                    products_found = True
-                    working_selector = selector
-                    break
-                else:
-                    print(f"Selector {selector} found no products")
-            except Exception as e:
-                print(f"Selector {selector} failed: {e}")
-                continue
-        
-        if not products_found:
+        if not working_selector:
             print(f"❌ No products found with any selector in {category}")
             # Save page source for debugging
             try:
@@ -222,72 +313,58 @@ def scrape_single_category(base_url, category_name):
         
         # Scrape pages
         for page in range(1, max_pages + 1):
+            if page > 1 and page in saved_pages:
+                category_products.extend(saved_pages[page])
+                print(f"{category}: Page {page}/{max_pages} - restored from checkpoint")
+                continue
+            
             if page > 1:
                 url = f"{base_url}?page={page}"
-                driver.get(url)
+                open_page(driver, url)
                 time.sleep(2)
+                RESOURCE_BLOCKER.report_page(driver, url)
+            
+            record_page(driver)
+            
+            # Pull every tile's fields in a single execute_script round trip
+            result = bulk_extract(driver, working_selector, PRODUCT_FIELDS)
             
-            # Use the working selector
-            product_tiles = driver.find_elements(By.CSS_SELECTOR, working_selector)
+            if page == 1:
+                SELECTOR_CACHE.record(category_name, working_selector if extracted_well(result) else None)
             
-            if not product_tiles:
+            if not result['total']:
                 print(f"{category}: No products found on page {page}")
                 break
             
-            # Extract product data with multiple selector strategies
-            page_products = []
-            for product in product_tiles:
-                try:
-                    # Try multiple name selectors
-                    name = "N/A"
-                    name_selectors = [
-                        "a[class*='titleLink']",
-                        "h3", "h2", "h4",
-                        "[data-testid*='name']",
-                        "[class*='name']",
-                        "[class*='title']"
-                    ]
-                    
-                    for name_sel in name_selectors:
-                        try:
-                            name_elem = product.find_element(By.CSS_SELECTOR, name_sel)
-                            if name_elem and name_elem.text.strip():
-                                name = name_elem.text.strip()
-                                break
-                        except:
-                            continue
-                    
-                    # Try multiple price selectors
-                    price = "N/A"
-                    price_selectors = [
-                        "p[class*='priceText']",
-                        "[data-testid*='price']",
-                        "[class*='price']",
-                        ".price",
-                        "span[class*='price']"
-                    ]
-                    
-                    for price_sel in price_selectors:
-                        try:
-                            price_elem = product.find_element(By.CSS_SELECTOR, price_sel)
-                            if price_elem and price_elem.text.strip():
-                                price = price_elem.text.strip()
-                                break
-                        except:
-                            continue
-                    
-                    if name != "N/A" and price != "N/A":
-                        page_products.append({
-                            "Category": category,
-                            "Name": name,
-                            "Price": price
-                        })
-                except Exception as e:
-                    continue
+            page_products = [
+                {
+                    "Category": category,
+                    "Name": product["name"],
+                    "Price": product["price"],
+                    "URL": product["url"] or "",
+                    "Unit Price": product["unit_price"] or ""
+                }
+                for product in result['products']
+            ]
                 
             category_products.extend(page_products)
+            if checkpoint:
+                checkpoint.save(Checkpoint.page_key(category_name, page), page_products)
             print(f"{category}: Page {page}/{max_pages} - {len(page_products)} products")
+            
+            # An unchanged first page stands in for the whole category (see delta.py)
+            if page == 1:
+                first_page = page_products
+                previous = delta.unchanged(category_name, first_page) if delta else None
+                if previous is not None:
+                    if checkpoint:
+                        checkpoint.save(f"{category_name}/reused", previous)
+                    return previous
         
+        if checkpoint:
+            checkpoint.save(f"{category_name}/done", max_pages)
+        if delta and category_products:
+            delta.record(category_name, first_page, category_products)
         print(f"{category}: Completed - {len(category_products)} total products")
         return category_products
         
@@ -295,27 +372,9 @@ def scrape_single_category(base_url, category_name):
         print(f"Error in {category}: {e}")
         return []
     finally:
-        if driver:
-            try:
-                driver.quit()
-            except:
-                pass
+        DRIVER_POOL.release(driver)
 
-def save_csv_to_both_locations(df, filename):
-    """Save CSV to both local directory and app/public folder"""
-    local_path = f"{filename}.csv"
-    df.to_csv(local_path, index=False, encoding="utf-8")
-    print(f"✅ Saved to local: {local_path}")
-    
-    public_dir = "../app/public"
-    if not os.path.exists(public_dir):
-        os.makedirs(public_dir, exist_ok=True)
-    
-    public_path = os.path.join(public_dir, f"{filename}.csv")
-    df.to_csv(public_path, index=False, encoding="utf-8")
-    print(f"✅ Saved to public: {public_path}")
-
-def scrape_tesco_optimized():
+def scrape_tesco_optimized(resume=False, delta=False):
     """Main function with single worker like Sainsburys"""
     categories = [
         ("https://www.tesco.com/groceries/en-GB/shop/fresh-food/all", "fresh-food"),
@@ -330,45 +389,55 @@ def scrape_tesco_optimized():
     print("Starting optimized Tesco scraper with single worker (like Sainsburys)...")
     start_time = time.time()
     
+    # Each finished page is saved so an interrupted run can pick up with --resume
+    checkpoint = Checkpoint('tesco', resume=resume)
+    # Finished categories are cleaned, de-duplicated and written out as they arrive
+    sink = ProductSink('tesco', ['Category', 'Name', 'Price', 'URL', 'Unit Price'],
+                       dedup_key=['Name', 'Price'], required=['Name', 'Price'], price_field='Price')
+    flush_on_sigterm(lambda: sink.save_partial(checkpoint))
+    delta_store = DeltaStore('tesco', enabled=delta)
+    
     # Use single worker like Sainsburys for stability
-    with ThreadPoolExecutor(max_workers=1) as executor:
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
         future_to_category = {
-            executor.submit(scrape_single_category, url, name): name 
+            executor.submit(scrape_single_category, url, name, checkpoint, delta_store): name 
             for url, name in categories
         }
         
         for future in as_completed(future_to_category):
             category_name = future_to_category[future]
             try:
-                category_products = future.result()
-                
-                with products_lock:
-                    all_products.extend(category_products)
+                sink.add(future.result(), unit=category_name)
                     
             except Exception as e:
                 print(f"Category {category_name} failed: {e}")
     
-    if all_products:
-        df = pd.DataFrame(all_products)
-        df = df.dropna(subset=['Name', 'Price'])
-        df = df[df['Name'].str.strip() != '']
-        df = df[df['Price'].str.strip() != '']
-        df = df.drop_duplicates(subset=['Name', 'Price'])
-        
-        save_csv_to_both_locations(df, "tesco")
+    DRIVER_POOL.close()
+    SELECTOR_CACHE.save()
+    TIMEOUTS.save()
+    
+    if sink.close():
+        checkpoint.clear()
+        delta_store.save()
         
         end_time = time.time()
         duration = end_time - start_time
         
         print(f"\n{'='*50}")
         print(f"SCRAPING COMPLETED!")
-        print(f"Total products: {len(all_products)}")
+        print(f"Total products: {sink.written}")
         print(f"Total time: {duration:.2f} seconds")
-        print(f"Products per second: {len(all_products)/duration:.2f}")
+        print(f"Products per second: {sink.written/duration:.2f}")
         print(f"Files saved: tesco.csv (local) and ../app/public/tesco.csv")
         print(f"{'='*50}")
     else:
         print("No products found.")
 
 if __name__ == "__main__":
-    scrape_tesco_optimized()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Scrape Tesco product listings")
+    parser.add_argument('--resume', action='store_true',
+                        help="Skip categories and pages already saved by an interrupted run")
+    parser.add_argument('--delta', action='store_true',
+                        help="Reuse last run's products for categories whose first page hasn't changed")
+    args = parser.parse_args()
+    scrape_tesco_optimized(resume=args.resume, delta=args.delta)
\ No newline at end of file
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Tests for Aldi's HTTP-first fetching (aldi.py, http_fetch.py) against a local stand-in server.
+
+A ThreadingHTTPServer serves the recorded Aldi listing pages in
+benchmarks/fixtures/aldi/ at the site's category paths, with an ETag so
+conditional requests get a 304. Two more categories stand in for the cases
+that need the browser: one answers plain HTTP with a 403 block page, the
+other with the page shell before its tiles are rendered client-side.
+FixtureDriver fetches from the same server as a rendering browser would,
+so the Selenium fallback runs without Chrome.
+
+Run with: python -m pytest test_aldi_http.py  (or python test_aldi_http.py)
+"""
+
+import gzip
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+import lxml.html
+from lxml.cssselect import CSSSelector
+from selenium.common.exceptions import NoSuchElementException
+
+from aldi import fetch_aldi_page, parse_aldi_products, scrape_listing_page
+from delta import DeltaStore
+from http_fetch import close_session, fetch_conditional
+from rate_limit import HOST_LIMITS
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "fixtures", "aldi")
+
+EMPTY_LISTING = '<html><body><main><div class="product-listing"><div class="product-grid"></div></div></main></body></html>'
+BLOCK_PAGE = '<html><body><h1>Access Denied</h1></body></html>'
+# The browser is told apart from plain HTTP clients by this header
+BROWSER_HEADER = "X-Fixture-Browser"
+
+def load_page(page):
+    """A recorded listing page, or an empty listing past the last one"""
+    path = os.path.join(FIXTURE_DIR, f"listing-page{page}.html.gz")
+    if not os.path.exists(path):
+        return EMPTY_LISTING
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return f.read()
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Serves the recorded listing pages at the paths the live site uses"""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        page = int(parse_qs(url.query).get("page", ["1"])[0])
+        browser = self.headers.get(BROWSER_HEADER) == "1"
+        if url.path == "/products/fresh-food/k/1":
+            etag = f'"fresh-food-{page}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            self.reply(200, load_page(page), etag)
+        elif url.path == "/products/blocked/k/2":
+            if browser:
+                self.reply(200, load_page(page))
+            else:
+                self.reply(403, BLOCK_PAGE)
+        elif url.path == "/products/rendered/k/3":
+            self.reply(200, load_page(page) if browser else EMPTY_LISTING)
+        else:
+            self.send_error(404)
+
+    def reply(self, status, body, etag=None):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+class FixtureDriver:
+    """Just enough of a WebDriver for scrape_aldi_page: get, find_element and page_source"""
+
+    def __init__(self):
+        self.visited = []
+        self.page_source = ""
+
+    def get(self, url):
+        self.visited.append(url)
+        request = urllib.request.Request(url, headers={BROWSER_HEADER: "1"})
+        with urllib.request.urlopen(request) as response:
+            self.page_source = response.read().decode("utf-8")
+
+    def find_element(self, by, value):
+        matches = CSSSelector(value)(lxml.html.fromstring(self.page_source))
+        if not matches:
+            raise NoSuchElementException(value)
+        # Stands in for the WebElement, which waits only truth-test
+        return lxml.html.tostring(matches[0])
+
+class AldiHttpTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        host = f"127.0.0.1:{cls.server.server_address[1]}"
+        cls.base_url = f"http://{host}"
+        # Don't make the tests wait on the politeness limit meant for the live site
+        cls.limits = mock.patch.dict(HOST_LIMITS, {host: (1000.0, 1000)})
+        cls.limits.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.limits.stop()
+        close_session()
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp()
+        self.driver = FixtureDriver()
+
+    def tearDown(self):
+        shutil.rmtree(self.state_dir, ignore_errors=True)
+
+    def url(self, category, page=1):
+        return f"{self.base_url}/products/{category}?page={page}"
+
+    def get_driver(self):
+        return self.driver
+
+    def test_fetch_conditional_200_and_304(self):
+        url = self.url("fresh-food/k/1")
+        result = fetch_conditional(url)
+        self.assertEqual(result['status'], 200)
+        self.assertEqual(result['etag'], '"fresh-food-1"')
+        self.assertEqual(len(parse_aldi_products(result['html'], "Fresh Food")), 48)
+
+        result = fetch_conditional(url, etag=result['etag'])
+        self.assertEqual(result['status'], 304)
+        self.assertIsNone(result['html'])
+
+    def test_fetch_conditional_blocked(self):
+        self.assertIsNone(fetch_conditional(self.url("blocked/k/2")))
+
+    def test_not_modified_pages_reuse_last_runs_products(self):
+        url = self.url("fresh-food/k/1")
+        unit = "Fresh Food/page-1"
+        first_run = DeltaStore('aldi', enabled=True, directory=self.state_dir)
+        products = fetch_aldi_page(url, "Fresh Food", first_run, unit)
+        self.assertEqual(len(products), 48)
+        first_run.save()
+
+        second_run = DeltaStore('aldi', enabled=True, directory=self.state_dir)
+        self.assertEqual(second_run.validators(unit), {'etag': '"fresh-food-1"'})
+        self.assertEqual(fetch_aldi_page(url, "Fresh Food", second_run, unit), products)
+        self.assertEqual(second_run.skipped, 1)
+
+    def test_pages_over_http_never_start_the_browser(self):
+        for page in (1, 2):
+            products, use_http = scrape_listing_page(self.url("fresh-food/k/1", page), "Fresh Food", page,
+                                                     True, self.get_driver)
+            self.assertTrue(products)
+            self.assertTrue(use_http)
+
+        products, use_http = scrape_listing_page(self.url("fresh-food/k/1", 9), "Fresh Food", 9,
+                                                 True, self.get_driver)
+        self.assertEqual(products, [])
+        self.assertTrue(use_http)
+        self.assertEqual(self.driver.visited, [])
+
+    def test_blocked_pages_fall_back_to_selenium(self):
+        url = self.url("blocked/k/2")
+        self.assertIsNone(fetch_aldi_page(url, "Blocked"))
+
+        products, use_http = scrape_listing_page(url, "Blocked", 1, True, self.get_driver)
+        self.assertEqual(len(products), 48)
+        self.assertFalse(use_http)
+        self.assertEqual(self.driver.visited, [url])
+
+    def test_pages_without_tiles_over_http_fall_back_to_selenium(self):
+        url = self.url("rendered/k/3")
+        self.assertEqual(fetch_aldi_page(url, "Rendered"), [])
+
+        products, use_http = scrape_listing_page(url, "Rendered", 1, True, self.get_driver)
+        self.assertEqual(len(products), 48)
+        self.assertFalse(use_http)
+
+        # The rest of the category goes straight to the browser
+        products, use_http = scrape_listing_page(self.url("rendered/k/3", 2), "Rendered", 2,
+                                                 use_http, self.get_driver)
+        self.assertTrue(products)
+        self.assertFalse(use_http)
+        self.assertEqual(len(self.driver.visited), 2)
+
+if __name__ == "__main__":
+    unittest.main()
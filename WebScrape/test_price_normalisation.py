@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared price normalisation (price_normalisation.py).
+
+Run with: python -m pytest test_price_normalisation.py  (or python test_price_normalisation.py)
+"""
+
+import unittest
+
+import pandas as pd
+
+from price_normalisation import normalise_prices
+
+def pence(*prices):
+    return [None if pd.isna(value) else int(value) for value in normalise_prices(list(prices))['price_pence']]
+
+class NormalisePricesTest(unittest.TestCase):
+
+    def test_retailer_formats(self):
+        self.assertEqual(pence("£3.20", "85p", "4.06", "actual price£2.85", "£1.49/1 kg"), [320, 85, 406, 285, 149])
+
+    def test_thousands_separators(self):
+        self.assertEqual(pence("£1,299.00", "1,299.00", "£12,345"), [129900, 129900, 1234500])
+        self.assertEqual(pence("Was £1,500.00 Now £1,299.99"), [129999])
+
+    def test_promotions(self):
+        result = normalise_prices(["Any 3 for £10", "Save 50p £2.00"])
+        self.assertEqual(result['price_pence'].tolist(), [333, 200])
+        self.assertEqual(result['multibuy_qty'].tolist()[0], 3)
+        self.assertEqual(result['multibuy_pence'].tolist()[0], 1000)
+        self.assertTrue(result['promo'].all())
+
+    def test_missing_and_unparseable(self):
+        self.assertEqual(pence(None, "", "Price unavailable"), [None, None, None])
+
+if __name__ == "__main__":
+    unittest.main()
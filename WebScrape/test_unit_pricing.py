@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Tests for pack-size parsing and unit prices (unit_pricing.py).
+
+Run with: python -m pytest test_unit_pricing.py  (or python test_unit_pricing.py)
+"""
+
+import unittest
+
+import pandas as pd
+
+from unit_pricing import extract_pack_sizes, unit_prices
+
+def pack(name):
+    """(pack_count, item_quantity, base_unit) parsed from one name"""
+    row = extract_pack_sizes([name]).iloc[0]
+    return (None if pd.isna(row['pack_count']) else int(row['pack_count']),
+            None if pd.isna(row['item_quantity']) else float(row['item_quantity']),
+            None if pd.isna(row['base_unit']) else row['base_unit'])
+
+class PackSizeTest(unittest.TestCase):
+
+    def test_single_sizes(self):
+        self.assertEqual(pack("McCain Home Chips Straight 1kg"), (1, 1000.0, 'g'))
+        self.assertEqual(pack("Pepsi Max 330ml"), (1, 330.0, 'ml'))
+        self.assertEqual(pack("Cravendale Milk 2 Pints"), (1, 1136.0, 'ml'))
+
+    def test_counts_written_against_the_size(self):
+        self.assertEqual(pack("Guinness Draught 4x440ml"), (4, 440.0, 'ml'))
+        self.assertEqual(pack("Coca-Cola Original Taste 24 x 330ml"), (24, 330.0, 'ml'))
+        self.assertEqual(pack("Evian Still Water 500ml x 6"), (6, 500.0, 'ml'))
+        self.assertEqual(pack("Dairylea Dunkers 3x41g"), (3, 41.0, 'g'))
+
+    def test_pack_counts_after_a_can_size(self):
+        self.assertEqual(pack("Boost Energy 250ml 4 pack"), (4, 250.0, 'ml'))
+        self.assertEqual(pack("Highland Spring Water 2L Pack of 6"), (6, 2000.0, 'ml'))
+
+    def test_x_counts_before_a_can_size(self):
+        self.assertEqual(pack("Radnor Fizz Tropical x4 330ml"), (4, 330.0, 'ml'))
+        self.assertEqual(pack("Carling Original Lager Beer Cans x18 440ml"), (18, 440.0, 'ml'))
+
+    def test_separate_counts_leave_whole_pack_sizes_alone(self):
+        self.assertEqual(pack("Scotch Pancakes x6 240g"), (1, 240.0, 'g'))
+        self.assertEqual(pack("Rocket Ice Lollies x8 464ml"), (1, 464.0, 'ml'))
+
+    def test_counts_without_a_size_are_priced_per_item(self):
+        self.assertEqual(pack("Coffee Pods x 16"), (16, 1.0, 'each'))
+        self.assertEqual(pack("Free Range Eggs 6 Pack"), (6, 1.0, 'each'))
+        self.assertEqual(pack("Bananas"), (None, None, None))
+
+    def test_zero_quantities_are_not_sizes(self):
+        self.assertEqual(pack("Tesco 0g Sugar Cola 500ml"), (1, 500.0, 'ml'))
+        self.assertEqual(pack("Coke Zero 0.5l"), (1, 500.0, 'ml'))
+
+class UnitPriceTest(unittest.TestCase):
+
+    def test_multipacks_are_priced_per_litre_of_the_whole_pack(self):
+        sizes = extract_pack_sizes(["Boost Energy 250ml 4 pack", "Boost Energy 250ml"])
+        prices = unit_prices(sizes, pd.Series([200, 50]))
+        self.assertEqual(prices['unit_price_pence'].tolist(), [200, 200])
+        self.assertEqual(prices['unit_basis'].tolist(), ['l', 'l'])
+
+if __name__ == "__main__":
+    unittest.main()
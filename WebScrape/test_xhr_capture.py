@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Tests for the listing JSON capture (xhr_capture.py) against a local stand-in server.
+
+A ThreadingHTTPServer serves the recorded Morrisons listing payloads in
+benchmarks/fixtures/morrisons/ at the retailer's API paths, alongside a
+recommendations endpoint and a non-JSON response. FixtureBrowser fetches
+from it and exposes what it saw the way Chrome does to Selenium: DevTools
+events in the performance log and bodies through Network.getResponseBody.
+No real browser is needed.
+
+Run with: python -m pytest test_xhr_capture.py  (or python test_xhr_capture.py)
+"""
+
+import gzip
+import itertools
+import json
+import os
+import threading
+import unittest
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from morrisons import LISTING_API_PATTERNS
+from xhr_capture import ResponseCapture, extract_products
+
+FIXTURE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            "benchmarks", "fixtures", "morrisons", "product_pages.json.gz")
+HOST = "groceries.morrisons.com"
+
+with gzip.open(FIXTURE_PATH, "rt", encoding="utf-8") as f:
+    LISTING_PAGES = json.load(f)
+RECOMMENDATIONS = {"products": [{"retailerProductId": "1", "name": "Recommended Thing", "price": {"amount": "1.00"}}]}
+
+def listing_products(page):
+    return page["productGroups"][0]["products"]
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Serves the recorded payloads at the paths the live site uses"""
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path.startswith("/api/webproductpagews/v6/product-pages/browse/"):
+            page = int(path.rsplit("/", 1)[-1])
+            self.reply(json.dumps(LISTING_PAGES[page - 1]), "application/json")
+        elif path == "/api/webproductpagews/v5/recommendations":
+            self.reply(json.dumps(RECOMMENDATIONS), "application/json")
+        elif path == "/api/webproductpagews/v6/product-pages/banner":
+            self.reply("<p>not json</p>", "text/html")
+        else:
+            self.send_error(404)
+
+    def reply(self, body, mime_type):
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", f"{mime_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+class FixtureBrowser:
+    """
+    Loads URLs from the stand-in server and reports them as Chrome would.
+
+    URLs keep the retailer's host so the capture's patterns apply; requests
+    are sent to the local server instead.
+    """
+
+    def __init__(self, port):
+        self.port = port
+        self.log = []
+        self.bodies = {}
+        self.ids = itertools.count(1)
+
+    def fetch(self, path, finish=True):
+        """Request ``path``; with finish=False the loadingFinished event is held back"""
+        request_id = str(next(self.ids))
+        url = f"https://{HOST}{path}"
+        with urllib.request.urlopen(f"http://127.0.0.1:{self.port}{path}") as response:
+            body = response.read().decode("utf-8")
+            mime_type = response.headers.get_content_type()
+        self.bodies[request_id] = body
+        self.event('Network.requestWillBeSent', requestId=request_id, type='XHR', request={'url': url})
+        self.event('Network.responseReceived', requestId=request_id, type='XHR',
+                   response={'url': url, 'mimeType': mime_type})
+        if finish:
+            self.finish(request_id)
+        return request_id
+
+    def finish(self, request_id):
+        self.event('Network.loadingFinished', requestId=request_id, encodedDataLength=len(self.bodies[request_id]))
+
+    def event(self, method, **params):
+        self.log.append({'message': json.dumps({'message': {'method': method, 'params': params}})})
+
+    def get_log(self, log_type):
+        entries, self.log = self.log, []
+        return entries
+
+    def execute_cdp_cmd(self, command, params):
+        if command == 'Network.getResponseBody':
+            return {'body': self.bodies[params['requestId']], 'base64Encoded': False}
+        return {}
+
+class ResponseCaptureTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.browser = FixtureBrowser(self.server.server_address[1])
+        self.capture = ResponseCapture('morrisons', LISTING_API_PATTERNS)
+
+    def test_listing_pages_are_captured(self):
+        self.browser.fetch("/api/webproductpagews/v6/product-pages/browse/1")
+        self.browser.fetch("/api/webproductpagews/v6/product-pages/browse/2")
+        products = self.capture.collect(self.browser)
+
+        expected = listing_products(LISTING_PAGES[0]) + listing_products(LISTING_PAGES[1])
+        self.assertEqual([p['name'] for p in products], [p['name'] for p in expected])
+        self.assertEqual(products[0]['id'], expected[0]['retailerProductId'])
+        self.assertEqual(products[0]['price'], expected[0]['price']['current']['amount'])
+
+    def test_carousels_inside_a_listing_are_ignored(self):
+        self.browser.fetch("/api/webproductpagews/v6/product-pages/browse/1")
+        names = {p['name'] for p in self.capture.collect(self.browser)}
+        carousel = {p['name'] for p in LISTING_PAGES[0]['carousels'][0]['products']}
+        self.assertFalse(names & carousel)
+
+    def test_other_endpoints_are_ignored(self):
+        self.browser.fetch("/api/webproductpagews/v5/recommendations")
+        self.browser.fetch("/api/webproductpagews/v6/product-pages/banner")
+        self.assertEqual(self.capture.collect(self.browser), [])
+
+    def test_responses_in_flight_are_picked_up_later(self):
+        request_id = self.browser.fetch("/api/webproductpagews/v6/product-pages/browse/3", finish=False)
+        self.assertEqual(self.capture.collect(self.browser), [])
+        self.browser.finish(request_id)
+        self.assertEqual(len(self.capture.collect(self.browser)), len(listing_products(LISTING_PAGES[2])))
+
+    def test_reset_forgets_earlier_responses(self):
+        self.browser.fetch("/api/webproductpagews/v6/product-pages/browse/1")
+        self.capture.reset(self.browser)
+        self.assertEqual(self.capture.collect(self.browser), [])
+
+    def test_walker_without_ignored_keys_sees_carousels(self):
+        page = LISTING_PAGES[0]
+        self.assertEqual(len(extract_products(page, ignored_keys=None)),
+                         len(listing_products(page)) + len(page['carousels'][0]['products']))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+"""
+Pack sizes and per-unit prices parsed from product names.
+
+Retailers put the pack size in the name ("McCain Home Chips Straight 1kg",
+"Dairylea Dunkers ... 3x41g", "Guinness ... 4x325ml", "Coffee Pods x 16").
+extract_pack_sizes() reads the multipack count, the size of one item and its
+unit (g/kg/ml/cl/l/pint, or "each" when only a count is given) for a whole
+column of names, and converts them to grams, millilitres or items.
+unit_prices() then gives pence per kg, per litre or per item, so the same
+product can be compared across stores whatever size each one sells.
+
+A count written against the size ("4x325ml", "4 x 325ml", "330ml x 24") is
+always multiplied in. One written apart from it, before or after ("Boost
+250ml 4 pack", "Radnor Fizz x4 330ml"), only when the size is a standard can
+or bottle (CAN_AND_BOTTLE_ML), which drinks multipacks label per item. In
+"Pancakes x6 240g" or "Ice Lollies x8 464ml" the size is the whole pack.
+Zero quantities are never a size: in "Tesco 0g Sugar Cola 500ml" the size is
+the 500ml.
+
+Everything is vectorised. With pyarrow installed the names are held as Arrow
+strings, whose regex extraction runs in C++ and is several times faster than
+pandas' own.
+"""
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    TEXT_DTYPE = pd.ArrowDtype(pa.string())
+    NUMBER_DTYPE = pd.ArrowDtype(pa.float64())  # parse in Arrow, then hand back as Float64
+except ImportError:
+    TEXT_DTYPE = "string"
+    NUMBER_DTYPE = "Float64"
+
+UNIT = r'kg|kilos?|g|grams?|ml|cl|ltrs?|litres?|liters?|l|pints?|pt'
+SIZE_PATTERN = (
+    r'(?i)\b(?:(?P<count_before>\d+)\s*[x×]\s*)?'
+    r'(?P<quantity>\d*[1-9]\d*(?:\.\d+)?|0*\.\d*[1-9]\d*)\s*(?P<unit>' + UNIT + r')\b'  # not zero
+    r'(?:\s*[x×]\s*(?P<count_after>\d+)\b)?'
+)
+COUNT_PATTERN = (
+    r'(?i)(?:\b[x×]\s*(?P<x_count>\d+)\b'
+    r'|\b(?P<pack_count>\d+)\s*(?:pack|pk|pcs|pieces|per\s+pack)\b'
+    r'|\bpack\s+of\s+(?P<pack_of>\d+)\b)'
+)
+
+# Single can/bottle volumes, in ml, that a multipack's size may refer to
+CAN_AND_BOTTLE_ML = [150, 175, 200, 250, 275, 330, 355, 440, 500, 568, 750, 1000, 1500, 2000]
+
+# Unit -> (base unit, multiplier to it)
+UNITS = {
+    'g': ('g', 1), 'gram': ('g', 1), 'grams': ('g', 1),
+    'kg': ('g', 1000), 'kilo': ('g', 1000), 'kilos': ('g', 1000),
+    'ml': ('ml', 1), 'cl': ('ml', 10),
+    'l': ('ml', 1000), 'ltr': ('ml', 1000), 'ltrs': ('ml', 1000),
+    'litre': ('ml', 1000), 'litres': ('ml', 1000), 'liter': ('ml', 1000), 'liters': ('ml', 1000),
+    'pint': ('ml', 568), 'pints': ('ml', 568), 'pt': ('ml', 568),
+}
+# Base unit -> (what unit_price_pence is per, base units in one of it)
+BASES = {'g': ('kg', 1000), 'ml': ('l', 1000), 'each': ('each', 1)}
+
+def extract(text, pattern):
+    """str.extract with unmatched groups missing (Arrow gives '' for them)"""
+    found = text.str.extract(pattern)
+    return found.where(found != '')
+
+def number(column, dtype):
+    return column.astype(NUMBER_DTYPE).astype(dtype)
+
+def extract_pack_sizes(names):
+    """
+    Parse pack sizes out of a column of product names.
+
+    Returns:
+        DataFrame on the same index: pack_count (Int64, items in the pack),
+        item_quantity (Float64, size of one item in base units), base_unit
+        ('g', 'ml', 'each' or missing) and total_quantity (Float64).
+    """
+    index = names.index if isinstance(names, pd.Series) else None
+    text = pd.Series(names, dtype=object).astype(TEXT_DTYPE).reset_index(drop=True)
+
+    size = extract(text, SIZE_PATTERN)
+    unit = size['unit'].str.lower().astype("category")  # a dozen distinct values to look up
+    base_unit = unit.map({name: base for name, (base, _) in UNITS.items()}).astype(object)
+    factor = unit.map({name: factor for name, (_, factor) in UNITS.items()}).astype("Float64")
+    item_quantity = number(size['quantity'], "Float64") * factor
+    pack_count = number(size['count_before'].fillna(size['count_after']), "Int64")
+    has_size = item_quantity.notna()
+
+    # A count apart from the size: cans in a drinks multipack, or the items of a
+    # name without any size, which is then priced per item
+    counts = extract(text, COUNT_PATTERN)
+    item_count = number(counts['x_count'].fillna(counts['pack_count']).fillna(counts['pack_of']), "Int64")
+    per_can = (base_unit == 'ml') & item_quantity.isin(CAN_AND_BOTTLE_ML).fillna(False)
+    pack_count = pack_count.fillna(item_count.where(~has_size | per_can)).where(lambda c: c > 0)
+    base_unit = base_unit.where(has_size, pack_count.notna().map({True: 'each', False: None}))
+    item_quantity = item_quantity.where(has_size, pack_count.notna().map({True: 1.0, False: None}).astype("Float64"))
+    pack_count = pack_count.where(~has_size | pack_count.notna(), 1).astype("Int64")
+
+    result = pd.DataFrame({
+        'pack_count': pack_count,
+        'item_quantity': item_quantity,
+        'base_unit': base_unit.astype("string"),
+        'total_quantity': pack_count.astype("Float64") * item_quantity,
+    })
+    return result.set_axis(index) if index is not None else result
+
+def unit_prices(sizes, price_pence):
+    """
+    Pence per kg, per litre or per item.
+
+    Args:
+        sizes: extract_pack_sizes() output.
+        price_pence: Integer pence on the same index (see price_normalisation).
+
+    Returns:
+        DataFrame: unit_price_pence (Int64) and unit_basis ('kg', 'l', 'each').
+    """
+    base_unit = sizes['base_unit'].astype(object)
+    basis = base_unit.map({unit: basis for unit, (basis, _) in BASES.items()})
+    per = base_unit.map({unit: per for unit, (_, per) in BASES.items()}).astype("Float64")
+    total = sizes['total_quantity'].where(sizes['total_quantity'] > 0)
+    unit_price = pd.Series(price_pence, index=sizes.index).astype("Float64") / total * per
+    return pd.DataFrame({
+        'unit_price_pence': unit_price.round().astype("Int64"),
+        'unit_basis': basis.astype("string"),
+    }, index=sizes.index)
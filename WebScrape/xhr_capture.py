@@ -0,0 +1,241 @@
+"""
+Product capture from the JSON responses behind lazily loaded listings.
+
+Infinite scroll and search result pages are filled by background XHR/fetch
+calls. Rather than waiting for those products to render and then reading
+the DOM, the browser's performance log is watched for matching JSON
+responses, their bodies are fetched with Network.getResponseBody and the
+product records inside are returned directly.
+
+Payload layouts differ per retailer and change without notice, so records
+are found with a generic walker: any object carrying a name key and a price
+key counts as a product. Listing responses often embed carousels too
+("customers also bought", sponsored rows, recommendations), so the walker
+does not descend into keys matching IGNORED_KEY_PATTERN, and scrapers
+should match only their listing endpoints. Scrapers fall back to DOM
+scraping whenever a page yields no payload products.
+
+Payloads are recorded to, and replayed from, the page cache (page_cache.py)
+along with the page that requested them.
+"""
+
+import base64
+import json
+import re
+from fnmatch import fnmatch
+
+from resource_blocking import drain_performance_log
+from page_cache import PAGE_CACHE, record_payload, replay_payloads
+
+# Keys checked, in order, on every JSON object
+NAME_KEYS = ('name', 'productName', 'product_name', 'displayName', 'title', 'NAME')
+PRICE_KEYS = ('price', 'currentPrice', 'current_price', 'salePrice', 'nowPrice', 'PRICES', 'PRICE')
+ID_KEYS = ('productId', 'product_id', 'retailerProductId', 'sku', 'id', 'CIN', 'objectID')
+
+# Keys followed when a price is an object, e.g. {"amount": "1.50", "currency": "GBP"}
+AMOUNT_KEYS = ('amount', 'value', 'actual', 'current', 'now', 'price', 'PRICE', 'EN', 'displayPrice')
+
+# Keys whose contents are not the listing itself
+IGNORED_KEY_PATTERN = re.compile(
+    r'(?i)recommend|carousel|sponsor|banner|related|similar|upsell|cross_?sell|'
+    r'frequently|trending|also_?bought|you_?may|recently_?viewed'
+)
+
+MAX_DEPTH = 12
+
+def resolve_price(value, depth=0):
+    """Return the first usable number or price string inside ``value``, or None"""
+    if depth > 4 or value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        return value.strip() if re.search(r'\d', value) else None
+    if isinstance(value, dict):
+        for key in AMOUNT_KEYS:
+            if key in value:
+                price = resolve_price(value[key], depth + 1)
+                if price is not None:
+                    return price
+    return None
+
+def _first_value(obj, keys):
+    for key in keys:
+        if key in obj and obj[key] not in (None, ''):
+            return obj[key]
+    return None
+
+def extract_products(payload, ignored_keys=IGNORED_KEY_PATTERN):
+    """
+    Walk a decoded JSON payload and return every product-like record.
+
+    Args:
+        ignored_keys: Compiled pattern; values under matching keys are not
+            searched. None searches everything.
+
+    Returns:
+        list: Dicts with ``id`` (may be None), ``name`` and the raw ``price``
+        (a number or string, see ``price_text``).
+    """
+    products = []
+    stack = [(payload, 0)]
+    while stack:
+        node, depth = stack.pop()
+        if depth > MAX_DEPTH:
+            continue
+        if isinstance(node, list):
+            stack.extend((item, depth + 1) for item in reversed(node))
+            continue
+        if not isinstance(node, dict):
+            continue
+
+        name = _first_value(node, NAME_KEYS)
+        price = None
+        for key in PRICE_KEYS:
+            if key in node:
+                price = resolve_price(node[key])
+                if price is not None:
+                    break
+        if isinstance(name, str) and len(name.strip()) > 1 and price is not None:
+            product_id = _first_value(node, ID_KEYS)
+            products.append({
+                'id': str(product_id) if product_id is not None else None,
+                'name': name.strip(),
+                'price': price,
+            })
+            # A product's own children (variants, promotions) aren't separate listings
+            continue
+
+        stack.extend(
+            (value, depth + 1) for key, value in reversed(list(node.items()))
+            if ignored_keys is None or not ignored_keys.search(str(key))
+        )
+    return products
+
+def price_text(value, symbol='£'):
+    """Format a payload price like the on-page price text ('£1.50')"""
+    if isinstance(value, (int, float)):
+        return f"{symbol}{value:.2f}"
+    text = str(value).strip()
+    if symbol and symbol not in text and re.fullmatch(r'\d+(\.\d+)?', text):
+        return f"{symbol}{text}"
+    return text
+
+class ResponseCapture:
+    """
+    Collects product records from a retailer's JSON responses.
+
+    Args:
+        retailer (str): Label used in log messages.
+        url_patterns (list): fnmatch-style patterns ('*host/api/*') for the listing API calls.
+        mode (str): 'xhr' to capture, anything else (e.g. 'dom') to disable.
+
+    Reading the performance log clears it, so callers that also report network
+    usage should drain it once and pass the messages to both.
+    """
+
+    def __init__(self, retailer, url_patterns, mode='xhr'):
+        self.retailer = retailer
+        self.url_patterns = list(url_patterns)
+        self.mode = (mode or 'xhr').lower()
+
+    @property
+    def enabled(self):
+        return self.mode == 'xhr'
+
+    def configure_options(self, options):
+        """Turn on the performance log the capture reads"""
+        if self.enabled:
+            options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+        return options
+
+    def install(self, driver):
+        """Make sure the Network domain is on so response bodies stay retrievable"""
+        if not self.enabled:
+            return driver
+        try:
+            driver.execute_cdp_cmd('Network.enable', {})
+        except Exception as e:
+            print(f"⚠️ Could not enable response capture for {self.retailer}: {e}")
+        return driver
+
+    def matches(self, url):
+        return any(fnmatch(url, pattern) for pattern in self.url_patterns)
+
+    def reset(self, driver):
+        """Forget everything seen so far, e.g. just before navigating to a new listing"""
+        drain_performance_log(driver)
+        driver.xhr_pending = {}
+
+    def _read_body(self, driver, request_id):
+        try:
+            response = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+        except Exception:
+            return None
+        body = response.get('body', '')
+        if response.get('base64Encoded'):
+            body = base64.b64decode(body).decode('utf-8', errors='replace')
+        try:
+            return json.loads(body)
+        except ValueError:
+            return None
+
+    def collect(self, driver, messages=None):
+        """
+        Return the products in listing responses that finished since the last call.
+
+        Responses still in flight are remembered on the driver and picked up
+        by a later call.
+
+        Args:
+            driver: The Selenium WebDriver instance.
+            messages (list): Already drained performance log messages, if any.
+
+        Returns:
+            list: Product records from ``extract_products``, de-duplicated.
+        """
+        if not self.enabled:
+            return []
+        if PAGE_CACHE.replaying:
+            return self._products_from(replay_payloads(driver))
+        if messages is None:
+            messages = drain_performance_log(driver)
+
+        pending = getattr(driver, 'xhr_pending', None)
+        if pending is None:
+            pending = driver.xhr_pending = {}
+        finished = []
+
+        for message in messages:
+            method = message.get('method')
+            params = message.get('params', {})
+            if method == 'Network.responseReceived':
+                response = params.get('response', {})
+                url = response.get('url', '')
+                mime_type = response.get('mimeType', '')
+                if 'json' in mime_type and self.matches(url):
+                    pending[params.get('requestId')] = url
+            elif method == 'Network.loadingFinished' and params.get('requestId') in pending:
+                finished.append(params['requestId'])
+            elif method == 'Network.loadingFailed':
+                pending.pop(params.get('requestId'), None)
+
+        payloads = []
+        for request_id in finished:
+            pending.pop(request_id, None)
+            payload = self._read_body(driver, request_id)
+            if payload is not None:
+                record_payload(driver, payload)
+                payloads.append(payload)
+        return self._products_from(payloads)
+
+    def _products_from(self, payloads):
+        products = []
+        seen = set()
+        for payload in payloads:
+            for product in extract_products(payload):
+                key = product['id'] or f"{product['name']}|{product['price']}"
+                if key not in seen:
+                    seen.add(key)
+                    products.append(product)
+        return products
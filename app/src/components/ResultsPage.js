@@ -2,11 +2,18 @@ import { useState, useEffect } from "react"
 import { ShoppingCart, ArrowLeft, TrendingDown, Store, Search} from 'lucide-react'
 import { Link, useNavigate } from "react-router-dom"
 
+// Store names differ in case between the app ("TESCO", from selection.js) and the
+// CSV/matches.json data ("Tesco"), so stores are always compared through this
+export const storeKey = store => (store || '').toUpperCase()
+
 // Enhanced Product Matcher Class
-class ProductMatcher {
+export class ProductMatcher {
   constructor() {
     this.normalizedProducts = new Map()
     this.allProducts = []
+    // "<STORE>|<name>" -> product, and -> its cluster from matches.json
+    this.productsByKey = new Map()
+    this.clustersByKey = new Map()
     this.priceThreshold = 5
     this.similarityThreshold = 0.4 // Lowered from 0.6 to find more matches
     this.synonyms = {
@@ -174,17 +181,19 @@ class ProductMatcher {
     return matrix[str2.length][str1.length]
   }
 
-  addProduct(name, price, store, category) {
+  addProduct(name, price, store, category, pricePence) {
     const product = {
       originalName: name,
       normalizedName: this.normalizeProductName(name),
       keywords: this.extractKeywords(name),
-      price: this.extractPrice(price),
+      // Scrapers publish price_pence; only older CSVs need the text parsed here
+      price: pricePence ? Number(pricePence) / 100 : this.extractPrice(price),
       store,
       category: category || ''
     }
     
     this.allProducts.push(product)
+    this.productsByKey.set(`${storeKey(store)}|${name}`, product)
     
     // Also add to normalized map for quick lookup
     if (!this.normalizedProducts.has(product.normalizedName)) {
@@ -232,12 +241,33 @@ class ProductMatcher {
         const category = product.category || product.Category
 
         if (name && name.length > 2 && price) {
-          this.addProduct(name, price, store, category)
+          this.addProduct(name, price, store, category, product.price_pence)
         }
       }
     }
   }
 
+  // Clusters of equivalent products, matched offline by WebScrape/product_matching.py
+  loadMatches(matches) {
+    for (const cluster of matches.clusters || []) {
+      for (const product of cluster.products) {
+        this.clustersByKey.set(`${storeKey(product.store)}|${product.name}`, cluster)
+      }
+    }
+  }
+
+  // Equivalents of one product in other stores, straight from its cluster
+  findMatchedAlternatives(name, store) {
+    const cluster = this.clustersByKey.get(`${storeKey(store)}|${name}`)
+    if (!cluster) return []
+
+    return cluster.products
+      .filter(member => storeKey(member.store) !== storeKey(store))
+      .map(member => this.productsByKey.get(`${storeKey(member.store)}|${member.name}`))
+      .filter(product => product && product.price !== null)
+      .map(product => ({ ...product, similarity: cluster.score }))
+  }
+
   // Enhanced: Find similar products with corrected scoring
   findSimilarProducts(searchTerm) {
     const searchKeywords = this.extractKeywords(searchTerm)
@@ -366,7 +396,7 @@ class ProductMatcher {
     const searchKeywords = this.extractKeywords(searchTerm)
     
     const storeProducts = this.allProducts
-      .filter(product => product.store === targetStore)
+      .filter(product => storeKey(product.store) === storeKey(targetStore))
       .map(product => {
         let similarity = this.calculateSimilarity(searchTerm, product.originalName)
         
@@ -388,7 +418,7 @@ class ProductMatcher {
   // New method: Find alternatives across all stores
   findBestAlternatives(searchTerm, excludeStore = null) {
     const allMatches = this.allProducts
-      .filter(product => !excludeStore || product.store !== excludeStore)
+      .filter(product => !excludeStore || storeKey(product.store) !== storeKey(excludeStore))
       .map(product => {
         const similarity = this.calculateSimilarity(searchTerm, product.originalName)
         return { ...product, similarity }
@@ -473,6 +503,16 @@ export default function ResultsPage() {
 
         console.log(`Total products loaded: ${matcher.allProducts.length}`)
 
+        try {
+          const response = await fetch("/matches.json")
+          if (response.ok) {
+            matcher.loadMatches(await response.json())
+            console.log(`✓ Loaded ${matcher.clustersByKey.size} matched products`)
+          }
+        } catch (error) {
+          console.warn("No product matches available, scoring products instead:", error)
+        }
+
         // Enhanced comparison logic using SELECTED products
         const allComparisons = []
         let totalPotentialSavings = 0
@@ -502,26 +542,32 @@ export default function ResultsPage() {
               category: selectedProduct.category
             }
 
-            // Find similar products in OTHER stores (excluding the selected supermarket)
-            const otherStoreProducts = matcher.allProducts
-              .filter(product => product.store !== storedSupermarket)
-              .map(product => {
-                const similarity = matcher.calculateSimilarity(productName, product.originalName)
-                return { ...product, similarity }
+            // Matched products in OTHER stores, if the offline matcher clustered this one
+            let alternatives = matcher.findMatchedAlternatives(selectedProduct.name, storedSupermarket)
+
+            if (alternatives.length === 0) {
+              // Find similar products in OTHER stores (excluding the selected supermarket)
+              const otherStoreProducts = matcher.allProducts
+                .filter(product => storeKey(product.store) !== storeKey(storedSupermarket))
+                .map(product => {
+                  const similarity = matcher.calculateSimilarity(productName, product.originalName)
+                  return { ...product, similarity }
+                })
+                .filter(product => product.similarity >= 0.3 && product.price !== null)
+                .sort((a, b) => b.similarity - a.similarity)
+
+              // Group by store and take best match from each store
+              const byStore = {}
+              otherStoreProducts.forEach(product => {
+                if (!byStore[product.store] || byStore[product.store].similarity < product.similarity) {
+                  byStore[product.store] = product
+                }
               })
-              .filter(product => product.similarity >= 0.3 && product.price !== null)
-              .sort((a, b) => b.similarity - a.similarity)
-
-            // Group by store and take best match from each store
-            const byStore = {}
-            otherStoreProducts.forEach(product => {
-              if (!byStore[product.store] || byStore[product.store].similarity < product.similarity) {
-                byStore[product.store] = product
-              }
-            })
+              alternatives = Object.values(byStore)
+            }
 
             // Create comparisons with the selected product
-            results = Object.values(byStore)
+            results = alternatives
               .slice(0, 4) // Top 4 alternative stores
               .map(altProduct => ({
                 product1: {
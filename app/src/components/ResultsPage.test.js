@@ -0,0 +1,58 @@
+import { ProductMatcher, storeKey } from "./ResultsPage"
+
+// Store names as the results page loads them, and as matches.json publishes them
+const CSVS = {
+  "Tesco": "Category,Name,Price,price_pence\nDrinks,Tesco Orange Juice 1L,£1.20,120\n",
+  "Sainsbury's": "Category,Name,Price,price_pence\nDrinks,Sainsbury's Orange Juice 1L,£1.15,115\n",
+  "ALDI": "category,name,price,price_pence\nDrinks,NATURE'S PICK Orange Juice 1L,£0.99,99\n",
+}
+const MATCHES = {
+  clusters: [
+    {
+      score: 0.9,
+      products: [
+        { store: "Tesco", name: "Tesco Orange Juice 1L" },
+        { store: "Sainsbury's", name: "Sainsbury's Orange Juice 1L" },
+        { store: "ALDI", name: "NATURE'S PICK Orange Juice 1L" },
+      ],
+    },
+  ],
+}
+
+function loadedMatcher() {
+  const matcher = new ProductMatcher()
+  for (const [store, csv] of Object.entries(CSVS)) {
+    matcher.loadProductsFromCSV(csv, store)
+  }
+  matcher.loadMatches(MATCHES)
+  return matcher
+}
+
+test("stores compare case-insensitively", () => {
+  expect(storeKey("Sainsbury's")).toBe(storeKey("SAINSBURY'S"))
+  expect(storeKey(null)).toBe("")
+})
+
+// selection.js stores the shopper's supermarket upper-cased
+test.each(["TESCO", "Tesco"])("matched alternatives are found for %s", store => {
+  const alternatives = loadedMatcher().findMatchedAlternatives("Tesco Orange Juice 1L", store)
+
+  expect(alternatives.map(product => product.store).sort()).toEqual(["ALDI", "Sainsbury's"])
+  expect(alternatives.every(product => product.similarity === 0.9)).toBe(true)
+})
+
+test("the shopper's own store is never an alternative", () => {
+  const alternatives = loadedMatcher().findMatchedAlternatives("Sainsbury's Orange Juice 1L", "SAINSBURY'S")
+
+  expect(alternatives.map(product => product.store).sort()).toEqual(["ALDI", "Tesco"])
+})
+
+test("unmatched products have no matched alternatives", () => {
+  expect(loadedMatcher().findMatchedAlternatives("Something Else", "TESCO")).toEqual([])
+})
+
+test("products in a store are found whatever the case of its name", () => {
+  const found = loadedMatcher().findProductsInStore("orange juice", "TESCO")
+
+  expect(found.map(product => product.originalName)).toEqual(["Tesco Orange Juice 1L"])
+})